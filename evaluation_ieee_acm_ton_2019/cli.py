@@ -21,10 +21,12 @@
 # SOFTWARE.
 #
 
+import json
 import os
+import tempfile
 
 import click
-import pickle
+import yaml
 import logging
 
 import alib.cli
@@ -32,10 +34,26 @@ from alib import run_experiment, util
 from vnep_approx import modelcreator_ecg_decomposition, randomized_rounding_triumvirate
 
 from . import evaluation
+from . import experiment_execution
+from . import generation_cache
+from . import io_benchmark
+from . import live_evaluation
+from . import lp_cache
+from . import pickle_inspection
+from . import pickle_io
 from . import plot_data as pd
+from . import result_store
+from . import result_summary
+from . import scenario_store
+from . import sqlite_export
+from . import substrate_interning
+from . import work_queue
 
 @click.group()
-def cli():
+@click.option('--compression_level', type=click.IntRange(0, 9), default=None,
+              help="compression level for writing pickles ending with .gz, .xz or .bz2 (which uses at least 1); "
+                   "by default the codec's default")
+def cli(compression_level):
     """
     This command-line interface allows you to access major parts of the VNEP-Approx framework
     developed by Matthias Rost, Elias Döhne, Alexander Elvers, and Tom Koch.
@@ -45,16 +63,54 @@ def cli():
 
     Note that each commands provides a detailed help page. To access the help, simply type the commmand and --help.
 
+    Pickles whose name ends with .gz, .xz or .bz2 (e.g. results.pickle.xz) are read and written compressed.
+
     """
-    pass
+    pickle_io.set_compression_level(compression_level)
 
 def initialize_logger(filename, log_level_print, log_level_file, allow_override=False):
     log_level_print = logging._nameToLevel[log_level_print.upper()]
     log_level_file = logging._nameToLevel[log_level_file.upper()]
     util.initialize_root_logger(filename, log_level_print, log_level_file, allow_override=allow_override)
 
+def register_algorithms():
+    run_experiment.register_algorithm(
+        modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition.ALGORITHM_ID,
+        modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition
+    )
+
+    run_experiment.register_algorithm(
+        randomized_rounding_triumvirate.RandomizedRoundingTriumvirate.ALGORITHM_ID,
+        randomized_rounding_triumvirate.RandomizedRoundingTriumvirate
+    )
+
+def load_cost_model(cost_model_pickle):
+    if cost_model_pickle is None:
+        return None
+    cost_model_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, cost_model_pickle)
+    click.echo("Fitting cost model on results in {}".format(cost_model_pickle_path))
+    previous_results = pickle_io.load_file(cost_model_pickle_path)
+    return experiment_execution.ScenarioCostModel.fit_from_results(previous_results)
+
+def get_lp_cache_directory(experiment_yaml, use_lp_cache, lp_cache_directory):
+    if not use_lp_cache:
+        return None
+    if lp_cache_directory is not None:
+        return lp_cache_directory
+    experiment_yaml.seek(0)
+    experiment_specification = experiment_execution.load_experiment_specification(experiment_yaml)
+    experiment_yaml.seek(0)
+    return lp_cache.get_default_cache_directory(experiment_specification["SCENARIO_INPUT_PICKLE"])
+
+def is_scenario_input_indexed(experiment_yaml):
+    experiment_yaml.seek(0)
+    experiment_specification = experiment_execution.load_experiment_specification(experiment_yaml)
+    experiment_yaml.seek(0)
+    scenario_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, experiment_specification["SCENARIO_INPUT_PICKLE"])
+    return os.path.exists(scenario_pickle_path) and scenario_store.is_indexed_scenario_file(scenario_pickle_path)
+
 @cli.command(short_help="pretty print contents of pickle file")
-@click.argument('pickle_file', type=click.File('r'))
+@click.argument('pickle_file', type=click.Path(exists=True, dir_okay=False))
 @click.option('--col_output_limit', default=None, help="The number of items that shall be printed.")
 def pretty_print(pickle_file, col_output_limit):
     """
@@ -62,21 +118,175 @@ def pretty_print(pickle_file, col_output_limit):
         Note that, if the pickle file is large, it may take some time to generate the output.
         Furthermore, a high amount of RAM might be necessary.
     """
-    data = pickle.load(pickle_file)
+    data = pickle_io.load_file(pickle_file)
     pp = util.PrettyPrinter()
     print(pp.pprint(data, col_output_limit=col_output_limit))
 
+@cli.command(short_help="prints (parts of) a pickle, shard directory or indexed scenario file")
+@click.argument('path', type=click.Path(exists=True))
+@click.argument('query', default="")
+@click.option('--max_depth', type=click.INT, default=3, help="number of levels printed below the selected object")
+@click.option('--max_items', type=click.INT, default=20, help="number of items printed per container")
+def inspect(path, query, max_depth, max_items):
+    """
+        Prints the object selected by QUERY within PATH (absolute path), e.g.
+
+            inspect results.pickle algorithm_scenario_solution_dictionary.ClassicMCF.42.0.status
+
+        The QUERY is a dot-separated sequence of attributes, dictionary keys and list indices; without a query,
+        the whole object is printed. The output is written while traversing the object, limited by --max_depth
+        and --max_items. PATH may also be a result shard directory (see start-experiment --sharded_results) or an
+        indexed scenario file (see index-scenarios), of which only the selected shards and scenarios are loaded.
+    """
+    root = pickle_inspection.open_inspectable(path)
+    try:
+        selected = pickle_inspection.resolve_query(root, query)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="QUERY")
+    for line in pickle_inspection.iterate_lines(selected, query or os.path.basename(path), max_depth=max_depth, max_items=max_items):
+        click.echo(line)
+
+
+@cli.command(short_help="prints statistics of a result pickle or shard directory")
+@click.argument('result_path', type=click.Path(exists=True))
+@click.option('--json', 'print_json', is_flag=True, default=False, help="print the statistics as JSON")
+def summarize(result_path, print_json):
+    """
+        Prints the algorithms and execution configurations contained in RESULT_PATH (absolute path), the number of
+        present and missing scenarios, the distribution of the solution status and runtime percentiles. RESULT_PATH
+        may be a raw or reduced result pickle or a result shard directory (see start-experiment --sharded_results),
+        whose shards are read one at a time.
+    """
+    summary = result_summary.summarize_results(result_path)
+    if print_json:
+        click.echo(json.dumps(summary, indent=2, sort_keys=True))
+    else:
+        for line in result_summary.format_summary(summary):
+            click.echo(line)
+
+
+@cli.command(short_help="benchmarks writing and loading result pickles on synthetic data")
+@click.option('--number_of_scenarios', type=click.INT, default=7500, help="number of synthetic scenarios")
+@click.option('--repetitions', type=click.INT, default=3, help="the minimal time over this many repetitions is reported")
+@click.option('--directory', type=click.Path(exists=True, file_okay=False), default=None,
+              help="directory to write the pickles to; by default a temporary directory")
+def benchmark_pickle_io(number_of_scenarios, repetitions, directory):
+    """
+        Writes and loads synthetic reduced results of the given number of scenarios once with plain pickle and once
+        with the pickle I/O used by all commands, and prints file sizes and runtimes.
+    """
+    click.echo("Creating synthetic results of {} scenarios".format(number_of_scenarios))
+    data = io_benchmark.create_synthetic_results(number_of_scenarios=number_of_scenarios)
+    with tempfile.TemporaryDirectory(dir=directory) as benchmark_directory:
+        results = io_benchmark.benchmark_pickle_io(data, benchmark_directory, repetitions=repetitions)
+    for line in io_benchmark.format_benchmark_results(results):
+        click.echo(line)
+
+
+@cli.command(short_help="benchmarks the codecs for compressed pickles on synthetic data")
+@click.option('--number_of_scenarios', type=click.INT, default=7500, help="number of synthetic scenarios")
+@click.option('--repetitions', type=click.INT, default=3, help="the minimal time over this many repetitions is reported")
+@click.option('--disk_bandwidth', type=click.FLOAT, default=None, help="disk bandwidth in MB/s to estimate load times including disk reads")
+@click.option('--directory', type=click.Path(exists=True, file_okay=False), default=None,
+              help="directory to write the pickles to; by default a temporary directory")
+def benchmark_compression(number_of_scenarios, repetitions, disk_bandwidth, directory):
+    """
+        Writes and loads synthetic reduced results of the given number of scenarios uncompressed and with each
+        supported codec (.gz, .bz2, .xz), and prints file sizes, runtimes and load throughputs. The compression
+        level can be set via the global --compression_level option.
+    """
+    click.echo("Creating synthetic results of {} scenarios".format(number_of_scenarios))
+    data = io_benchmark.create_synthetic_results(number_of_scenarios=number_of_scenarios)
+    with tempfile.TemporaryDirectory(dir=directory) as benchmark_directory:
+        results = io_benchmark.benchmark_compression(data, benchmark_directory, repetitions=repetitions, disk_bandwidth=disk_bandwidth)
+    for line in io_benchmark.format_compression_benchmark_results(results):
+        click.echo(line)
+
+
 @cli.command(short_help="generate scenarios according to yaml specification")
 @click.argument('yaml_parameter_file', type=click.File('r'))
 @click.argument('scenario_output_file')
 @click.option('--threads', default=1, help="Number of processed to be used for generating the scenarios.")
-def generate_scenarios(yaml_parameter_file, scenario_output_file, threads):
+@click.option('--intern_substrates/--no_intern_substrates', is_flag=True, default=False, help="store identical substrates only once")
+@click.option('--seed_per_parameters/--no_seed_per_parameters', is_flag=True, default=False,
+              help="seed the random number generators before each generation step based on the parameters and the repetition. "
+                   "WARNING: the scenarios differ from the ones generated without this option (e.g. the published ones)")
+@click.option('--generation_cache/--no_generation_cache', 'use_generation_cache', is_flag=True, default=False,
+              help="reuse requests, profits and restrictions generated previously for equal parameters (implies --seed_per_parameters). "
+                   "WARNING: the scenarios differ from the ones generated without --seed_per_parameters")
+@click.option('--generation_cache_directory', type=click.Path(), default=None,
+              help="directory of the generation cache; by default ~/.cache/evaluation_ieee_acm_ton_2019/scenario_generation")
+def generate_scenarios(yaml_parameter_file, scenario_output_file, threads, intern_substrates, seed_per_parameters, use_generation_cache, generation_cache_directory):
     """ Generate scenarios according to yaml_parameter_file. Note that while the yaml_parameter_file can be placed anywhere,
         the resuling scenario_output_file will be placed into ALIB_EXPERIMENT_HOME/output.
         Accordingly, the environment variable ALIB_EXPERIMENT_HOME must be set.
         The process of scenario generation is logged into ALIB_EXPERIMENT_HOME/log
+
+        With --intern_substrates, scenarios having identical substrates share a single substrate object
+        afterwards, such that each substrate is only stored once in the scenario pickle. The pickle is then
+        read and written once more. Scenario output files ending with .gz, .xz or .bz2 are compressed.
+
+        With --seed_per_parameters, the random number generators are seeded before each generation step (e.g.
+        the request generation) based on the parameters of the steps applied so far and the repetition, such
+        that each scenario only depends on its own parameters. WARNING: the scenarios then differ from the ones
+        generated with the alib's default seeding, e.g. the published scenario sets.
+
+        With --generation_cache (which implies --seed_per_parameters), the generated requests, profits and node
+        placement restrictions are cached per parameter combination and repetition (see generation_cache), such
+        that after extending the parameter space only the new combinations are computed. Cached scenarios are
+        identical to the ones generated with --seed_per_parameters but without the cache.
+    """
+    if use_generation_cache or seed_per_parameters:
+        scenario_parameter_space = yaml.load(yaml_parameter_file, Loader=yaml.FullLoader)
+        yaml_parameter_file.seek(0)
+        generation_version = generation_cache.get_generation_version(scenario_parameter_space)
+        if use_generation_cache:
+            if generation_cache_directory is None:
+                generation_cache_directory = generation_cache.get_default_cache_directory()
+            seeder = generation_cache.ScenarioGenerationCache(generation_cache_directory, generation_version)
+        else:
+            seeder = generation_cache.ScenarioGenerationSeeder(generation_version)
+        with generation_cache.seed_scenario_generation(seeder, scenario_parameter_space):
+            alib.cli.f_generate_scenarios(scenario_output_file, yaml_parameter_file, threads)
+    else:
+        alib.cli.f_generate_scenarios(scenario_output_file, yaml_parameter_file, threads)
+    scenario_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, os.path.basename(scenario_output_file))
+    if intern_substrates:
+        substrate_interning.intern_substrates_of_scenario_pickle(scenario_pickle_path)
+    elif pickle_io.get_compression_suffix(scenario_pickle_path):
+        # the alib writes uncompressed pickles
+        result_store.write_pickle_atomically(pickle_io.load_file(scenario_pickle_path), scenario_pickle_path)
+
+
+@cli.command(short_help="converts a scenario pickle into an indexed scenario file")
+@click.argument('scenario_pickle_file', type=click.Path())
+@click.option('--output_file', type=click.Path(), default=None, help="name of the indexed scenario file; by default <basename>_indexed.pickle")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def index_scenarios(scenario_pickle_file, output_file, log_level_print, log_level_file):
+    """ Converts the scenario pickle ALIB_EXPERIMENT_HOME/input/scenario_pickle_file (as written by generate-scenarios)
+        into an indexed scenario file in ALIB_EXPERIMENT_HOME/output, in which each scenario is pickled separately.
+        When used as SCENARIO_INPUT_PICKLE of an experiment, start-experiment (with --sharded_results or any of
+        the options implying it) and start-worker only load the scenarios of [min_scenario_index, max_scenario_index],
+        and each worker process only loads the scenario it solves. Indexed scenario files cannot be read by
+        start-experiment without --sharded_results, as it uses the alib's run_experiment.
+
+        The shard directory (and hence the result pickle merged from it) contains all scenarios of the indexed
+        file, which are loaded once when the shard directory is created. The results thus remain usable if the
+        indexed scenario file is moved or removed.
     """
-    alib.cli.f_generate_scenarios(scenario_output_file, yaml_parameter_file, threads)
+    util.ExperimentPathHandler.initialize()
+    file_basename = os.path.basename(scenario_pickle_file).split(".")[0]
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR, "index_scenarios_{}.log".format(file_basename.lower()))
+    initialize_logger(log_file, log_level_print, log_level_file)
+
+    if output_file is None:
+        output_file = file_basename + "_indexed.pickle"
+    scenario_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, os.path.basename(scenario_pickle_file))
+    click.echo("Reading scenarios from {}".format(scenario_pickle_path))
+    scenario_container = pickle_io.load_file(scenario_pickle_path)
+    scenario_store.write_indexed_scenario_file(scenario_container,
+                                               os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, os.path.basename(output_file)))
 
 
 @cli.command(short_help="compute solutions to scenarios")
@@ -91,6 +301,16 @@ def generate_scenarios(yaml_parameter_file, scenario_output_file, threads):
 @click.option('--overwrite_existing_intermediate_solutions/--use_existing_intermediate_solutions', default=False, help="shall existing intermediate solution files be overwritten or used?")
 @click.option('--remove_temporary_scenarios/--keep_temporary_scenarios', is_flag=True, default=False, help="shall temporary scenario files be removed after execution?")
 @click.option('--remove_intermediate_solutions/--keep_intermediate_solutions', is_flag=True, default=False, help="shall intermediate solutions be removed after execution?")
+@click.option('--longest_first/--no_longest_first', is_flag=True, default=False, help="dispatch the scenarios by decreasing estimated cost (overrides --shuffle_instances)")
+@click.option('--cost_model_pickle', type=click.STRING, default=None, help="(reduced) result pickle in ALIB_EXPERIMENT_HOME/input from which the cost model used by --longest_first is fitted; by default a heuristic is used")
+@click.option('--sharded_results/--no_sharded_results', is_flag=True, default=False, help="write each solution into its own result shard, such that restarts skip completed work (implied by --longest_first)")
+@click.option('--shard_directory', type=click.Path(), default=None, help="directory of the result shards; by default ALIB_EXPERIMENT_HOME/output/<result basename>_shards")
+@click.option('--cores', type=click.IntRange(min=1), default=None, help="number of cores to be used: the number of concurrent processes is derived from the Gurobi threads (overrides --concurrent, implies --sharded_results)")
+@click.option('--pin_cores/--no_pin_cores', is_flag=True, default=False, help="pin each process to its own set of --cores CPUs")
+@click.option('--memory_budget', type=click.FloatRange(min=0, min_open=True), default=None, help="memory (in GB) the concurrently solved scenarios may use in total (implies --sharded_results)")
+@click.option('--lp_cache/--no_lp_cache', 'use_lp_cache', is_flag=True, default=False, help="cache the LP solutions of the randomized rounding and reuse them when only rounding parameters differ (implies --sharded_results)")
+@click.option('--lp_cache_directory', type=click.Path(), default=None, help="directory of the LP cache; by default ALIB_EXPERIMENT_HOME/output/<scenario basename>_lp_cache")
+@click.option('--reduce_results', type=click.Choice(experiment_execution.REDUCTION_MODES), default=None, help="reduce solutions to plot data within the workers and store them alongside or instead of the full solutions (implies --sharded_results)")
 def start_experiment(experiment_yaml,
                      min_scenario_index, max_scenario_index,
                      concurrent,
@@ -100,7 +320,17 @@ def start_experiment(experiment_yaml,
                      overwrite_existing_temporary_scenarios,
                      overwrite_existing_intermediate_solutions,
                      remove_temporary_scenarios,
-                     remove_intermediate_solutions
+                     remove_intermediate_solutions,
+                     longest_first,
+                     cost_model_pickle,
+                     sharded_results,
+                     shard_directory,
+                     cores,
+                     pin_cores,
+                     memory_budget,
+                     use_lp_cache,
+                     lp_cache_directory,
+                     reduce_results
                      ):
     """ Execute experiments according to given experiment_yaml file (absolute path).
         The contents of the experiment_yaml detail which scenario file to load which must be
@@ -111,49 +341,247 @@ def start_experiment(experiment_yaml,
         that this does not equal the number of threads as e.g. Gurobi might use more than
         one thread (per solving process).
 
+        With --longest_first the scenarios are dispatched by decreasing estimated cost, such that the
+        most expensive scenarios do not end up at the tail of the run. The cost is estimated from the
+        generation parameters of the scenarios, either by a simple heuristic or by a model fitted on the
+        runtimes contained in the --cost_model_pickle of a previous execution. In this mode, the
+        temporary scenario options are ignored, as scenarios are handed to the worker processes directly.
+
+        With --sharded_results (or --longest_first) each solution of a (scenario, execution id) pair is
+        written atomically into its own result shard and recorded in the manifest of the shard directory.
+        Restarting the same command skips the completed pairs (unless intermediate solutions shall be
+        overwritten); the shards can also be merged at any time via merge-results. Restarting with
+        changed execution parameters fails unless intermediate solutions shall be overwritten.
+
+        Instead of --concurrent, the number of --cores can be given: the number of concurrent processes
+        is then chosen such that the processes' Gurobi threads (the threads parameter of the execution
+        configurations, which is set to 1 where missing) do not exceed the cores. With --pin_cores each
+        process is additionally pinned to its own CPUs via sched_setaffinity.
+
+        With --memory_budget, new scenarios are only started while the resident memory of the running
+        processes plus the estimated peak memory of the next scenario stays within the budget. The
+        estimate is learned from the scenarios finished so far. If the budget is nevertheless exceeded,
+        the most recently started scenario is killed and re-queued to be run with fewer scenarios
+        alongside; the same holds for scenarios killed by the operating system's OOM killer.
+
+        With --reduce_results, each worker reduces its solutions right after computing them, as the
+        reduce-to-plotdata-* commands do, and the reduced results are written to
+        ALIB_EXPERIMENT_HOME/output/<result basename>_reduced.pickle. With 'instead', the full solutions
+        are not stored at all, saving the write and the later re-read of the full result pickle.
+
+        With --lp_cache, the LP solutions (and decompositions) computed by the randomized rounding are
+        stored per scenario and LP-relevant parameters, i.e. all Gurobi and algorithm parameters except
+        number_of_solutions_to_round and mdk_gurobi_parameters. Executions differing only in the latter --
+        also in later invocations -- reuse the cached LP solutions instead of solving the LP again.
+
+        The scenario pickle may also be an indexed scenario file (see index-scenarios), which requires
+        --sharded_results or any of the options implying it. The scenarios are then loaded on demand, except
+        once when the shard directory is created, as it stores all scenarios alongside the results.
+
         The logs are stored in ALIB_EXPERIMENT_HOME.
 
         The environment variable ALIB_EXPERIMENT_HOME needs to be set!
     """
     click.echo('Start Experiment')
-    util.ExperimentPathHandler.initialize()
+    use_experiment_execution = (longest_first or sharded_results or use_lp_cache or
+                                cores is not None or memory_budget is not None or reduce_results is not None)
+    # restarts resume the result shards (and reuse the LP cache) contained in the output directory
+    util.ExperimentPathHandler.initialize(check_emptiness_log=not use_experiment_execution,
+                                          check_emptiness_output=not use_experiment_execution)
     file_basename = os.path.basename(experiment_yaml.name).split(".")[0].lower()
     log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR, "{}_experiment_execution.log".format(file_basename))
 
     initialize_logger(log_file, log_level_print, log_level_file)
 
-    run_experiment.register_algorithm(
-        modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition.ALGORITHM_ID,
-        modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition
+    register_algorithms()
+
+    if pin_cores and cores is None:
+        raise click.UsageError("--pin_cores requires --cores")
+
+    if not use_experiment_execution:
+        if is_scenario_input_indexed(experiment_yaml):
+            raise click.UsageError("The scenario pickle is an indexed scenario file, which requires --sharded_results.")
+        run_experiment.run_experiment(
+            experiment_yaml,
+            min_scenario_index, max_scenario_index,
+            concurrent,
+            shuffle_instances,
+            overwrite_existing_temporary_scenarios,
+            overwrite_existing_intermediate_solutions,
+            remove_temporary_scenarios,
+            remove_intermediate_solutions
+        )
+        return
+
+    cost_model = load_cost_model(cost_model_pickle)
+
+    experiment_execution.run_experiment_locally(
+        experiment_yaml,
+        min_scenario_index, max_scenario_index,
+        concurrent=concurrent,
+        cores=cores,
+        pin_cores=pin_cores,
+        memory_budget=memory_budget * 1024 ** 3 if memory_budget is not None else None,
+        shuffle_instances=shuffle_instances,
+        longest_first=longest_first,
+        cost_model=cost_model,
+        shard_directory=shard_directory,
+        reduce_results=reduce_results,
+        lp_cache_directory=get_lp_cache_directory(experiment_yaml, use_lp_cache, lp_cache_directory),
+        overwrite_existing_intermediate_solutions=overwrite_existing_intermediate_solutions,
+        remove_intermediate_solutions=remove_intermediate_solutions
     )
 
-    run_experiment.register_algorithm(
-        randomized_rounding_triumvirate.RandomizedRoundingTriumvirate.ALGORITHM_ID,
-        randomized_rounding_triumvirate.RandomizedRoundingTriumvirate
-    )
 
-    run_experiment.run_experiment(
+@cli.command(short_help="pull scenarios from a shared work queue and solve them")
+@click.argument('experiment_yaml', type=click.File('r'))
+@click.argument('min_scenario_index', type=click.INT)
+@click.argument('max_scenario_index', type=click.INT)
+@click.option('--concurrent', default=1, help="number of scenarios solved in parallel by this worker")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+@click.option('--longest_first/--no_longest_first', is_flag=True, default=False, help="prioritize scenarios by decreasing estimated cost")
+@click.option('--cost_model_pickle', type=click.STRING, default=None, help="(reduced) result pickle in ALIB_EXPERIMENT_HOME/input from which the cost model used by --longest_first is fitted")
+@click.option('--queue_file', type=click.Path(), default=None, help="SQLite queue shared by the workers; by default ALIB_EXPERIMENT_HOME/output/<result basename>_queue.sqlite")
+@click.option('--shard_directory', type=click.Path(), default=None, help="directory of the result shards; by default ALIB_EXPERIMENT_HOME/output/<result basename>_shards")
+@click.option('--lease_timeout', type=click.FloatRange(min=1.0), default=600.0, help="seconds after which scenarios of workers without heartbeat are handed out again")
+@click.option('--max_attempts', type=click.IntRange(min=1), default=3, help="number of times a scenario is handed out before it is marked as failed")
+@click.option('--poll_interval', type=click.FloatRange(min=0.1), default=30.0, help="seconds to wait for other workers when no scenario is pending")
+@click.option('--cores', type=click.IntRange(min=1), default=None, help="number of cores of this worker: the number of concurrent processes is derived from the Gurobi threads (overrides --concurrent)")
+@click.option('--pin_cores/--no_pin_cores', is_flag=True, default=False, help="pin each process to its own set of --cores CPUs")
+def start_worker(experiment_yaml,
+                 min_scenario_index, max_scenario_index,
+                 concurrent,
+                 log_level_print,
+                 log_level_file,
+                 longest_first,
+                 cost_model_pickle,
+                 queue_file,
+                 shard_directory,
+                 lease_timeout,
+                 max_attempts,
+                 poll_interval,
+                 cores,
+                 pin_cores):
+    """ Start a worker which pulls scenario ids from a work queue shared via ALIB_EXPERIMENT_HOME and solves them.
+        Any number of workers -- on one or on many hosts -- can be started for the same experiment_yaml; the
+        first worker creates the queue containing the scenarios in [min_scenario_index, max_scenario_index].
+        Workers renew the leases of their scenarios via heartbeats; scenarios of dead workers are handed out
+        again after --lease_timeout seconds. The solutions are written into result shards, which can be merged
+        into the result pickle via merge-results once all workers have terminated.
+
+        The environment variable ALIB_EXPERIMENT_HOME needs to be set!
+    """
+    if pin_cores and cores is None:
+        raise click.UsageError("--pin_cores requires --cores")
+    click.echo('Start Worker')
+    # other workers share the log and output directories
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    file_basename = os.path.basename(experiment_yaml.name).split(".")[0].lower()
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "{}_worker_{}.log".format(file_basename, work_queue.get_worker_id().replace(":", "_")))
+    initialize_logger(log_file, log_level_print, log_level_file)
+
+    register_algorithms()
+
+    work_queue.run_worker(
         experiment_yaml,
         min_scenario_index, max_scenario_index,
-        concurrent,
-        shuffle_instances,
-        overwrite_existing_temporary_scenarios,
-        overwrite_existing_intermediate_solutions,
-        remove_temporary_scenarios,
-        remove_intermediate_solutions
+        concurrent=concurrent,
+        cores=cores,
+        pin_cores=pin_cores,
+        longest_first=longest_first,
+        cost_model=load_cost_model(cost_model_pickle),
+        queue_path=queue_file,
+        shard_directory=shard_directory,
+        lease_timeout=lease_timeout,
+        max_attempts=max_attempts,
+        poll_interval=poll_interval
     )
 
 
+@cli.command(short_help="merges result shards into a single result pickle")
+@click.argument('shard_directory', type=click.Path(exists=True, file_okay=False))
+@click.argument('output_pickle_file', type=click.Path())
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def merge_results(shard_directory, output_pickle_file, log_level_print, log_level_file):
+    """ Merges the completed result shards written by start-experiment --sharded_results into a single result
+        pickle (as written by start-experiment itself). This also works for experiments that are still running
+        or were interrupted: only the shards recorded in the manifest are merged.
+
+        The output_pickle_file is placed into ALIB_EXPERIMENT_HOME/output.
+    """
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    file_basename = os.path.basename(output_pickle_file).split(".")[0].lower()
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR, "merge_results_{}.log".format(file_basename))
+    initialize_logger(log_file, log_level_print, log_level_file)
+
+    scenario_solution_storage = result_store.ResultShardStore(shard_directory).merge()
+    output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, os.path.basename(output_pickle_file))
+    click.echo("Writing merged results to {}".format(output_pickle_path))
+    result_store.write_pickle_atomically(scenario_solution_storage, output_pickle_path)
+
+
+@cli.command(short_help="extracts data to be plotted for all algorithms in a single pass")
+@click.argument('input_pickle_file', type=click.Path())
+@click.option('--output_pickle_file', type=click.Path(), default=None, help="file to write to")
+@click.option('--min_scenario_index', type=click.INT, default=None, help="only reduce the scenarios with at least this id")
+@click.option('--max_scenario_index', type=click.INT, default=None, help="only reduce the scenarios with at most this id")
+@click.option('--processes', type=click.IntRange(min=1), default=1, help="number of processes reducing result shards in parallel")
+@click.option('--sample_retention', type=click.Choice(pd.SAMPLE_RETENTION_MODES), default=pd.SAMPLE_RETENTION_BEST,
+              help="rounding samples retained besides the best feasible and the highest objective one: none (best), "
+                   "the Pareto front over profit and loads (pareto) or the best ones per criterion (top_k)")
+@click.option('--retained_samples', type=click.IntRange(min=1), default=10, help="maximal size of the retained Pareto front or k of top_k")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def reduce_to_plotdata_pickle(input_pickle_file, output_pickle_file, min_scenario_index, max_scenario_index,
+                              processes, sample_retention, retained_samples, log_level_print, log_level_file):
+    """ Given a scenario solution pickle (input_pickle_file) containing the solutions of one or
+        more algorithms, this function reads it once and extracts the data to be plotted of each
+        algorithm by the extractor registered for the algorithm id (see
+        plot_data.register_result_extractor). The reduced solutions are written to
+        --output_pickle_file. Pickles containing solutions of unregistered algorithms are rejected.
+
+        The options and the input are handled as by reduce-to-plotdata-baseline-pickle and, for
+        --sample_retention, as by reduce-to-plotdata-randround-pickle.
+    """
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "reduce_{}.log".format(os.path.basename(input_pickle_file)))
+    initialize_logger(log_file, log_level_print, log_level_file)
+    pd.set_sample_retention(sample_retention, retained_samples)
+    pd.reduce_result_pickle(input_pickle_file, output_pickle_file, min_scenario_index, max_scenario_index, processes)
+
+
 @cli.command(short_help="extracts data to be plotted for baseline (MCF)")
 @click.argument('input_pickle_file', type=click.Path())
 @click.option('--output_pickle_file', type=click.Path(), default=None, help="file to write to")
+@click.option('--min_scenario_index', type=click.INT, default=None, help="only reduce the scenarios with at least this id")
+@click.option('--max_scenario_index', type=click.INT, default=None, help="only reduce the scenarios with at most this id")
+@click.option('--processes', type=click.IntRange(min=1), default=1, help="number of processes reducing result shards in parallel")
 @click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
 @click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
-def reduce_to_plotdata_baseline_pickle(input_pickle_file, output_pickle_file, log_level_print, log_level_file):
+def reduce_to_plotdata_baseline_pickle(input_pickle_file, output_pickle_file, min_scenario_index, max_scenario_index,
+                                       processes, log_level_print, log_level_file):
     """ Given a scenario solution pickle (input_pickle_file) this function extracts data
         to be plotted and writes it to --output_pickle_file. If --output_pickle_file is not
         given, a default name (derived from the input's basename) is derived.
 
+        Each algorithm contained in the input is reduced by the extractor registered for its
+        algorithm id (see plot_data.get_result_extractor), i.e. this command is equivalent to
+        reduce-to-plotdata-pickle.
+
+        Using --min_scenario_index and --max_scenario_index, only the scenarios of the given
+        range are reduced, e.g. to split the reduction across machines. The partial outputs
+        can be combined using merge-reduced. Note that an input pickle is always loaded as a
+        whole, while only the shards of the range are loaded from a result shard directory.
+
+        Instead of a pickle, the input may be a directory of result shards (see start-experiment
+        --sharded_results), also of an experiment which is still running. The completed shards
+        are reduced by --processes processes into <input>_reduced, from which the output is
+        written. Shards reduced by an earlier call are not reduced again.
+
         The input_file must be contained in ALIB_EXPERIMENT_HOME/input and the output
         will be written to ALIB_EXPERIMENT_HOME/output while the log is saved in
         ALIB_EXPERIMENT_HOME/log.
@@ -163,18 +591,45 @@ def reduce_to_plotdata_baseline_pickle(input_pickle_file, output_pickle_file, lo
                             "reduce_{}.log".format(os.path.basename(input_pickle_file)))
     initialize_logger(log_file, log_level_print, log_level_file)
     reducer = pd.BaselineResultReducer()
-    reducer.reduce_baseline_solution(input_pickle_file, output_pickle_file)
+    reducer.reduce_baseline_solution(input_pickle_file, output_pickle_file, min_scenario_index, max_scenario_index, processes)
 
 
 @cli.command(short_help="extracts data to be plotted for randomized rounding alg (Triumvirate)")
 @click.argument('input_pickle_file', type=click.Path())
 @click.option('--output_pickle_file', type=click.Path(), default=None)
+@click.option('--min_scenario_index', type=click.INT, default=None, help="only reduce the scenarios with at least this id")
+@click.option('--max_scenario_index', type=click.INT, default=None, help="only reduce the scenarios with at most this id")
+@click.option('--processes', type=click.IntRange(min=1), default=1, help="number of processes reducing result shards in parallel")
+@click.option('--sample_retention', type=click.Choice(pd.SAMPLE_RETENTION_MODES), default=pd.SAMPLE_RETENTION_BEST,
+              help="rounding samples retained besides the best feasible and the highest objective one: none (best), "
+                   "the Pareto front over profit and loads (pareto) or the best ones per criterion (top_k)")
+@click.option('--retained_samples', type=click.IntRange(min=1), default=10, help="maximal size of the retained Pareto front or k of top_k")
 @click.option('--log_level_print', type=click.STRING, default="info")
 @click.option('--log_level_file', type=click.STRING, default="debug")
-def reduce_to_plotdata_randround_pickle(input_pickle_file, output_pickle_file, log_level_print, log_level_file):
+def reduce_to_plotdata_randround_pickle(input_pickle_file, output_pickle_file, min_scenario_index, max_scenario_index,
+                                        processes, sample_retention, retained_samples, log_level_print, log_level_file):
     """ Given a scenario solution pickle (input_pickle_file) for randomized rounding, this          function extracts data  to be plotted and writes it to --output_pickle_file.
         If --output_pickle_file is not given, a default name (derived from the input's              basename) is derived.
 
+        Each algorithm contained in the input is reduced by the extractor registered for its
+        algorithm id (see plot_data.get_result_extractor), i.e. this command is equivalent to
+        reduce-to-plotdata-pickle.
+
+        Using --min_scenario_index and --max_scenario_index, only the scenarios of the given
+        range are reduced, e.g. to split the reduction across machines. The partial outputs
+        can be combined using merge-reduced. Note that an input pickle is always loaded as a
+        whole, while only the shards of the range are loaded from a result shard directory.
+
+        Instead of a pickle, the input may be a directory of result shards (see start-experiment
+        --sharded_results), also of an experiment which is still running. The completed shards
+        are reduced by --processes processes into <input>_reduced, from which the output is
+        written. Shards reduced by an earlier call are not reduced again.
+
+        Besides the best feasible (or least violating) and the highest objective sample, further
+        rounding samples can be retained via --sample_retention: the Pareto front over profit,
+        max node load and max edge load (at most --retained_samples samples) or the
+        --retained_samples best samples under each criterion of plot_data.TOP_K_CRITERIA.
+
         The input_file must be contained in ALIB_EXPERIMENT_HOME/input and the output
         will be written to ALIB_EXPERIMENT_HOME/output while the log is saved in
         ALIB_EXPERIMENT_HOME/log.
@@ -183,9 +638,57 @@ def reduce_to_plotdata_randround_pickle(input_pickle_file, output_pickle_file, l
     log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
                             "reduce_{}.log".format(os.path.basename(input_pickle_file)))
     initialize_logger(log_file, log_level_print, log_level_file)
+    pd.set_sample_retention(sample_retention, retained_samples)
     reducer = pd.RandRoundResultReducer()
-    reducer.reduce_randomized_rounding_solution(input_pickle_file, output_pickle_file)
+    reducer.reduce_randomized_rounding_solution(input_pickle_file, output_pickle_file, min_scenario_index, max_scenario_index, processes)
+
+
+@cli.command(short_help="merges partial reduced pickles into a single reduced pickle")
+@click.argument('output_pickle_file', type=click.Path())
+@click.argument('reduced_pickle_files', type=click.Path(), nargs=-1, required=True)
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def merge_reduced(output_pickle_file, reduced_pickle_files, log_level_print, log_level_file):
+    """ Merges reduced pickles (reduced_pickle_files), e.g. written by the reduce-to-plotdata commands for
+        disjoint scenario ranges, into a single reduced pickle (output_pickle_file). The pickles are loaded one
+        after another. The merge fails if a solution is contained in several pickles or if the pickles stem
+        from different execution parameters.
+
+        The reduced_pickle_files must be contained in ALIB_EXPERIMENT_HOME/input and the output
+        will be written to ALIB_EXPERIMENT_HOME/output while the log is saved in
+        ALIB_EXPERIMENT_HOME/log.
+    """
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "merge_reduced_{}.log".format(os.path.basename(output_pickle_file)))
+    initialize_logger(log_file, log_level_print, log_level_file)
+    pd.merge_reduced_pickles(reduced_pickle_files, output_pickle_file)
+
+
+@cli.command(short_help="exports reduced result pickles into an SQLite database")
+@click.argument('output_database_file', type=click.Path())
+@click.argument('reduced_pickle_files', type=click.Path(), nargs=-1, required=True)
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def export_sqlite(output_database_file, reduced_pickle_files, log_level_print, log_level_file):
+    """ Exports the reduced result pickles (reduced_pickle_files, e.g. a reduced baseline and a reduced randround
+        pickle) into a new SQLite database (output_database_file). The database contains a table of the scenarios
+        with their generation parameters, a table of the execution parameters as well as a baseline and a randround
+        table containing the values used by the plots. Generation parameters and scenario ids are indexed.
 
+        The reduced_pickle_files must be contained in ALIB_EXPERIMENT_HOME/input and the database
+        will be written to ALIB_EXPERIMENT_HOME/output while the log is saved in
+        ALIB_EXPERIMENT_HOME/log.
+    """
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "export_sqlite_{}.log".format(os.path.basename(output_database_file)))
+    initialize_logger(log_file, log_level_print, log_level_file)
+    reduced_pickle_paths = [os.path.join(util.ExperimentPathHandler.INPUT_DIR, reduced_pickle_file)
+                            for reduced_pickle_file in reduced_pickle_files]
+    database_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, os.path.basename(output_database_file))
+    sqlite_export.export_reduced_pickles(reduced_pickle_paths, database_path)
+    click.echo("Wrote {}".format(database_path))
 
 
 def collect_existing_alg_ids(execution_parameter_container):
@@ -248,6 +751,11 @@ def query_algorithm_id_and_execution_id(logger,
 
     return algorithm_id, execution_config_id
 
+def parse_pattern_list(pattern_string):
+    if pattern_string is None:
+        return None
+    return [pattern.strip() for pattern in pattern_string.split(",") if pattern.strip()]
+
 @cli.command(short_help="create plots for baseline and randround solution")
 @click.argument('baseline_pickle_name', type=click.Path())      #pickle in ALIB_EXPERIMENT_HOME/input storing baseline results
 @click.argument('randround_pickle_name', type=click.Path())     #pickle in ALIB_EXPERIMENT_HOME/input storing randround results
@@ -266,6 +774,27 @@ def query_algorithm_id_and_execution_id(logger,
 @click.option('--overwrite/--no_overwrite', default=True, help="overwrite existing files?")
 @click.option('--papermode/--non-papermode', default=True, help="output 'paper-ready' figures or figures containing additional statistical data?")
 @click.option('--output_filetype', type=click.Choice(['png', 'pdf', 'eps']), default="png", help="the filetype which shall be created")
+@click.option('--writer_threads', type=click.INT, default=2,
+              help="number of background threads writing figures, which are rendered in the main thread; "
+                   "0 writes figures synchronously")
+@click.option('--max_pending_figures', type=click.INT, default=8, help="maximal number of finished figures waiting to be written")
+@click.option('--plot_families', type=click.STRING, default=None, help="comma separated glob patterns selecting the plot families to create. "
+                                                                       "Families: " + ", ".join(evaluation.PLOT_FAMILIES))
+@click.option('--metrics', type=click.STRING, default=None, help="comma separated glob patterns selecting the metrics (by filename) to plot. "
+                                                                 "Example: \"max_*_load,ECDF_*\"")
+@click.option('--axes', type=click.STRING, default=None, help="comma separated glob patterns selecting the heatmap axes (by foldername). "
+                                                              "Example: \"AXES_RESOURCES,*_vs_SUBSTRATES\"")
+@click.option('--filters', type=click.STRING, default=None, help="comma separated glob patterns selecting the filters (by filename). "
+                                                                 "Example: \"no_filter,number_of_requests_*\"")
+@click.option('--sample-fraction', 'sample_fraction', type=click.FloatRange(0.0, 1.0, min_open=True), default=None,
+              help="quick-look mode: only evaluate this fraction of the scenarios of each generation parameter combination")
+@click.option('--per-cell-limit', 'per_cell_limit', type=click.IntRange(min=1), default=None,
+              help="quick-look mode: evaluate at most this many scenarios per generation parameter combination")
+@click.option('--sample_seed', type=click.INT, default=0, help="seed for selecting the subsampled scenarios")
+@click.option('--ecdf_backend', type=click.Choice(evaluation.ECDF_BACKENDS), default=evaluation.ECDF_BACKEND_EXACT,
+              help="plot every value of ECDFs (exact) or a bounded number of quantiles from a quantile sketch (sketch)")
+@click.option('--ecdf_points', type=click.IntRange(min=2), default=200, help="number of points per ECDF for the sketch backend")
+@click.option('--reduction_processes', type=click.IntRange(min=1), default=1, help="number of processes reducing result shards given instead of reduced pickles")
 @click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
 @click.option('--log_level_file', type=click.STRING, default="debug", help="log level for stdout")
 def evaluate_results(baseline_pickle_name,
@@ -281,8 +810,28 @@ def evaluate_results(baseline_pickle_name,
                      overwrite,
                      papermode,
                      output_filetype,
+                     writer_threads,
+                     max_pending_figures,
+                     plot_families,
+                     metrics,
+                     axes,
+                     filters,
+                     sample_fraction,
+                     per_cell_limit,
+                     sample_seed,
+                     ecdf_backend,
+                     ecdf_points,
+                     reduction_processes,
                      log_level_print,
                      log_level_file):
+    """ Creates the plots comparing the reduced baseline results (baseline_pickle_name) with the reduced
+        randround results (randround_pickle_name) within output_directory.
+
+        Instead of reduced pickles, directories of (reduced) result shards may be given, e.g. of
+        experiments which are still running (see start-experiment --sharded_results and --reduce_results).
+        Full result shards are reduced first (see reduce-to-plotdata-*). Scenarios solved by only one of
+        the algorithms so far are not evaluated.
+    """
 
     util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
     log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
@@ -296,15 +845,11 @@ def evaluate_results(baseline_pickle_name,
     #get root logger
     logger = logging.getLogger()
 
-    logger.info("Reading reduced baseline pickle at {}".format(baseline_pickle_path))
-    baseline_results = None
-    with open(baseline_pickle_path, "rb") as f:
-        baseline_results = pickle.load(f)
+    logger.info("Reading reduced baseline results at {}".format(baseline_pickle_path))
+    baseline_results = pd.load_reduced_results(baseline_pickle_path, processes=reduction_processes)
 
-    logger.info("Reading reduced randround pickle at {}".format(randround_pickle_path))
-    randround_results = None
-    with open(randround_pickle_path, "rb") as f:
-        randround_results = pickle.load(f)
+    logger.info("Reading reduced randround results at {}".format(randround_pickle_path))
+    randround_results = pd.load_reduced_results(randround_pickle_path, processes=reduction_processes)
 
     logger.info("Loading algorithm identifiers and execution ids..")
 
@@ -345,7 +890,104 @@ def evaluate_results(baseline_pickle_name,
                                                overwrite_existing_files=(overwrite),
                                                output_path=output_directory,
                                                output_filetype=output_filetype,
-                                               papermode=papermode)
+                                               papermode=papermode,
+                                               writer_threads=writer_threads,
+                                               max_pending_figures=max_pending_figures,
+                                               plot_family_patterns=parse_pattern_list(plot_families),
+                                               metric_patterns=parse_pattern_list(metrics),
+                                               axes_patterns=parse_pattern_list(axes),
+                                               filter_patterns=parse_pattern_list(filters),
+                                               sample_fraction=sample_fraction,
+                                               per_cell_limit=per_cell_limit,
+                                               sample_seed=sample_seed,
+                                               ecdf_backend=ecdf_backend,
+                                               ecdf_points=ecdf_points)
+
+
+
+@cli.command(short_help="updates heatmaps while the experiments are still running")
+@click.argument('baseline_shard_directory', type=click.Path())     #result shard directory in ALIB_EXPERIMENT_HOME/input of the baseline experiment
+@click.argument('randround_shard_directory', type=click.Path())    #result shard directory in ALIB_EXPERIMENT_HOME/input of the randround experiment
+@click.argument('output_directory', type=click.Path())             #path to which the heatmaps will be written
+@click.option('--baseline_algorithm_id', type=click.STRING, default=None, help="algorithm id of baseline algorithm; if not given it will be asked for.")
+@click.option('--baseline_execution_config', type=click.INT, default=None, help="execution (configuration) id of baseline alg; if not given it will be asked for.")
+@click.option('--randround_algorithm_id', type=click.STRING, default=None, help="algorithm id of randround algorithm; if not given it will be asked for.")
+@click.option('--randround_execution_config', type=click.INT, default=None, help="execution (configuration) id of randround alg; if not given it will be asked for.")
+@click.option('--poll_interval', type=click.FloatRange(min=0.0), default=60.0, help="seconds between looking for new result shards")
+@click.option('--render_interval', type=click.FloatRange(min=0.0), default=300.0, help="minimal number of seconds between re-rendering changed heatmaps")
+@click.option('--stop_when_complete/--keep_watching', default=True, help="stop once all scenarios were solved by both algorithms?")
+@click.option('--papermode/--non-papermode', default=True, help="output 'paper-ready' figures or figures containing additional statistical data?")
+@click.option('--output_filetype', type=click.Choice(['png', 'pdf', 'eps']), default="png", help="the filetype which shall be created")
+@click.option('--metrics', type=click.STRING, default=None, help="comma separated glob patterns selecting the metrics (by filename) to plot. "
+                                                                 "Example: \"max_*_load,ECDF_*\"")
+@click.option('--axes', type=click.STRING, default=None, help="comma separated glob patterns selecting the heatmap axes (by foldername). "
+                                                              "Example: \"AXES_RESOURCES,*_vs_SUBSTRATES\"")
+@click.option('--reduction_processes', type=click.IntRange(min=1), default=1, help="number of processes reducing new result shards")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for stdout")
+def watch(baseline_shard_directory,
+          randround_shard_directory,
+          output_directory,
+          baseline_algorithm_id,
+          baseline_execution_config,
+          randround_algorithm_id,
+          randround_execution_config,
+          poll_interval,
+          render_interval,
+          stop_when_complete,
+          papermode,
+          output_filetype,
+          metrics,
+          axes,
+          reduction_processes,
+          log_level_print,
+          log_level_file):
+    """ Periodically reduces the result shards completed since the last poll (see start-experiment
+        --sharded_results) and adds them to the heatmaps of evaluate-results. Heatmaps whose values changed are
+        re-rendered within output_directory at most every render_interval seconds. Directories of reduced
+        result shards may be given as well.
+    """
+
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "watch_{}_{}.log".format(os.path.basename(os.path.normpath(baseline_shard_directory)),
+                                                     os.path.basename(os.path.normpath(randround_shard_directory))))
+    initialize_logger(log_file, log_level_print, log_level_file, allow_override=True)
+
+    baseline_shard_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, baseline_shard_directory)
+    randround_shard_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, randround_shard_directory)
+
+    #get root logger
+    logger = logging.getLogger()
+
+    baseline_source = live_evaluation.WatchedShardDirectory(baseline_shard_path, processes=reduction_processes)
+    randround_source = live_evaluation.WatchedShardDirectory(randround_shard_path, processes=reduction_processes)
+
+    logger.info("Loading algorithm identifiers and execution ids..")
+    baseline_source.select(*query_algorithm_id_and_execution_id(logger,
+                                                                baseline_shard_directory,
+                                                                baseline_source.execution_parameter_container,
+                                                                baseline_algorithm_id,
+                                                                baseline_execution_config))
+    randround_source.select(*query_algorithm_id_and_execution_id(logger,
+                                                                 randround_shard_directory,
+                                                                 randround_source.execution_parameter_container,
+                                                                 randround_algorithm_id,
+                                                                 randround_execution_config))
+
+    output_directory = os.path.normpath(output_directory)
+    logger.info("Watching {} and {}; heatmaps are written to {}".format(baseline_shard_path, randround_shard_path, output_directory))
+    live = live_evaluation.LiveEvaluation(baseline_source,
+                                          randround_source,
+                                          output_directory,
+                                          output_filetype=output_filetype,
+                                          paper_mode=papermode,
+                                          metric_patterns=parse_pattern_list(metrics),
+                                          axes_patterns=parse_pattern_list(axes))
+    live_evaluation.watch(live,
+                          poll_interval=poll_interval,
+                          render_interval=render_interval,
+                          stop_when_complete=stop_when_complete)
 
 
 
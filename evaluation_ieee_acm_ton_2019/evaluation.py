@@ -26,10 +26,14 @@
 This module handles all plotting related evaluation.
 """
 
+import io
 import os
-import pickle
+import random
 import sys
+import threading
+from fnmatch import fnmatchcase
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from itertools import combinations, product
 from time import gmtime, strftime
 
@@ -40,7 +44,12 @@ import matplotlib.lines as mlines
 import matplotlib.pyplot as plt
 import numpy as np
 
-from alib import solutions, util, scenariogeneration
+from alib import solutions, util
+
+from . import pickle_io
+from . import plot_data
+from . import quantile_sketch
+from . import topology_index
 
 REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
 
@@ -50,6 +59,66 @@ OUTPUT_FILETYPE = "png"
 logger = util.get_logger(__name__, make_file=False, propagate=True)
 
 
+class FigureWriter(object):
+    ''' Writes finished figures in a pool of background threads, such that the (often slow) output of a figure
+        overlaps with the construction of the next one. As Matplotlib is not thread-safe, figures are rendered and
+        encoded in the calling thread; the threads only create the output directories and write the encoded bytes.
+        At most max_pending_figures encoded figures are held in memory: submitting further figures blocks until a
+        write has finished. Output directories are only created once per path.
+    '''
+
+    def __init__(self, number_of_threads=2, max_pending_figures=8):
+        if number_of_threads < 1:
+            raise RuntimeError("The figure writer requires at least one thread.")
+        self._executor = ThreadPoolExecutor(max_workers=number_of_threads, thread_name_prefix="figure_writer")
+        self._pending_figures = threading.BoundedSemaphore(max(1, max_pending_figures))
+        self._created_directories = set()
+        self._directory_lock = threading.Lock()
+        self._futures = []
+
+    def _ensure_directory_exists(self, output_path):
+        with self._directory_lock:
+            if output_path in self._created_directories:
+                return
+            os.makedirs(output_path, exist_ok=True)
+            self._created_directories.add(output_path)
+
+    def _write(self, encoded_figure, output_path, filename):
+        try:
+            self._ensure_directory_exists(output_path)
+            with open(filename, "wb") as f:
+                f.write(encoded_figure)
+        finally:
+            self._pending_figures.release()
+
+    def submit(self, figure, output_path, filename):
+        ''' Encodes the figure in the format given by the extension of filename and queues writing it. '''
+        logger.info("saving plot: {}".format(filename))
+        encoded_figure = io.BytesIO()
+        figure.savefig(encoded_figure, format=os.path.splitext(filename)[1][1:] or None)
+        self._pending_figures.acquire()
+        try:
+            future = self._executor.submit(self._write, encoded_figure.getvalue(), output_path, filename)
+        except BaseException:
+            self._pending_figures.release()
+            raise
+        self._futures = [f for f in self._futures if not f.done() or f.exception() is not None]
+        self._futures.append(future)
+
+    def flush(self):
+        ''' Waits until all submitted figures are written and raises the first error encountered (if any).
+        '''
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+
 class HeatmapPlotType(object):
     Simple_MCF = 0              #a plot only for ClassicMCFResult data
     Simple_RRT = 1              #a plot only for RandomizedRoundingTriumvirate data
@@ -467,44 +536,17 @@ def compute_max_load(result_summary):
 
 
 def shortened_topology_name(original_topology_name):
-    if original_topology_name == "Uunet":
-        return "UU"
-    elif original_topology_name == "Surfnet":
-        return "SN"
-    elif original_topology_name == "Geant2012":
-        return "GE"
-    elif original_topology_name == "Ntt":
-        return "NT"
-    elif original_topology_name == "DeutscheTelekom":
-        return "DT"
-    else:
+    metadata = topology_index.lookup_topology_metadata(original_topology_name)
+    if metadata is None:
         return None
-
-_topology_size_dict = {}
+    return metadata.short_name
 
 
 def lookup_number_of_nodes_in_topology(original_topology_name):
-    if original_topology_name in _topology_size_dict:
-        return _topology_size_dict[original_topology_name]
-    else:
-
-        reader = scenariogeneration.TopologyZooReader()
-
-        raw_parameters = {"topology": original_topology_name,
-                          "node_types": ["universal"],
-                          "node_capacity": 100.0,
-                          "edge_capacity": 100.0,
-                          "node_type_distribution": 1.0}
-
-        path_to_topology  =   os.path.join(scenariogeneration.DATA_PATH, "topologyZoo", original_topology_name + ".yml")
-        print("trying to parse {} ".format(path_to_topology))
-        graph = reader.read_from_yaml(raw_parameters)
-        if graph is not None:
-            _topology_size_dict[original_topology_name] = graph.get_number_of_nodes()
-        else:
-            _topology_size_dict[original_topology_name] = None
-
-        return _topology_size_dict[original_topology_name]
+    metadata = topology_index.lookup_topology_metadata(original_topology_name)
+    if metadata is None:
+        return None
+    return metadata.number_of_nodes
 
 
 def select_scenarios_with_high_objective_gap_or_zero_requests(dc_baseline, algorithm_name,
@@ -643,10 +685,77 @@ def lookup_scenario_parameter_room_dicts_on_path(scenario_parameter_space_dict,
             raise RuntimeError("Could not lookup dicts.")
     return dicts_on_path
 
+def enumerate_varying_parameters(scenario_parameter_space_dict, path=None):
+    ''' Returns a list of (parameter name, path, values) for all generation parameters of the scenario parameter room
+        taking more than a single value. The paths agree with the ones returned by extract_parameter_range.
+    '''
+    if path is None:
+        path = []
+    result = []
+    if not isinstance(scenario_parameter_space_dict, dict):
+        return result
+    for key in sorted(scenario_parameter_space_dict.keys()):
+        value = scenario_parameter_space_dict[key]
+        if isinstance(value, dict):
+            result.extend(enumerate_varying_parameters(value, path + [key]))
+        elif isinstance(value, list):
+            if len(value) == 1 and isinstance(value[0], dict):
+                result.extend(enumerate_varying_parameters(value[0], path + [key, 0]))
+            elif len(value) > 1 and not any(isinstance(element, dict) for element in value):
+                result.append((key, path + [key], value))
+    return result
+
+
+def select_stratified_scenario_subset(scenario_parameter_space_dict,
+                                      scenario_parameter_dict,
+                                      scenario_ids,
+                                      sample_fraction=None,
+                                      per_cell_limit=None,
+                                      seed=0):
+    ''' Selects a deterministic subset of the given scenario ids which is balanced across all combinations of
+        generation parameters ("cells"): from each cell either the given fraction (at least one scenario) or at most
+        per_cell_limit many scenarios are selected. If both are given, the smaller number is used.
+        The selection within a cell only depends on the seed and the cell itself.
+    '''
+    if sample_fraction is None and per_cell_limit is None:
+        return set(scenario_ids)
+    if sample_fraction is not None and not (0.0 < sample_fraction <= 1.0):
+        raise RuntimeError("The sample fraction must lie in (0,1] but is {}.".format(sample_fraction))
+    if per_cell_limit is not None and per_cell_limit < 1:
+        raise RuntimeError("The per cell limit must be positive but is {}.".format(per_cell_limit))
+
+    scenario_ids = set(scenario_ids)
+    cell_of_scenario = {scenario_id: [] for scenario_id in scenario_ids}
+    for parameter, path, values in enumerate_varying_parameters(scenario_parameter_space_dict):
+        for value in values:
+            for scenario_id in lookup_scenarios_having_specific_values(scenario_parameter_dict, path, value) & scenario_ids:
+                cell_of_scenario[scenario_id].append((parameter, value))
+
+    cells = {}
+    for scenario_id, cell in cell_of_scenario.items():
+        cells.setdefault(tuple(cell), []).append(scenario_id)
+
+    result = set()
+    for cell, cell_scenario_ids in cells.items():
+        number_to_select = len(cell_scenario_ids)
+        if sample_fraction is not None:
+            number_to_select = max(1, int(round(sample_fraction * len(cell_scenario_ids))))
+        if per_cell_limit is not None:
+            number_to_select = min(number_to_select, per_cell_limit)
+        cell_scenario_ids = sorted(cell_scenario_ids)
+        random.Random("{}_{}".format(seed, cell)).shuffle(cell_scenario_ids)
+        result.update(cell_scenario_ids[:number_to_select])
+    return result
+
+
 def load_reduced_pickle(reduced_pickle):
-    with open(reduced_pickle, "rb") as f:
-        data = pickle.load(f)
-    return data
+    return pickle_io.load_file(reduced_pickle)
+
+
+def get_scenario_ids_with_solution(scenario_solution_storage, algorithm_id, execution_id):
+    return set(scenario_id for scenario_id, execution_solution_dict
+               in scenario_solution_storage.algorithm_scenario_solution_dictionary.get(algorithm_id, {}).items()
+               if execution_id in execution_solution_dict)
 
 class AbstractPlotter(object):
     ''' Abstract Plotter interface providing functionality used by the majority of plotting classes of this module.
@@ -662,7 +771,9 @@ class AbstractPlotter(object):
                  save_plot=True,
                  overwrite_existing_files=False,
                  forbidden_scenario_ids=None,
-                 paper_mode=True
+                 paper_mode=True,
+                 figure_writer=None,
+                 title_annotation=None
                  ):
         self.output_path = output_path
         self.output_filetype = output_filetype
@@ -683,6 +794,8 @@ class AbstractPlotter(object):
         else:
             self.forbidden_scenario_ids = forbidden_scenario_ids
         self.paper_mode=paper_mode
+        self.figure_writer = figure_writer
+        self.title_annotation = title_annotation
 
 
 
@@ -726,12 +839,22 @@ class AbstractPlotter(object):
         spd = self.scenario_parameter_dict
         return lookup_scenarios_having_specific_values(spd, axis_path, axis_value)
 
+    def _annotate_title(self, title):
+        if self.title_annotation:
+            return title + "\n" + self.title_annotation
+        return title
+
     def _show_and_or_save_plots(self, output_path, filename):
         plt.tight_layout()
+        if self.save_plot and self.figure_writer is not None and not self.show_plot:
+            figure = plt.gcf()
+            self.figure_writer.submit(figure, output_path, filename)
+            plt.close(figure)
+            return
         if self.save_plot:
             if not os.path.exists(output_path):
                 os.makedirs(output_path)
-            print("saving plot: {}".format(filename))
+            logger.info("saving plot: {}".format(filename))
             plt.savefig(filename)
         if self.show_plot:
             plt.show()
@@ -743,6 +866,98 @@ class AbstractPlotter(object):
         raise RuntimeError("This is an abstract method")
 
 
+def get_heatmap_axes_parameters(scenario_parameter_space_dict, heatmap_axes_specification):
+    ''' Returns the paths and the (sorted) values of the x- and the y-axis parameter of the heatmap axes. Topologies
+        are sorted by their number of nodes.
+    '''
+    path_x_axis, xaxis_parameters = extract_parameter_range(scenario_parameter_space_dict, heatmap_axes_specification['x_axis_parameter'])
+    path_y_axis, yaxis_parameters = extract_parameter_range(scenario_parameter_space_dict, heatmap_axes_specification['y_axis_parameter'])
+    xaxis_parameters.sort()
+    yaxis_parameters.sort()
+    if "topology" in path_y_axis: #detect whether y-axis is substrates
+        yaxis_parameters.sort(key=lambda x: lookup_number_of_nodes_in_topology(x))
+    return path_x_axis, xaxis_parameters, path_y_axis, yaxis_parameters
+
+
+def draw_heatmap(cell_means,
+                 xaxis_parameters,
+                 path_y_axis,
+                 yaxis_parameters,
+                 heatmap_metric_specification,
+                 heatmap_axes_specification,
+                 title,
+                 paper_mode=True):
+    ''' Draws the heatmap of the cell means (indexed by y and x index) into a new figure, labelling each cell with
+        its (rounded) mean.
+    '''
+    # all heatmap values will be stored in X
+    X = np.zeros(cell_means.shape)
+
+    column_labels = yaxis_parameters
+    if "topology" in path_y_axis: #detect whether y-axis is substrates
+        column_labels = [shortened_topology_name(topology_name) for topology_name in yaxis_parameters]
+    row_labels = xaxis_parameters
+
+    fig, ax = plt.subplots(figsize=(5, 4))
+
+    for y_index in range(cell_means.shape[0]):
+        for x_index in range(cell_means.shape[1]):
+            m = cell_means[y_index, x_index]
+            if np.isnan(m):
+                # cells without any values (e.g. of results of running experiments)
+                rounded_m = np.nan
+            elif 'rounding_function' in heatmap_metric_specification:
+                rounded_m = heatmap_metric_specification['rounding_function'](m)
+            else:
+                rounded_m = float("{0:.1f}".format(round(m, 2)))
+
+            plt.text(x_index + .5,
+                     y_index + .45,
+                     rounded_m,
+                     verticalalignment="center",
+                     horizontalalignment="center",
+                     fontsize=17.5,
+                     fontname="Courier New",
+                     # family="monospace",
+                     color='w',
+                     path_effects=[PathEffects.withStroke(linewidth=4, foreground="k")]
+                     )
+
+            X[y_index, x_index] = rounded_m
+
+    if paper_mode:
+        ax.set_title(title, fontsize=17)
+    else:
+        ax.set_title(title)
+
+    heatmap = ax.pcolor(X,
+                        cmap=heatmap_metric_specification['cmap'],
+                        vmin=heatmap_metric_specification['vmin'],
+                        vmax=heatmap_metric_specification['vmax'])
+
+    if not paper_mode:
+        fig.colorbar(heatmap, label=heatmap_metric_specification['name'] + ' - mean in blue')
+    else:
+        ticks = heatmap_metric_specification['colorbar_ticks']
+        tick_labels = [str(tick).ljust(3) for tick in ticks]
+        cbar = fig.colorbar(heatmap)
+        cbar.set_ticks(ticks)
+        cbar.set_ticklabels(tick_labels)
+        #for label in cbar.ax.get_yticklabels():
+        #    label.set_fontproperties(font_manager.FontProperties(family="Courier New",weight='bold'))
+
+        cbar.ax.tick_params(labelsize=15.5)
+
+    ax.set_yticks(np.arange(X.shape[0]) + 0.5, minor=False)
+    ax.set_xticks(np.arange(X.shape[1]) + 0.5, minor=False)
+
+    ax.set_xticklabels(row_labels, minor=False, fontsize=15.5)
+    ax.set_xlabel(heatmap_axes_specification['x_axis_title'], fontsize=16)
+    ax.set_ylabel(heatmap_axes_specification['y_axis_title'], fontsize=16)
+    ax.set_yticklabels(column_labels, minor=False, fontsize=15.5)
+    return fig
+
+
 class SingleHeatmapPlotter(AbstractPlotter):
 
     def __init__(self,
@@ -758,11 +973,15 @@ class SingleHeatmapPlotter(AbstractPlotter):
                  save_plot=True,
                  overwrite_existing_files=False,
                  forbidden_scenario_ids=None,
-                 paper_mode=True
+                 paper_mode=True,
+                 figure_writer=None,
+                 title_annotation=None
                  ):
         super(SingleHeatmapPlotter, self).__init__(output_path, output_filetype, scenario_solution_storage,
                                                    algorithm_id, execution_id, show_plot, save_plot,
-                                                   overwrite_existing_files, forbidden_scenario_ids, paper_mode)
+                                                   overwrite_existing_files, forbidden_scenario_ids, paper_mode,
+                                                   figure_writer,
+                                                   title_annotation)
         if heatmap_plot_type is None or heatmap_plot_type not in HeatmapPlotType.VALUE_RANGE:
             raise RuntimeError("heatmap_plot_type {} is not a valid input. Must be of type HeatmapPlotType.".format(heatmap_plot_type))
         self.heatmap_plot_type = heatmap_plot_type
@@ -775,7 +994,7 @@ class SingleHeatmapPlotter(AbstractPlotter):
             self.list_of_metric_specifications = heatmap_specifications_per_type[self.heatmap_plot_type]
         else:
             for metric_specification in list_of_metric_specifications:
-                if metric_specification.plot_type != self.heatmap_plot_type:
+                if metric_specification['plot_type'] != self.heatmap_plot_type:
                     raise RuntimeError("The metric specification {} does not agree with the plot type {}.".format(metric_specification, self.heatmap_plot_type))
             self.list_of_metric_specifications = list_of_metric_specifications
 
@@ -828,29 +1047,10 @@ class SingleHeatmapPlotter(AbstractPlotter):
                     logger.debug("Skipping generation of {} as the filter specification conflicts with the axes specification.")
                     return
 
-        path_x_axis, xaxis_parameters = extract_parameter_range(sps, heatmap_axes_specification['x_axis_parameter'])
-        path_y_axis, yaxis_parameters = extract_parameter_range(sps, heatmap_axes_specification['y_axis_parameter'])
-
-
-        # for heatmap plot
-        xaxis_parameters.sort()
-        yaxis_parameters.sort()
-
-        # all heatmap values will be stored in X
-        X = np.zeros((len(yaxis_parameters), len(xaxis_parameters)))
+        path_x_axis, xaxis_parameters, path_y_axis, yaxis_parameters = get_heatmap_axes_parameters(sps, heatmap_axes_specification)
 
-        column_labels = yaxis_parameters
-
-        if "topology" in path_y_axis: #detect whether y-axis is substrates
-            yaxis_parameters.sort(key=lambda x: lookup_number_of_nodes_in_topology(x))
-            actual_labels = []
-            for topology_name in yaxis_parameters:
-                actual_labels.append(shortened_topology_name(topology_name))
-            column_labels = actual_labels
-
-
-        row_labels = xaxis_parameters
-        fig, ax = plt.subplots(figsize=(5, 4))
+        # mean of each cell of the heatmap
+        cell_means = np.zeros((len(yaxis_parameters), len(xaxis_parameters)))
 
         min_number_of_observed_values = 10000000000000
         max_number_of_observed_values = 0
@@ -885,25 +1085,7 @@ class SingleHeatmapPlotter(AbstractPlotter):
                 logger.debug("values are {}".format(values))
                 m = np.nanmean(values)
                 logger.debug("mean is {}".format(m))
-
-                if 'rounding_function' in heatmap_metric_specification:
-                    rounded_m = heatmap_metric_specification['rounding_function'](m)
-                else:
-                    rounded_m = float("{0:.1f}".format(round(m, 2)))
-
-                plt.text(x_index + .5,
-                         y_index + .45,
-                         rounded_m,
-                         verticalalignment="center",
-                         horizontalalignment="center",
-                         fontsize=17.5,
-                         fontname="Courier New",
-                         # family="monospace",
-                         color='w',
-                         path_effects=[PathEffects.withStroke(linewidth=4, foreground="k")]
-                         )
-
-                X[y_index, x_index] = rounded_m
+                cell_means[y_index, x_index] = m
 
         if min_number_of_observed_values == max_number_of_observed_values:
             solution_count_string = "{} values per square".format(min_number_of_observed_values)
@@ -912,7 +1094,7 @@ class SingleHeatmapPlotter(AbstractPlotter):
                                                                                  max_number_of_observed_values)
 
         if self.paper_mode:
-            ax.set_title(heatmap_metric_specification['name'], fontsize=17)
+            title = self._annotate_title(heatmap_metric_specification['name'])
         else:
             title = heatmap_metric_specification['name'] + "\n"
             if filter_specifications:
@@ -921,34 +1103,16 @@ class SingleHeatmapPlotter(AbstractPlotter):
             title += "min: {:.2f}; mean: {:.2f}; max: {:.2f}".format(np.nanmin(observed_values),
                                                          np.nanmean(observed_values),
                                                          np.nanmax(observed_values))
+            title = self._annotate_title(title)
 
-            ax.set_title(title)
-
-        heatmap = ax.pcolor(X,
-                            cmap=heatmap_metric_specification['cmap'],
-                            vmin=heatmap_metric_specification['vmin'],
-                            vmax=heatmap_metric_specification['vmax'])
-
-        if not self.paper_mode:
-            fig.colorbar(heatmap, label=heatmap_metric_specification['name'] + ' - mean in blue')
-        else:
-            ticks = heatmap_metric_specification['colorbar_ticks']
-            tick_labels = [str(tick).ljust(3) for tick in ticks]
-            cbar = fig.colorbar(heatmap)
-            cbar.set_ticks(ticks)
-            cbar.set_ticklabels(tick_labels)
-            #for label in cbar.ax.get_yticklabels():
-            #    label.set_fontproperties(font_manager.FontProperties(family="Courier New",weight='bold'))
-
-            cbar.ax.tick_params(labelsize=15.5)
-
-        ax.set_yticks(np.arange(X.shape[0]) + 0.5, minor=False)
-        ax.set_xticks(np.arange(X.shape[1]) + 0.5, minor=False)
-
-        ax.set_xticklabels(row_labels, minor=False, fontsize=15.5)
-        ax.set_xlabel(heatmap_axes_specification['x_axis_title'], fontsize=16)
-        ax.set_ylabel(heatmap_axes_specification['y_axis_title'], fontsize=16)
-        ax.set_yticklabels(column_labels, minor=False, fontsize=15.5)
+        draw_heatmap(cell_means,
+                     xaxis_parameters,
+                     path_y_axis,
+                     yaxis_parameters,
+                     heatmap_metric_specification,
+                     heatmap_axes_specification,
+                     title,
+                     self.paper_mode)
 
         self._show_and_or_save_plots(output_path, filename)
 
@@ -971,7 +1135,9 @@ class ComparisonHeatmapPlotter(SingleHeatmapPlotter):
                  save_plot=True,
                  overwrite_existing_files=False,
                  forbidden_scenario_ids=None,
-                 paper_mode=True
+                 paper_mode=True,
+                 figure_writer=None,
+                 title_annotation=None
                  ):
         super(ComparisonHeatmapPlotter, self).__init__(output_path,
                                                        output_filetype,
@@ -985,7 +1151,9 @@ class ComparisonHeatmapPlotter(SingleHeatmapPlotter):
                                                        save_plot,
                                                        overwrite_existing_files,
                                                        forbidden_scenario_ids,
-                                                       paper_mode)
+                                                       paper_mode,
+                                                       figure_writer,
+                                                       title_annotation)
         self.other_scenario_solution_storage = other_scenario_solution_storage
         self.other_algorithm_id = other_algorithm_id
         self.other_execution_id = other_execution_id
@@ -1001,8 +1169,21 @@ class ComparisonHeatmapPlotter(SingleHeatmapPlotter):
 
 
 
+ECDF_BACKEND_EXACT = "exact"
+ECDF_BACKEND_SKETCH = "sketch"
+ECDF_BACKENDS = [ECDF_BACKEND_EXACT, ECDF_BACKEND_SKETCH]
+
+
 class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
 
+    OUTPUT_NAMES = ["ECDF_load",
+                    "ECDF_objective",
+                    "ECDF_bound",
+                    "SCATTER_obj_vs_load_min_aug",
+                    "SCATTER_obj_vs_load_max_profit",
+                    "SCATTER_obj_vs_load_wo_viol",
+                    "SCATTER_obj_vs_load_mdk"]
+
     def __init__(self,
                  output_path,
                  output_filetype,
@@ -1012,22 +1193,43 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
                  randround_solution_storage,
                  randround_algorithm_id,
                  randround_execution_id,
+                 list_of_output_names=None,
+                 ecdf_backend="exact",
+                 ecdf_points=200,
                  show_plot=False,
                  save_plot=True,
                  overwrite_existing_files=False,
                  forbidden_scenario_ids=None,
-                 paper_mode=True
+                 paper_mode=True,
+                 figure_writer=None,
+                 title_annotation=None
                  ):
         super(ComparisonBaselineVsRRT_Scatter_and_ECDF, self).__init__(output_path, output_filetype, baseline_solution_storage,
                                                                        baseline_algorithm_id, baseline_execution_id, show_plot, save_plot,
-                                                                       overwrite_existing_files, forbidden_scenario_ids, paper_mode)
-        if randround_algorithm_id != "RandomizedRoundingTriumvirate":
-            raise RuntimeError("The capacity violation plot can only be applied to RandomizedRoundingTriumvirate results.")
+                                                                       overwrite_existing_files, forbidden_scenario_ids, paper_mode,
+                                                                       figure_writer,
+                                                                       title_annotation)
+        if "collection_of_samples_with_violations" not in plot_data.get_result_extractor(randround_algorithm_id).FIELDS:
+            raise RuntimeError("The capacity violation plot can only be applied to results containing rounding samples, "
+                               "which the results of {} do not.".format(randround_algorithm_id))
 
         self.randround_solution_storage = randround_solution_storage
         self.randround_algorithm_id = randround_algorithm_id
         self.randround_execution_id = randround_execution_id
 
+        if list_of_output_names is None:
+            self.list_of_output_names = list(self.OUTPUT_NAMES)
+        else:
+            for output_name in list_of_output_names:
+                if output_name not in self.OUTPUT_NAMES:
+                    raise RuntimeError("The output {} is not known. Must be one of {}.".format(output_name, self.OUTPUT_NAMES))
+            self.list_of_output_names = list_of_output_names
+
+        if ecdf_backend not in ECDF_BACKENDS:
+            raise RuntimeError("The ECDF backend {} is not known. Must be one of {}.".format(ecdf_backend, ECDF_BACKENDS))
+        self.ecdf_backend = ecdf_backend
+        self.ecdf_points = ecdf_points
+
         self._randround_data_names = ['min_aug', 'max_profit', 'wo_viol', 'mdk']
         self._randround_data_names_with_baseline = ['min_aug', 'max_profit', 'wo_viol', 'mdk', "baseline"]
 
@@ -1075,6 +1277,48 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
         self._load_result = {randround_data_name: [np.NaN, np.NaN] for randround_data_name in self._randround_data_names}
 
 
+    def _compute_ecdf(self, values):
+        ''' Returns the x and y values of the ECDF of the given values together with the maximal value. The exact
+            backend plots every value, while the sketch backend plots at most self.ecdf_points quantiles.
+            NaN values are accounted for in the total in both cases. Without any (non-NaN) value, the ECDF is empty
+            and the maximal value is NaN.
+        '''
+        values = np.asarray(values, dtype=float)
+        if np.all(np.isnan(values)):
+            return np.empty(0), np.empty(0), np.nan
+        if self.ecdf_backend == ECDF_BACKEND_SKETCH:
+            return self._compute_ecdf_of_sketch(quantile_sketch.QuantileSketch.from_values(values))
+        sorted_data = np.sort(values)
+        yvals = np.arange(1, len(sorted_data) + 1) / float(len(sorted_data))
+        return sorted_data, yvals, np.nanmax(sorted_data)
+
+    def _compute_ecdf_of_sketch(self, sketch):
+        xvals, yvals = sketch.ecdf_points(self.ecdf_points, count_nan=True)
+        return xvals, yvals, sketch.max
+
+    def _lookup_stored_load_sketches(self, filter_specifications):
+        ''' Returns the quantile sketches of the loads stored by the reducers (see plot_data.build_quantile_sketches)
+            as (data name, resource) -> sketch, if the sketch backend is used and the ECDF covers all scenarios.
+            Otherwise, or if the reduced results contain no sketches, None is returned.
+        '''
+        if self.ecdf_backend != ECDF_BACKEND_SKETCH or filter_specifications or self.forbidden_scenario_ids:
+            return None
+        baseline_sketches = getattr(self.scenario_solution_storage, "quantile_sketches", None)
+        randround_sketches = getattr(self.randround_solution_storage, "quantile_sketches", None)
+        if baseline_sketches is None or randround_sketches is None:
+            return None
+        sketches = {}
+        for data_name in self._randround_data_names_with_baseline:
+            if data_name == "baseline":
+                sketch_per_key = baseline_sketches.get((self.algorithm_id, self.execution_id), {})
+            else:
+                sketch_per_key = randround_sketches.get((self.randround_algorithm_id, self.randround_execution_id), {})
+            for resource in ("node", "edge"):
+                if (data_name, resource) not in sketch_per_key:
+                    return None
+                sketches[(data_name, resource)] = sketch_per_key[(data_name, resource)]
+        return sketches
+
     def _lookup_baseline_solution(self, scenario_id):
         return self.scenario_solution_storage.get_solutions_by_scenario_index(scenario_id)[self.algorithm_id][self.execution_id]
 
@@ -1220,9 +1464,12 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
 
 
     def plot_figure(self, filter_specifications):
-        self.plot_figure_ecdf_load(filter_specifications)
-        self.plot_figure_ecdf_objective(filter_specifications)
-        self.plot_bound_ecdf(filter_specifications)
+        if "ECDF_load" in self.list_of_output_names:
+            self.plot_figure_ecdf_load(filter_specifications)
+        if "ECDF_objective" in self.list_of_output_names:
+            self.plot_figure_ecdf_objective(filter_specifications)
+        if "ECDF_bound" in self.list_of_output_names:
+            self.plot_bound_ecdf(filter_specifications)
         self.plot_scatter_obj_vs_load(filter_specifications)
 
     def plot_figure_ecdf_load(self, filter_specifications):
@@ -1244,7 +1491,9 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
         if self.forbidden_scenario_ids:
             scenario_ids = scenario_ids - self.forbidden_scenario_ids
 
-        result = self.compute_maximal_load_arrays(scenario_ids)
+        stored_sketches = self._lookup_stored_load_sketches(filter_specifications)
+        if stored_sketches is None:
+            result = self.compute_maximal_load_arrays(scenario_ids)
 
         fix, ax = plt.subplots(figsize=(5, 4))
 
@@ -1256,18 +1505,20 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
         max_observed_value = 0
         for data_name in self._randround_data_names_with_baseline:
             #sorted_data_cum = np.sort(np.maximum(result[data_name][0], result[data_name][1]))
-            sorted_data_node = np.sort(result[data_name][0])
-            sorted_data_edge = np.sort(result[data_name][1])
-            max_observed_value = np.maximum(max_observed_value, sorted_data_node[-1])
-            max_observed_value = np.maximum(max_observed_value, sorted_data_edge[-1])
-
-            yvals = np.arange(1,len(sorted_data_node)+1) / float(len(sorted_data_node))
+            if stored_sketches is not None:
+                sorted_data_node, yvals_node, max_node = self._compute_ecdf_of_sketch(stored_sketches[(data_name, "node")])
+                sorted_data_edge, yvals_edge, max_edge = self._compute_ecdf_of_sketch(stored_sketches[(data_name, "edge")])
+            else:
+                sorted_data_node, yvals_node, max_node = self._compute_ecdf(result[data_name][0])
+                sorted_data_edge, yvals_edge, max_edge = self._compute_ecdf(result[data_name][1])
+            max_observed_value = np.fmax(max_observed_value, max_node)
+            max_observed_value = np.fmax(max_observed_value, max_edge)
 
             second_legend_handlers.append(matplotlib.lines.Line2D([], [], color=self.colors[data_name], linestyle="-", label="${}$".format(self.math_label_names[data_name])))
 
             #ax.plot(sorted_data_cum, yvals, color=self.colors[data_name], linestyle="-")
-            ax.plot(sorted_data_node, yvals, color=self.colors[data_name], linestyle="-.")
-            ax.plot(sorted_data_edge, yvals, color=self.colors[data_name], linestyle="-")
+            ax.plot(sorted_data_node, yvals_node, color=self.colors[data_name], linestyle="-.")
+            ax.plot(sorted_data_edge, yvals_edge, color=self.colors[data_name], linestyle="-")
 
         first_legend = plt.legend(handles=[node_line, edge_line], loc=4, fontsize=14, title="Resource", handletextpad=.35, borderaxespad=0.175, borderpad=0.2)
         plt.setp(first_legend.get_title(), fontsize=14)
@@ -1282,7 +1533,7 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
         ax.set_xticks([10, 50, 100, 200, 500], minor=False)
         ax.set_xticks([20,30,40,50,60,70,80,90, 300,400], minor=True)
 
-        ax.set_title("ECDF of Resource Loads",fontsize=17)
+        ax.set_title(self._annotate_title("ECDF of Resource Loads"),fontsize=17)
         ax.set_xlabel("Maximum Resource Load [%]", fontsize=16)
         ax.set_ylabel("ECDF", fontsize=16)
         ax.grid(True, which="both")
@@ -1323,17 +1574,15 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
 
         max_observed_value = 0
         for data_name in self._randround_data_names:
-            sorted_data = np.sort(result[data_name])
-            max_observed_value = np.maximum(max_observed_value, sorted_data[-1])
-
-            yvals = np.arange(1,len(sorted_data)+1) / float(len(sorted_data))
+            sorted_data, yvals, max_value = self._compute_ecdf(result[data_name])
+            max_observed_value = np.fmax(max_observed_value, max_value)
 
             ax.plot(sorted_data, yvals, color=self.colors[data_name], linestyle="-", label="${}$".format(self.math_label_names[data_name]))
 
         leg = plt.legend(loc=4, title="Algorithm", fontsize=14, handletextpad=.35, borderaxespad=0.175, borderpad=0.2)
         plt.setp(leg.get_title(), fontsize=14)
 
-        ax.set_title("ECDF of Relative Achieved Profit", fontsize=17)
+        ax.set_title(self._annotate_title("ECDF of Relative Achieved Profit"), fontsize=17)
         ax.set_xlabel("$\mathrm{Profit}({\mathrm{RR}_{\mathrm{Alg}}}) / \mathrm{Profit}({\mathrm{MIP}_{\mathrm{MCF}}})$ [%] ", fontsize=16)
         ax.set_ylabel("ECDF", fontsize=16)
         ax.grid(True, which="both")
@@ -1382,15 +1631,13 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
         for i, number_of_requests in enumerate(self._number_of_requests_list):
 
             result_for_requests = result[number_of_requests][0]
-            sorted_data = np.sort(result_for_requests[~np.isnan(result_for_requests)])
-            max_observed_value = np.maximum(max_observed_value, sorted_data[-1])
-            yvals = np.arange(1,len(sorted_data)+1) / float(len(sorted_data))
+            sorted_data, yvals, max_value = self._compute_ecdf(result_for_requests[~np.isnan(result_for_requests)])
+            max_observed_value = np.fmax(max_observed_value, max_value)
             ax.plot(sorted_data, yvals, color=colors[i], linestyle="-", label="{}".format(number_of_requests), linewidth=1.8)
 
             result_for_requests = result[number_of_requests][1]
-            sorted_data = np.sort(result_for_requests[~np.isnan(result_for_requests)])
-            max_observed_value = np.maximum(max_observed_value, sorted_data[-1])
-            yvals = np.arange(1, len(sorted_data) + 1) / float(len(sorted_data))
+            sorted_data, yvals, max_value = self._compute_ecdf(result_for_requests[~np.isnan(result_for_requests)])
+            max_observed_value = np.fmax(max_observed_value, max_value)
             ax.plot(sorted_data, yvals, color=colors[i], linestyle=":",
                     linewidth=2.4)
 
@@ -1404,7 +1651,7 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
         o_leg = plt.legend(handles=number_requests_legend_handlers, loc=4, title="#Requests", fontsize=14, handletextpad=.35, borderaxespad=0.175, borderpad=0.2)
         plt.setp(o_leg.get_title(), fontsize='15')
 
-        ax.set_title("$\mathrm{LP}_{\mathrm{novel}}$: Formulation Strength", fontsize=17)
+        ax.set_title(self._annotate_title("$\mathrm{LP}_{\mathrm{novel}}$: Formulation Strength"), fontsize=17)
         ax.set_xlabel("Bound($\mathrm{MIP}_{\mathrm{MCF}}$) / Bound($\mathrm{LP}_{\mathrm{novel}}$)", fontsize=16)
         ax.set_ylabel("ECDF", fontsize=16)
 
@@ -1453,6 +1700,9 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
 
             output_filename = "SCATTER_obj_vs_load_{}".format(data_to_plot)
 
+            if output_filename not in self.list_of_output_names:
+                continue
+
             output_path, filename = self._construct_output_path_and_filename(output_filename,
                                                                              filter_specifications)
 
@@ -1535,7 +1785,7 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
             plt.grid(True, which="both")
 
             if self.paper_mode:
-                ax.set_title("Vanilla Rounding Performance", fontsize=17)
+                ax.set_title(self._annotate_title("Vanilla Rounding Performance"), fontsize=17)
             else:
                 title = "Vanilla Rounding Performance\n"
                 #print observed_values_relative_profit
@@ -1547,7 +1797,7 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
                                                                                    np.nanmax(observed_values_load))
 
                 title += "{} of {} points lie outside the displayed area".format(number_of_not_shown_values, len(observed_values_relative_profit))
-                ax.set_title(title, fontsize=10)
+                ax.set_title(self._annotate_title(title), fontsize=10)
 
             xlabel = "$\mathrm{Profit}({" + self.math_label_names[
                 data_to_plot] + "}) / \mathrm{Profit}({\mathrm{MIP}_{\mathrm{MCF}}})$ [%]"
@@ -1559,6 +1809,38 @@ class ComparisonBaselineVsRRT_Scatter_and_ECDF(AbstractPlotter):
 
             self._show_and_or_save_plots(output_path, filename)
 
+"""
+Names of the plot families created by evaluate_baseline_and_randround. Each family corresponds to a single plotter.
+"""
+PLOT_FAMILY_COMPARISON_ECDF_SCATTER = "comparison_ecdf_scatter"
+PLOT_FAMILY_BASELINE_HEATMAPS = "baseline_heatmaps"
+PLOT_FAMILY_RANDROUND_HEATMAPS = "randround_heatmaps"
+PLOT_FAMILY_COMPARISON_HEATMAPS = "comparison_heatmaps"
+
+PLOT_FAMILIES = [PLOT_FAMILY_COMPARISON_ECDF_SCATTER,
+                 PLOT_FAMILY_BASELINE_HEATMAPS,
+                 PLOT_FAMILY_RANDROUND_HEATMAPS,
+                 PLOT_FAMILY_COMPARISON_HEATMAPS]
+
+
+def matches_any_pattern(name, patterns):
+    ''' Returns whether the name matches any of the given glob patterns. If no patterns are given (None), every name
+        is considered to match.
+    '''
+    if patterns is None:
+        return True
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def get_filter_specification_name(filter_specifications):
+    ''' Returns the name of a filter specification as used in the output filenames, e.g. "no_filter" or
+        "number_of_requests_40_node_resource_factor_0.2".
+    '''
+    if not filter_specifications:
+        return "no_filter"
+    return "_".join([spec['parameter'] + "_" + str(spec['value']) for spec in filter_specifications])
+
+
 def _construct_filter_specs(scenario_parameter_space_dict, parameter_filter_keys, maxdepth=3):
     parameter_value_dic = dict()
     for parameter in parameter_filter_keys:
@@ -1864,11 +2146,25 @@ def evaluate_baseline_and_randround(dc_baseline,
                                     papermode=True,
                                     maxdepthfilter=2,
                                     output_path="./",
-                                    output_filetype="png"):
+                                    output_filetype="png",
+                                    writer_threads=2,
+                                    max_pending_figures=8,
+                                    plot_family_patterns=None,
+                                    metric_patterns=None,
+                                    axes_patterns=None,
+                                    filter_patterns=None,
+                                    sample_fraction=None,
+                                    per_cell_limit=None,
+                                    sample_seed=0,
+                                    ecdf_backend=ECDF_BACKEND_EXACT,
+                                    ecdf_points=200):
     """ Main function for evaluation, creating plots and saving them in a specific directory hierarchy.
     A large variety of plots is created. For heatmaps, a generic plotter is used while for general
-    comparison plots (ECDF and scatter) an own class is used. The plots that shall be generated cannot
-    be controlled at the moment but the respective plotters can be easily adjusted.
+    comparison plots (ECDF and scatter) an own class is used. The plots that shall be generated can be
+    selected via lists of glob patterns, which are matched against the plot family names (see PLOT_FAMILIES),
+    the metric filenames (e.g. "max_load" or "ECDF_objective"), the axes foldernames (e.g. "AXES_RESOURCES")
+    and the filter names (e.g. "no_filter" or "number_of_requests_40"). Plots not selected are skipped before
+    any data is extracted.
 
     :param dc_baseline: unpickled datacontainer of baseline experiments (e.g. MIP)
     :param baseline_algorithm_id: algorithm id of the baseline algorithm
@@ -1887,12 +2183,34 @@ def evaluate_baseline_and_randround(dc_baseline,
     :param maxdepthfilter:             length of filter permutations that shall be considered
     :param output_path:                path to which the results shall be written
     :param output_filetype:            filetype supported by matplotlib to export figures
+    :param writer_threads:             number of background threads writing the figures encoded in the main thread;
+                                       0 writes synchronously
+    :param max_pending_figures:        number of finished figures that may wait for being written
+    :param plot_family_patterns:       glob patterns selecting plot families; None selects all
+    :param metric_patterns:            glob patterns selecting metric filenames; None selects all
+    :param axes_patterns:              glob patterns selecting heatmap axes foldernames; None selects all
+    :param filter_patterns:            glob patterns selecting filter names; None selects all
+    :param sample_fraction:            if given, only this fraction of the scenarios of each generation parameter
+                                       combination is evaluated (see select_stratified_scenario_subset)
+    :param per_cell_limit:             if given, at most this many scenarios per generation parameter combination
+                                       are evaluated
+    :param sample_seed:                seed for the (deterministic) selection of the subsampled scenarios
+    :param ecdf_backend:               "exact" plots every value of an ECDF, "sketch" plots ecdf_points quantiles
+                                       computed from a mergeable quantile sketch
+    :param ecdf_points:                number of points per ECDF when using the sketch backend
     :return: None
     """
 
     if forbidden_scenario_ids is None:
         forbidden_scenario_ids = set()
 
+    # results of running experiments (see plot_data.load_reduced_results) may lack solutions of either algorithm
+    incomplete_scenario_ids = (get_scenario_ids_with_solution(dc_baseline, baseline_algorithm_id, baseline_execution_config) ^
+                               get_scenario_ids_with_solution(dc_randround, randround_algorithm_id, randround_execution_config))
+    if incomplete_scenario_ids:
+        logger.warning("{} scenarios are only solved by one of the algorithms and are not evaluated.".format(len(incomplete_scenario_ids)))
+        forbidden_scenario_ids.update(incomplete_scenario_ids)
+
     if exclude_generation_parameters is not None:
         for key, values_to_exclude in exclude_generation_parameters.items():
             parameter_filter_path, parameter_values = extract_parameter_range(
@@ -1922,6 +2240,20 @@ def evaluate_baseline_and_randround(dc_baseline,
                                                   value not in values_to_exclude]
 
 
+    title_annotation = None
+    if sample_fraction is not None or per_cell_limit is not None:
+        scenario_container = dc_baseline.scenario_parameter_container
+        candidate_scenario_ids = set(dc_baseline.algorithm_scenario_solution_dictionary[baseline_algorithm_id].keys()) - forbidden_scenario_ids
+        selected_scenario_ids = select_stratified_scenario_subset(scenario_container.scenarioparameter_room,
+                                                                  scenario_container.scenario_parameter_dict,
+                                                                  candidate_scenario_ids,
+                                                                  sample_fraction=sample_fraction,
+                                                                  per_cell_limit=per_cell_limit,
+                                                                  seed=sample_seed)
+        logger.info("Subsampling: evaluating {} of {} scenarios".format(len(selected_scenario_ids), len(candidate_scenario_ids)))
+        forbidden_scenario_ids.update(candidate_scenario_ids - selected_scenario_ids)
+        title_annotation = "(subsampled: {} of {} scenarios)".format(len(selected_scenario_ids), len(candidate_scenario_ids))
+
     if parameter_filter_keys is not None:
         filter_specs = _construct_filter_specs(dc_baseline.scenario_parameter_container.scenarioparameter_room,
                                                parameter_filter_keys,
@@ -1929,64 +2261,119 @@ def evaluate_baseline_and_randround(dc_baseline,
     else:
         filter_specs = [None]
 
+    filter_specs = [filter_spec for filter_spec in filter_specs
+                    if matches_any_pattern(get_filter_specification_name(filter_spec), filter_patterns)]
+
+    axes_specifications = [axes_specification for axes_specification in global_heatmap_axes_specifications
+                           if matches_any_pattern(axes_specification['foldername'], axes_patterns)]
+
+    def select_metric_specifications(heatmap_plot_type):
+        return [metric_specification for metric_specification in heatmap_specifications_per_type[heatmap_plot_type]
+                if matches_any_pattern(metric_specification['filename'], metric_patterns)]
+
+    def is_family_selected(plot_family, has_selected_outputs):
+        return has_selected_outputs and matches_any_pattern(plot_family, plot_family_patterns)
+
+    ecdf_scatter_output_names = [output_name for output_name in ComparisonBaselineVsRRT_Scatter_and_ECDF.OUTPUT_NAMES
+                                 if matches_any_pattern(output_name, metric_patterns)]
+    baseline_metric_specifications = select_metric_specifications(HeatmapPlotType.Simple_MCF)
+    randround_metric_specifications = select_metric_specifications(HeatmapPlotType.Simple_RRT)
+    comparison_metric_specifications = select_metric_specifications(HeatmapPlotType.Comparison_MCF_vs_RRT)
+
+    figure_writer = None
+    if writer_threads > 0 and save_plot and not show_plot:
+        figure_writer = FigureWriter(number_of_threads=writer_threads, max_pending_figures=max_pending_figures)
+
     #initialize plotters
 
-    baseline_plotter = SingleHeatmapPlotter(output_path=output_path,
-                                            output_filetype=output_filetype,
-                                            scenario_solution_storage=dc_baseline,
-                                            algorithm_id=baseline_algorithm_id,
-                                            execution_id=baseline_execution_config,
-                                            heatmap_plot_type=HeatmapPlotType.Simple_MCF,
-                                            show_plot=show_plot,
-                                            save_plot=save_plot,
-                                            overwrite_existing_files=overwrite_existing_files,
-                                            forbidden_scenario_ids=forbidden_scenario_ids,
-                                            paper_mode=papermode)
-
-    randround_plotter = SingleHeatmapPlotter(output_path=output_path,
-                                            output_filetype=output_filetype,
-                                            scenario_solution_storage=dc_randround,
-                                            algorithm_id=randround_algorithm_id,
-                                            execution_id=randround_execution_config,
-                                            heatmap_plot_type=HeatmapPlotType.Simple_RRT,
-                                            show_plot=show_plot,
-                                            save_plot=save_plot,
-                                            overwrite_existing_files=overwrite_existing_files,
-                                            forbidden_scenario_ids=forbidden_scenario_ids,
-                                            paper_mode=papermode)
-
-    comparison_plotter = ComparisonHeatmapPlotter(output_path=output_path,
-                                                  output_filetype=output_filetype,
-                                                  scenario_solution_storage=dc_baseline,
-                                                  algorithm_id=baseline_algorithm_id,
-                                                  execution_id=baseline_execution_config,
-                                                  other_scenario_solution_storage=dc_randround,
-                                                  other_algorithm_id=randround_algorithm_id,
-                                                  other_execution_id=randround_execution_config,
-                                                  heatmap_plot_type=HeatmapPlotType.Comparison_MCF_vs_RRT,
-                                                  show_plot=show_plot,
-                                                  save_plot=save_plot,
-                                                  overwrite_existing_files=overwrite_existing_files,
-                                                  forbidden_scenario_ids=forbidden_scenario_ids,
-                                                  paper_mode=papermode)
-
-    ecdf_capacity_violation_plotter = ComparisonBaselineVsRRT_Scatter_and_ECDF(output_path=output_path,
-                                                                               output_filetype=output_filetype,
-                                                                               baseline_solution_storage=dc_baseline,
-                                                                               baseline_algorithm_id=baseline_algorithm_id,
-                                                                               baseline_execution_id=baseline_execution_config,
-                                                                               randround_solution_storage=dc_randround,
-                                                                               randround_algorithm_id=randround_algorithm_id,
-                                                                               randround_execution_id=randround_execution_config,
-                                                                               show_plot=show_plot,
-                                                                               save_plot=save_plot,
-                                                                               overwrite_existing_files=overwrite_existing_files,
-                                                                               forbidden_scenario_ids=forbidden_scenario_ids,
-                                                                               paper_mode=papermode)
-
-    plotters = [ecdf_capacity_violation_plotter, baseline_plotter, randround_plotter, comparison_plotter]
-
-    for filter_spec in filter_specs:
-
-        for plotter in plotters:
-            plotter.plot_figure(filter_spec)
\ No newline at end of file
+    plotters = []
+
+    if is_family_selected(PLOT_FAMILY_COMPARISON_ECDF_SCATTER, len(ecdf_scatter_output_names) > 0):
+        ecdf_capacity_violation_plotter = ComparisonBaselineVsRRT_Scatter_and_ECDF(output_path=output_path,
+                                                                                   output_filetype=output_filetype,
+                                                                                   baseline_solution_storage=dc_baseline,
+                                                                                   baseline_algorithm_id=baseline_algorithm_id,
+                                                                                   baseline_execution_id=baseline_execution_config,
+                                                                                   randround_solution_storage=dc_randround,
+                                                                                   randround_algorithm_id=randround_algorithm_id,
+                                                                                   randround_execution_id=randround_execution_config,
+                                                                                   list_of_output_names=ecdf_scatter_output_names,
+                                                                                   ecdf_backend=ecdf_backend,
+                                                                                   ecdf_points=ecdf_points,
+                                                                                   show_plot=show_plot,
+                                                                                   save_plot=save_plot,
+                                                                                   overwrite_existing_files=overwrite_existing_files,
+                                                                                   forbidden_scenario_ids=forbidden_scenario_ids,
+                                                                                   paper_mode=papermode,
+                                                                                   figure_writer=figure_writer,
+                                                                                   title_annotation=title_annotation)
+        plotters.append(ecdf_capacity_violation_plotter)
+
+    if is_family_selected(PLOT_FAMILY_BASELINE_HEATMAPS, len(baseline_metric_specifications) > 0 and len(axes_specifications) > 0):
+        baseline_plotter = SingleHeatmapPlotter(output_path=output_path,
+                                                output_filetype=output_filetype,
+                                                scenario_solution_storage=dc_baseline,
+                                                algorithm_id=baseline_algorithm_id,
+                                                execution_id=baseline_execution_config,
+                                                heatmap_plot_type=HeatmapPlotType.Simple_MCF,
+                                                list_of_axes_specifications=axes_specifications,
+                                                list_of_metric_specifications=baseline_metric_specifications,
+                                                show_plot=show_plot,
+                                                save_plot=save_plot,
+                                                overwrite_existing_files=overwrite_existing_files,
+                                                forbidden_scenario_ids=forbidden_scenario_ids,
+                                                paper_mode=papermode,
+                                                figure_writer=figure_writer,
+                                                title_annotation=title_annotation)
+        plotters.append(baseline_plotter)
+
+    if is_family_selected(PLOT_FAMILY_RANDROUND_HEATMAPS, len(randround_metric_specifications) > 0 and len(axes_specifications) > 0):
+        randround_plotter = SingleHeatmapPlotter(output_path=output_path,
+                                                 output_filetype=output_filetype,
+                                                 scenario_solution_storage=dc_randround,
+                                                 algorithm_id=randround_algorithm_id,
+                                                 execution_id=randround_execution_config,
+                                                 heatmap_plot_type=HeatmapPlotType.Simple_RRT,
+                                                 list_of_axes_specifications=axes_specifications,
+                                                 list_of_metric_specifications=randround_metric_specifications,
+                                                 show_plot=show_plot,
+                                                 save_plot=save_plot,
+                                                 overwrite_existing_files=overwrite_existing_files,
+                                                 forbidden_scenario_ids=forbidden_scenario_ids,
+                                                 paper_mode=papermode,
+                                                 figure_writer=figure_writer,
+                                                 title_annotation=title_annotation)
+        plotters.append(randround_plotter)
+
+    if is_family_selected(PLOT_FAMILY_COMPARISON_HEATMAPS, len(comparison_metric_specifications) > 0 and len(axes_specifications) > 0):
+        comparison_plotter = ComparisonHeatmapPlotter(output_path=output_path,
+                                                      output_filetype=output_filetype,
+                                                      scenario_solution_storage=dc_baseline,
+                                                      algorithm_id=baseline_algorithm_id,
+                                                      execution_id=baseline_execution_config,
+                                                      other_scenario_solution_storage=dc_randround,
+                                                      other_algorithm_id=randround_algorithm_id,
+                                                      other_execution_id=randround_execution_config,
+                                                      heatmap_plot_type=HeatmapPlotType.Comparison_MCF_vs_RRT,
+                                                      list_of_axes_specifications=axes_specifications,
+                                                      list_of_metric_specifications=comparison_metric_specifications,
+                                                      show_plot=show_plot,
+                                                      save_plot=save_plot,
+                                                      overwrite_existing_files=overwrite_existing_files,
+                                                      forbidden_scenario_ids=forbidden_scenario_ids,
+                                                      paper_mode=papermode,
+                                                      figure_writer=figure_writer,
+                                                      title_annotation=title_annotation)
+        plotters.append(comparison_plotter)
+
+    if not plotters or not filter_specs:
+        logger.warning("The given selection does not match any plot. Nothing to do.")
+
+    try:
+        for filter_spec in filter_specs:
+
+            for plotter in plotters:
+                plotter.plot_figure(filter_spec)
+    finally:
+        if figure_writer is not None:
+            figure_writer.close()
\ No newline at end of file
@@ -0,0 +1,734 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Execution of experiments with control over the order in which scenarios are dispatched.
+
+The alib's run_experiment processes the scenarios either in their original or in a random order. As the
+runtimes of the scenarios differ by orders of magnitude, this leaves cores idle at the end of long runs.
+The ScenarioExecution of this module instead dispatches the scenarios in a given order -- e.g. the most
+expensive scenarios first according to a ScenarioCostModel -- and solves each scenario in its own process.
+"""
+
+import copy
+import math
+import os
+import random
+import signal
+import time
+from collections import deque, namedtuple
+from multiprocessing import Process
+from multiprocessing.connection import wait
+
+import numpy as np
+import yaml
+
+from alib import modelcreator, run_experiment, solutions, util
+
+from . import lp_cache
+from . import pickle_io
+from . import plot_data
+from . import result_store
+from . import scenario_store
+from . import topology_index
+
+REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
+
+"""
+Modes of reducing the solutions within the workers: the reduced solutions are stored alongside or instead of the
+full solutions.
+"""
+REDUCTION_ALONGSIDE = "alongside"
+REDUCTION_INSTEAD = "instead"
+REDUCTION_MODES = (REDUCTION_ALONGSIDE, REDUCTION_INSTEAD)
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def load_experiment_specification(experiment_yaml):
+    ''' Reads an experiment yaml (file object) and returns the contained dictionary. '''
+    return yaml.load(experiment_yaml, Loader=yaml.FullLoader)
+
+
+def load_scenario_container(experiment_specification):
+    ''' Loads the SCENARIO_INPUT_PICKLE, which may also be an indexed scenario file (see scenario_store), in which
+        case the scenarios are only loaded when accessed.
+    '''
+    scenario_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, experiment_specification["SCENARIO_INPUT_PICKLE"])
+    if scenario_store.is_indexed_scenario_file(scenario_pickle_path):
+        logger.info("Reading index of scenarios from {}".format(scenario_pickle_path))
+        return scenario_store.read_indexed_scenario_file(scenario_pickle_path)
+    logger.info("Reading scenarios from {}".format(scenario_pickle_path))
+    return pickle_io.load_file(scenario_pickle_path)
+
+
+def select_scenario_ids(scenario_container, min_scenario_index, max_scenario_index):
+    return sorted(scenario_id for scenario_id in scenario_container.scenario_triple
+                  if min_scenario_index <= scenario_id <= max_scenario_index)
+
+
+def create_execution_parameter_container(experiment_specification):
+    execution_parameter_container = run_experiment.ExecutionParameters(experiment_specification["RUN_PARAMETERS"])
+    execution_parameter_container.generate_parameter_combinations()
+    return execution_parameter_container
+
+
+def flatten_generation_parameters(scenario_parameters):
+    ''' Returns the leaves of the (nested) generation parameters of a scenario as a single dictionary, e.g.
+        {"number_of_requests": 40, "topology": "Geant2012", ...}.
+    '''
+    result = {}
+    if not isinstance(scenario_parameters, dict):
+        return result
+    for key, value in scenario_parameters.items():
+        if isinstance(value, dict):
+            result.update(flatten_generation_parameters(value))
+        else:
+            result[key] = value
+    return result
+
+
+class ScenarioCostModel(object):
+    ''' Estimates the (relative) cost of solving a scenario based on its generation parameters.
+
+        Without coefficients, the heuristic number_of_requests * (number of substrate nodes + edges) is used.
+        Otherwise, the cost is exp(c * x) where x consists of a constant and the logarithms of the COST_FEATURES.
+        The coefficients can be fitted via fit_from_results using the runtimes contained in (reduced) results of
+        previous executions.
+    '''
+
+    COST_FEATURES = ["number_of_requests",
+                     "node_resource_factor",
+                     "edge_resource_factor",
+                     "number_of_substrate_nodes",
+                     "number_of_substrate_edges"]
+
+    def __init__(self, coefficients=None):
+        if coefficients is not None and len(coefficients) != len(self.COST_FEATURES) + 1:
+            raise RuntimeError("Expected {} coefficients but got {}.".format(len(self.COST_FEATURES) + 1, len(coefficients)))
+        self.coefficients = coefficients
+
+    @staticmethod
+    def extract_features(generation_parameters):
+        features = {key: generation_parameters.get(key) for key in ["number_of_requests",
+                                                                    "node_resource_factor",
+                                                                    "edge_resource_factor"]}
+        features["number_of_substrate_nodes"] = None
+        features["number_of_substrate_edges"] = None
+        topology = generation_parameters.get("topology")
+        if topology is not None:
+            metadata = topology_index.lookup_topology_metadata(topology)
+            if metadata is not None:
+                features["number_of_substrate_nodes"] = metadata.number_of_nodes
+                features["number_of_substrate_edges"] = metadata.number_of_edges
+        return features
+
+    def _feature_vector(self, features):
+        vector = [1.0]
+        for feature in self.COST_FEATURES:
+            value = features.get(feature)
+            if value is None or value <= 0:
+                vector.append(0.0)
+            else:
+                vector.append(math.log(float(value)))
+        return np.array(vector)
+
+    def estimate(self, generation_parameters):
+        features = self.extract_features(flatten_generation_parameters(generation_parameters))
+        if self.coefficients is None:
+            number_of_requests = features["number_of_requests"] or 1
+            substrate_size = (features["number_of_substrate_nodes"] or 1) + (features["number_of_substrate_edges"] or 0)
+            return float(number_of_requests * substrate_size)
+        return math.exp(float(np.dot(self.coefficients, self._feature_vector(features))))
+
+    @classmethod
+    def fit(cls, list_of_generation_parameters, runtimes):
+        ''' Fits log(1 + runtime) by least squares. Falls back to the heuristic when too few samples are given. '''
+        model = cls()
+        if len(runtimes) <= len(cls.COST_FEATURES) + 1:
+            logger.warning("Only {} runtimes given; using the heuristic cost model.".format(len(runtimes)))
+            return model
+        matrix = np.array([model._feature_vector(cls.extract_features(flatten_generation_parameters(parameters)))
+                           for parameters in list_of_generation_parameters])
+        target = np.log1p(np.array(runtimes, dtype=float))
+        coefficients, _, _, _ = np.linalg.lstsq(matrix, target, rcond=None)
+        model.coefficients = coefficients
+        logger.info("Fitted cost model coefficients {} for features {}".format(coefficients, ["constant"] + cls.COST_FEATURES))
+        return model
+
+    @classmethod
+    def fit_from_results(cls, scenario_solution_storage):
+        ''' Fits the model using the runtimes of all algorithms contained in the given (possibly reduced) results.
+            The generation parameters are recovered from the scenario_parameter_dict of the results.
+        '''
+        from . import evaluation
+
+        container = scenario_solution_storage.scenario_parameter_container
+        runtime_per_scenario = {}
+        for algorithm_id, scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.items():
+            for scenario_id, execution_solution_dict in scenario_solution_dict.items():
+                for execution_id, solution in execution_solution_dict.items():
+                    runtime = extract_runtime(solution)
+                    if runtime is not None:
+                        runtime_per_scenario[scenario_id] = runtime_per_scenario.get(scenario_id, 0.0) + runtime
+
+        generation_parameters = {scenario_id: {} for scenario_id in runtime_per_scenario}
+        for parameter in ["number_of_requests", "node_resource_factor", "edge_resource_factor", "topology"]:
+            parameter_range = evaluation.extract_parameter_range(container.scenarioparameter_room, parameter)
+            if parameter_range is None:
+                continue
+            path, values = parameter_range
+            for value in values:
+                scenario_ids = evaluation.lookup_scenarios_having_specific_values(container.scenario_parameter_dict, path, value)
+                for scenario_id in scenario_ids:
+                    if scenario_id in generation_parameters:
+                        generation_parameters[scenario_id][parameter] = value
+
+        scenario_ids = sorted(runtime_per_scenario.keys())
+        return cls.fit([generation_parameters[scenario_id] for scenario_id in scenario_ids],
+                       [runtime_per_scenario[scenario_id] for scenario_id in scenario_ids])
+
+
+def extract_runtime(solution):
+    ''' Returns the runtime (in seconds) of a (possibly reduced) solution or None if it cannot be determined. '''
+    if solution is None:
+        return None
+    temporal_log = getattr(solution, "temporal_log", None)
+    if temporal_log is not None and temporal_log.log_entries:
+        return temporal_log.log_entries[-1].globaltime
+    meta_data = getattr(solution, "meta_data", None)
+    if meta_data is not None:
+        return meta_data.time_preprocessing + meta_data.time_optimization + meta_data.time_postprocessing
+    return None
+
+
+def order_scenarios_longest_first(scenario_ids, generation_parameters_per_scenario, cost_model):
+    ''' Orders the scenario ids by decreasing estimated cost (ties are broken by the scenario id). '''
+    estimated_costs = {scenario_id: cost_model.estimate(generation_parameters_per_scenario[scenario_id])
+                       for scenario_id in scenario_ids}
+    return sorted(scenario_ids, key=lambda scenario_id: (-estimated_costs[scenario_id], scenario_id))
+
+
+def solve_scenario(scenario, execution_parameters, algorithm_logger, scenario_id=None, lp_solution_cache=None):
+    ''' Solves the scenario with the algorithm and parameters of a single execution configuration. If an
+        LPSolutionCache is given and applicable, LP solutions are reused from (or stored in) the cache.
+    '''
+    algorithm_id = execution_parameters["ALG_ID"]
+    algorithm_class = run_experiment.REGISTERED_ALGORITHMS[algorithm_id]
+    gurobi_settings = None
+    if execution_parameters.get("GUROBI_PARAMETERS"):
+        gurobi_settings = modelcreator.GurobiSettings(**execution_parameters["GUROBI_PARAMETERS"])
+    algorithm = algorithm_class(scenario,
+                                gurobi_settings=gurobi_settings,
+                                logger=algorithm_logger,
+                                **execution_parameters.get("ALGORITHM_PARAMETERS", {}))
+    algorithm.init_model_creator()
+    if lp_solution_cache is not None and lp_solution_cache.is_applicable(execution_parameters):
+        lp_solution_cache.attach(algorithm, scenario_id, scenario, execution_parameters)
+    return algorithm.compute_integral_solution()
+
+
+def execute_scenario(scenario_id,
+                     scenario,
+                     execution_parameter_container,
+                     execution_ids,
+                     shard_directory,
+                     cpu_set=None,
+                     reduced_shard_directory=None,
+                     lp_solution_cache=None):
+    ''' Entry point of the worker processes: solves the scenario for the given execution ids and writes each
+        solution into its own result shard as soon as it is computed. If a cpu_set is given, the process (and
+        hence all Gurobi threads) is pinned to these CPUs.
+
+        If a reduced_shard_directory is given, each solution is additionally reduced as by the reduce-to-plotdata
+        commands and written into the reduced shards (after the full solution). If shard_directory is None, only
+        the reduced solutions are written. An LPSolutionCache may be given to reuse LP solutions. The scenario may
+        also be a ScenarioReference, which is then loaded by the worker.
+    '''
+    worker_logger = util.get_logger("worker_scenario_{}".format(scenario_id), make_file=True, propagate=False)
+    scenario = scenario_store.resolve_scenario(scenario)
+    if cpu_set is not None:
+        os.sched_setaffinity(0, cpu_set)
+        worker_logger.info("Pinned scenario {} to CPUs {}".format(scenario_id, sorted(cpu_set)))
+    store = result_store.ResultShardStore(shard_directory) if shard_directory is not None else None
+    reduced_store = result_store.ResultShardStore(reduced_shard_directory) if reduced_shard_directory is not None else None
+    for execution_id in execution_ids:
+        execution_parameters = execution_parameter_container.algorithm_parameter_list[execution_id]
+        algorithm_id = execution_parameters["ALG_ID"]
+        worker_logger.info("Solving scenario {} with execution id {}: {}".format(scenario_id, execution_id, execution_parameters))
+        solution = solve_scenario(scenario, execution_parameters, worker_logger,
+                                  scenario_id=scenario_id, lp_solution_cache=lp_solution_cache)
+        if store is not None:
+            store.write_shard(scenario_id, execution_id, algorithm_id, solution)
+        if reduced_store is not None:
+            reduced_solution = plot_data.reduce_solution_of_algorithm(algorithm_id, scenario, solution)
+            reduced_store.write_shard(scenario_id, execution_id, algorithm_id, reduced_solution)
+
+
+ConcurrencyPlan = namedtuple("ConcurrencyPlan", "concurrent threads_per_process cpu_sets execution_parameter_container")
+
+
+def get_threads_of_gurobi_parameters(gurobi_parameters):
+    ''' Returns the threads parameter of Gurobi parameters given as dictionary, as sequence of alternating names and
+        values (e.g. the mdk_gurobi_parameters ("threads", 2, "timelimit", 60)) or as sequence of (name, value)
+        pairs, and None if it is not contained.
+    '''
+    if isinstance(gurobi_parameters, dict):
+        return gurobi_parameters.get("threads")
+    if not isinstance(gurobi_parameters, (list, tuple)):
+        return None
+    for index, item in enumerate(gurobi_parameters):
+        if isinstance(item, (list, tuple)) and len(item) == 2 and item[0] == "threads":
+            return item[1]
+        if item == "threads" and index + 1 < len(gurobi_parameters):
+            return gurobi_parameters[index + 1]
+    return None
+
+
+def set_threads_of_gurobi_parameters(gurobi_parameters, threads):
+    ''' Returns a copy of the Gurobi parameters (in any of the shapes accepted by get_threads_of_gurobi_parameters, or
+        None) with the threads parameter added.
+    '''
+    if gurobi_parameters is None:
+        return ("threads", threads)
+    if isinstance(gurobi_parameters, dict):
+        return dict(gurobi_parameters, threads=threads)
+    if gurobi_parameters and all(isinstance(item, (list, tuple)) for item in gurobi_parameters):
+        return type(gurobi_parameters)(list(gurobi_parameters) + [("threads", threads)])
+    return type(gurobi_parameters)(list(gurobi_parameters) + ["threads", threads])
+
+
+def plan_concurrency(execution_parameter_container, cores, pin_cores=False, default_threads=1):
+    ''' Determines how many scenarios can be solved concurrently on the given number of cores.
+
+        Each process solves all execution configurations of a scenario one after another, hence it uses at most
+        the maximal number of Gurobi threads of these configurations, including the threads of the MDK stage of
+        the randomized rounding (mdk_gurobi_parameters). Gurobi parameters not specifying the threads (in which case
+        Gurobi would use all cores) are set to default_threads within a copy of the execution parameter container,
+        which is returned as part of the plan and shall be used for solving; the given container (e.g. the one
+        stored with the results) is not modified. With pin_cores, each of the concurrent processes is assigned a
+        disjoint CPU set of threads_per_process CPUs.
+    '''
+    execution_parameter_container = copy.deepcopy(execution_parameter_container)
+    threads = []
+    for execution_parameters in execution_parameter_container.algorithm_parameter_list:
+        if not execution_parameters.get("GUROBI_PARAMETERS"):
+            execution_parameters["GUROBI_PARAMETERS"] = {}
+        gurobi_parameters = execution_parameters["GUROBI_PARAMETERS"]
+        if not gurobi_parameters.get("threads"):
+            logger.warning("No Gurobi threads specified for {}; using {} thread(s).".format(execution_parameters["ALG_ID"],
+                                                                                          default_threads))
+            gurobi_parameters["threads"] = default_threads
+        threads.append(gurobi_parameters["threads"])
+        algorithm_parameters = execution_parameters.get("ALGORITHM_PARAMETERS") or {}
+        if "mdk_gurobi_parameters" in algorithm_parameters:
+            mdk_gurobi_parameters = algorithm_parameters["mdk_gurobi_parameters"]
+            if not get_threads_of_gurobi_parameters(mdk_gurobi_parameters):
+                logger.warning("No Gurobi threads specified for the MDK stage of {}; using {} thread(s).".format(
+                    execution_parameters["ALG_ID"], default_threads))
+                algorithm_parameters["mdk_gurobi_parameters"] = set_threads_of_gurobi_parameters(mdk_gurobi_parameters,
+                                                                                                 default_threads)
+            threads.append(get_threads_of_gurobi_parameters(algorithm_parameters["mdk_gurobi_parameters"]))
+    threads_per_process = max(threads) if threads else default_threads
+    if threads_per_process > cores:
+        raise RuntimeError("Cannot run processes using {} Gurobi threads on {} cores.".format(threads_per_process, cores))
+    concurrent = cores // threads_per_process
+
+    cpu_sets = None
+    if pin_cores:
+        available_cpus = sorted(os.sched_getaffinity(0))
+        if len(available_cpus) < cores:
+            raise RuntimeError("Cannot pin processes to {} cores as only the CPUs {} are available.".format(cores, available_cpus))
+        cpu_sets = [set(available_cpus[slot * threads_per_process:(slot + 1) * threads_per_process])
+                    for slot in range(concurrent)]
+    logger.info("Using {} concurrent processes with {} Gurobi thread(s) each on {} cores{}".format(
+        concurrent, threads_per_process, cores, " (pinned)" if pin_cores else ""))
+    return ConcurrencyPlan(concurrent=concurrent,
+                           threads_per_process=threads_per_process,
+                           cpu_sets=cpu_sets,
+                           execution_parameter_container=execution_parameter_container)
+
+
+def get_open_execution_ids(execution_parameter_container, scenario_id, completed_pairs):
+    ''' Returns the execution ids of the scenario for which no (scenario id, execution id) pair was completed. '''
+    return [execution_id for execution_id in range(len(execution_parameter_container.algorithm_parameter_list))
+            if (scenario_id, execution_id) not in completed_pairs]
+
+
+def get_resident_set_size(pid):
+    ''' Returns the resident set size (in bytes) of the process or 0 if it cannot be determined (e.g. non-Linux). '''
+    try:
+        with open("/proc/{}/statm".format(pid), "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class MemoryAdmissionControl(object):
+    ''' Decides whether further scenarios may be started without exceeding the memory budget (in bytes).
+
+        Each running scenario reserves the maximum of its current resident set size and its estimated peak memory.
+        The estimate is bytes_per_cost times the estimated cost of the scenario (see ScenarioCostModel), where
+        bytes_per_cost is the largest ratio of peak memory to cost observed so far. Until the first scenario has
+        finished, default_estimate is used.
+
+        Scenarios that are killed (by select_process_exceeding_budget or the OOM killer) are re-queued with
+        twice their observed peak memory as estimate, such that fewer scenarios are run alongside; after
+        max_memory_retries kills they are reserved the complete budget, i.e. run alone, and afterwards fail.
+    '''
+
+    def __init__(self, memory_budget, default_estimate, cost_model=None, max_memory_retries=2, poll_interval=1.0):
+        self.memory_budget = memory_budget
+        self.default_estimate = default_estimate
+        self.cost_model = cost_model if cost_model is not None else ScenarioCostModel()
+        self.max_memory_retries = max_memory_retries
+        self.poll_interval = poll_interval
+        self.bytes_per_cost = None
+        self.estimate_overrides = {}
+        self.memory_failures = {}
+        self.reservations = {}
+
+    def estimate(self, scenario_id, generation_parameters):
+        if scenario_id in self.estimate_overrides:
+            return self.estimate_overrides[scenario_id]
+        if self.bytes_per_cost is None:
+            return self.default_estimate
+        return min(self.memory_budget, self.bytes_per_cost * self.cost_model.estimate(generation_parameters))
+
+    def _get_reserved_memory(self):
+        reserved_memory = 0
+        for pid, reservation in self.reservations.items():
+            reservation["peak"] = max(reservation["peak"], get_resident_set_size(pid))
+            reserved_memory += max(reservation["peak"], reservation["estimate"])
+        return reserved_memory
+
+    def admits(self, scenario_id, generation_parameters):
+        if not self.reservations:
+            return True
+        return self._get_reserved_memory() + self.estimate(scenario_id, generation_parameters) <= self.memory_budget
+
+    def reserve(self, pid, scenario_id, generation_parameters):
+        self.reservations[pid] = {"scenario_id": scenario_id,
+                                  "estimate": self.estimate(scenario_id, generation_parameters),
+                                  "peak": 0,
+                                  "start_time": time.time()}
+
+    def release(self, pid):
+        ''' Removes the reservation of the terminated process and returns its observed peak memory. '''
+        return self.reservations.pop(pid)["peak"]
+
+    def observe(self, generation_parameters, peak_memory):
+        cost = self.cost_model.estimate(generation_parameters)
+        if peak_memory > 0 and cost > 0:
+            self.bytes_per_cost = max(self.bytes_per_cost or 0.0, peak_memory / cost)
+
+    def sample_resident_set_sizes(self):
+        ''' Updates the observed peak memory of all running processes and returns their total resident set size. '''
+        total_memory = 0
+        for pid, reservation in self.reservations.items():
+            resident_set_size = get_resident_set_size(pid)
+            reservation["peak"] = max(reservation["peak"], resident_set_size)
+            total_memory += resident_set_size
+        return total_memory
+
+    def select_process_exceeding_budget(self):
+        ''' Samples the resident set sizes of all processes and returns the pid of the most recently started process if
+            their total exceeds the budget while several scenarios are running, and None otherwise.
+        '''
+        total_memory = self.sample_resident_set_sizes()
+        if len(self.reservations) <= 1 or total_memory <= self.memory_budget:
+            return None
+        return max(self.reservations, key=lambda pid: self.reservations[pid]["start_time"])
+
+    def register_memory_failure(self, scenario_id, peak_memory):
+        ''' Returns whether the killed scenario shall be re-queued and raises its estimate accordingly. '''
+        failures = self.memory_failures.get(scenario_id, 0) + 1
+        self.memory_failures[scenario_id] = failures
+        if failures > self.max_memory_retries:
+            return False
+        if failures == self.max_memory_retries:
+            self.estimate_overrides[scenario_id] = self.memory_budget
+        else:
+            self.estimate_overrides[scenario_id] = min(self.memory_budget, 2 * peak_memory)
+        return True
+
+
+class ScenarioExecution(object):
+    ''' Solves the given scenarios -- one process per scenario, at most concurrent processes at a time -- in the
+        order given by scenario_ids. Each solution is written into a ResultShardStore; (scenario id, execution id)
+        pairs already completed in the store are skipped, such that interrupted executions can be resumed.
+
+        If cpu_sets are given (see plan_concurrency), the process of the i-th slot is pinned to the i-th CPU set
+        and the number of slots determines the concurrency. If a MemoryAdmissionControl is given, scenarios are
+        only started when they fit into the memory budget; scenarios not fitting are overtaken by later ones.
+
+        If a reduced_shard_store is given, the workers also write reduced solutions into it; the shard_store may
+        then be None to only keep the reduced solutions. Completed work is determined by the reduced shards.
+        The lp_solution_cache (if any) is handed to the workers.
+    '''
+
+    def __init__(self,
+                 scenario_container,
+                 execution_parameter_container,
+                 scenario_ids,
+                 shard_store,
+                 concurrent=1,
+                 cpu_sets=None,
+                 memory_control=None,
+                 reduced_shard_store=None,
+                 lp_solution_cache=None):
+        self.scenario_container = scenario_container
+        self.execution_parameter_container = execution_parameter_container
+        self.scenario_ids = list(scenario_ids)
+        self.shard_store = shard_store
+        self.reduced_shard_store = reduced_shard_store
+        self.lp_solution_cache = lp_solution_cache
+        self.completion_store = reduced_shard_store if reduced_shard_store is not None else shard_store
+        self.completion_tracker = result_store.CompletedPairTracker(self.completion_store)
+        self.cpu_sets = cpu_sets
+        if cpu_sets is not None:
+            concurrent = len(cpu_sets)
+        self.concurrent = max(1, concurrent)
+        self.memory_control = memory_control
+        self.failed_scenario_ids = []
+
+    def _lookup_scenario(self, scenario_id):
+        return scenario_store.lookup_scenario_for_worker(self.scenario_container, scenario_id)
+
+    def _spawn(self, scenario_id, execution_ids, slot):
+        process = Process(target=execute_scenario,
+                          args=(scenario_id,
+                                self._lookup_scenario(scenario_id),
+                                self.execution_parameter_container,
+                                execution_ids,
+                                self.shard_store.shard_directory if self.shard_store is not None else None,
+                                self.cpu_sets[slot] if self.cpu_sets is not None else None,
+                                self.reduced_shard_store.shard_directory if self.reduced_shard_store is not None else None,
+                                self.lp_solution_cache),
+                          name="scenario_{}".format(scenario_id))
+        process.start()
+        return process
+
+    def _get_generation_parameters(self, scenario_id):
+        return scenario_store.lookup_generation_parameters(self.scenario_container, scenario_id)
+
+    def _pop_next_admissible(self, pending):
+        ''' Removes and returns the first pending scenario admitted by the memory admission control (or None). '''
+        if self.memory_control is None:
+            return pending.popleft()
+        for index, (scenario_id, execution_ids) in enumerate(pending):
+            if self.memory_control.admits(scenario_id, self._get_generation_parameters(scenario_id)):
+                del pending[index]
+                return scenario_id, execution_ids
+        return None
+
+    def run(self):
+        completed_pairs = self.completion_tracker.update()
+        pending = deque()
+        for scenario_id in self.scenario_ids:
+            execution_ids = get_open_execution_ids(self.execution_parameter_container, scenario_id, completed_pairs)
+            if execution_ids:
+                pending.append((scenario_id, execution_ids))
+        number_of_scenarios = len(pending)
+        logger.info("{} of {} scenarios are already completed in {}".format(len(self.scenario_ids) - number_of_scenarios,
+                                                                          len(self.scenario_ids),
+                                                                          self.completion_store.shard_directory))
+        running = {}
+        free_slots = list(range(self.concurrent))
+        start_time = time.time()
+        number_of_finished_scenarios = 0
+        poll_interval = self.memory_control.poll_interval if self.memory_control is not None else None
+
+        while pending or running:
+            while pending and free_slots:
+                next_scenario = self._pop_next_admissible(pending)
+                if next_scenario is None:
+                    break
+                scenario_id, execution_ids = next_scenario
+                slot = free_slots.pop(0)
+                logger.info("Starting scenario {} (execution ids {})".format(scenario_id, execution_ids))
+                process = self._spawn(scenario_id, execution_ids, slot)
+                running[process.sentinel] = (process, scenario_id, slot)
+                if self.memory_control is not None:
+                    self.memory_control.reserve(process.pid, scenario_id, self._get_generation_parameters(scenario_id))
+
+            finished_sentinels = wait(list(running.keys()), timeout=poll_interval)
+
+            if self.memory_control is not None and finished_sentinels:
+                # the peaks of all processes are sampled on each poll, also of those running alone
+                self.memory_control.sample_resident_set_sizes()
+            elif self.memory_control is not None:
+                pid_to_kill = self.memory_control.select_process_exceeding_budget()
+                if pid_to_kill is not None:
+                    for process, scenario_id, _ in running.values():
+                        if process.pid == pid_to_kill:
+                            logger.warning("Memory budget exceeded: killing scenario {}".format(scenario_id))
+                            process.kill()
+
+            for sentinel in finished_sentinels:
+                process, scenario_id, slot = running.pop(sentinel)
+                process.join()
+                free_slots.append(slot)
+                if self.memory_control is not None:
+                    peak_memory = self.memory_control.release(process.pid)
+                    if process.exitcode == -signal.SIGKILL:
+                        if self.memory_control.register_memory_failure(scenario_id, peak_memory):
+                            execution_ids = get_open_execution_ids(self.execution_parameter_container,
+                                                                   scenario_id,
+                                                                   self.completion_tracker.update())
+                            logger.warning("Re-queueing scenario {} (execution ids {}) after it was killed".format(scenario_id,
+                                                                                                                 execution_ids))
+                            pending.appendleft((scenario_id, execution_ids))
+                            continue
+                    elif process.exitcode == 0:
+                        self.memory_control.observe(self._get_generation_parameters(scenario_id), peak_memory)
+                number_of_finished_scenarios += 1
+                if process.exitcode != 0:
+                    logger.error("Execution of scenario {} failed with exit code {}".format(scenario_id, process.exitcode))
+                    self.failed_scenario_ids.append(scenario_id)
+                    continue
+                logger.info("Finished scenario {} ({} of {} done after {:.1f}s)".format(scenario_id,
+                                                                                     number_of_finished_scenarios,
+                                                                                     number_of_scenarios,
+                                                                                     time.time() - start_time))
+
+        if self.failed_scenario_ids:
+            logger.error("The following scenarios could not be solved: {}".format(sorted(self.failed_scenario_ids)))
+
+
+def run_experiment_locally(experiment_yaml,
+                           min_scenario_index,
+                           max_scenario_index,
+                           concurrent=1,
+                           cores=None,
+                           pin_cores=False,
+                           memory_budget=None,
+                           shuffle_instances=True,
+                           longest_first=False,
+                           cost_model=None,
+                           shard_directory=None,
+                           reduce_results=None,
+                           lp_cache_directory=None,
+                           overwrite_existing_intermediate_solutions=False,
+                           remove_intermediate_solutions=False):
+    ''' Counterpart of alib's run_experiment.run_experiment using the ScenarioExecution of this module. The scenarios
+        are either dispatched by decreasing estimated cost (longest_first), randomly, or in ascending order.
+
+        The solutions are written into result shards (by default ALIB_EXPERIMENT_HOME/output/<result>_shards),
+        which are reused when the execution is restarted unless overwrite_existing_intermediate_solutions is set.
+        Once all scenarios were processed, the shards are merged into ALIB_EXPERIMENT_HOME/output/RESULT_OUTPUT_PICKLE;
+        with remove_intermediate_solutions the shards are removed afterwards.
+
+        If the number of cores is given, the concurrency is derived from the Gurobi threads (see plan_concurrency)
+        and concurrent is ignored. If a memory_budget (in bytes) is given, scenarios are admitted according to a
+        MemoryAdmissionControl.
+
+        With reduce_results set to REDUCTION_ALONGSIDE or REDUCTION_INSTEAD, the workers reduce each solution right
+        after computing it. The reduced shards (<shard directory>_reduced) are merged into
+        ALIB_EXPERIMENT_HOME/output/<result basename>_reduced.pickle, as written by the reduce-to-plotdata commands.
+        With REDUCTION_INSTEAD, the full solutions are neither stored nor written to RESULT_OUTPUT_PICKLE.
+
+        If an lp_cache_directory is given, the LP solutions of the randomized rounding are cached there (see
+        lp_cache.LPSolutionCache) and reused by executions differing only in rounding parameters.
+    '''
+    experiment_specification = load_experiment_specification(experiment_yaml)
+    scenario_container = load_scenario_container(experiment_specification)
+    execution_parameter_container = create_execution_parameter_container(experiment_specification)
+    cpu_sets = None
+    solving_execution_parameter_container = execution_parameter_container
+    if cores is not None:
+        plan = plan_concurrency(execution_parameter_container, cores, pin_cores=pin_cores)
+        concurrent = plan.concurrent
+        cpu_sets = plan.cpu_sets
+        solving_execution_parameter_container = plan.execution_parameter_container
+
+    scenario_ids = select_scenario_ids(scenario_container, min_scenario_index, max_scenario_index)
+    if longest_first:
+        if cost_model is None:
+            cost_model = ScenarioCostModel()
+        generation_parameters = {scenario_id: scenario_store.lookup_generation_parameters(scenario_container, scenario_id)
+                                 for scenario_id in scenario_ids}
+        scenario_ids = order_scenarios_longest_first(scenario_ids, generation_parameters, cost_model)
+    elif shuffle_instances:
+        random.shuffle(scenario_ids)
+    logger.info("Executing {} scenarios in the order {}".format(len(scenario_ids), scenario_ids))
+
+    if reduce_results not in (None,) + REDUCTION_MODES:
+        raise RuntimeError("Unknown reduction mode {}; expected one of {}.".format(reduce_results, REDUCTION_MODES))
+    if shard_directory is None:
+        shard_directory = result_store.get_default_shard_directory(experiment_specification["RESULT_OUTPUT_PICKLE"])
+    shard_store = None
+    if reduce_results != REDUCTION_INSTEAD:
+        shard_store = result_store.ResultShardStore(shard_directory)
+        shard_store.initialize(scenario_container,
+                               execution_parameter_container,
+                               overwrite=overwrite_existing_intermediate_solutions)
+    reduced_shard_store = None
+    if reduce_results is not None:
+        reduced_shard_store = result_store.ResultShardStore(os.path.normpath(shard_directory) + "_reduced")
+        reduced_shard_store.initialize(plot_data.strip_scenarios(scenario_container),
+                                       execution_parameter_container,
+                                       overwrite=overwrite_existing_intermediate_solutions,
+                                       reduced=True)
+
+    lp_solution_cache = None
+    if lp_cache_directory is not None:
+        lp_solution_cache = lp_cache.LPSolutionCache(lp_cache_directory, experiment_specification["SCENARIO_INPUT_PICKLE"])
+
+    memory_control = None
+    if memory_budget is not None:
+        memory_control = MemoryAdmissionControl(memory_budget,
+                                                default_estimate=memory_budget / float(concurrent if cpu_sets is None else len(cpu_sets)),
+                                                cost_model=cost_model)
+
+    execution = ScenarioExecution(scenario_container,
+                                  solving_execution_parameter_container,
+                                  scenario_ids,
+                                  shard_store,
+                                  concurrent=concurrent,
+                                  cpu_sets=cpu_sets,
+                                  memory_control=memory_control,
+                                  reduced_shard_store=reduced_shard_store,
+                                  lp_solution_cache=lp_solution_cache)
+    execution.run()
+
+    scenario_solution_storage = None
+    if shard_store is not None:
+        scenario_solution_storage = shard_store.merge()
+        result_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, experiment_specification["RESULT_OUTPUT_PICKLE"])
+        logger.info("Writing results to {}".format(result_pickle_path))
+        result_store.write_pickle_atomically(scenario_solution_storage, result_pickle_path)
+    if reduced_shard_store is not None:
+        reduced_scenario_solution_storage = reduced_shard_store.merge()
+        file_basename = os.path.basename(experiment_specification["RESULT_OUTPUT_PICKLE"]).split(".")[0]
+        reduced_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, file_basename + "_reduced.pickle" +
+                                           pickle_io.get_compression_suffix(experiment_specification["RESULT_OUTPUT_PICKLE"]))
+        logger.info("Writing reduced results to {}".format(reduced_pickle_path))
+        result_store.write_pickle_atomically(reduced_scenario_solution_storage, reduced_pickle_path)
+        if scenario_solution_storage is None:
+            scenario_solution_storage = reduced_scenario_solution_storage
+
+    if remove_intermediate_solutions and not execution.failed_scenario_ids:
+        for store in (shard_store, reduced_shard_store):
+            if store is not None:
+                store.remove()
+    return scenario_solution_storage
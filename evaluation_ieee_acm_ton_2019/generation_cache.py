@@ -0,0 +1,272 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Cache of the components generated by the tasks of the scenario generation.
+
+Generating a scenario applies one strategy per task (substrate generation, request generation, node placement
+restrictions and profit calculation) to the scenario. Especially the OptimalEmbeddingProfitCalculator is
+expensive, as it solves an embedding MIP per request. The ScenarioGenerationCache stores the state of the
+scenario after each task except the substrate generation, keyed by a fingerprint of
+
+    the parameters of all tasks applied to the scenario so far,
+    the repetition (seed) of the scenario, and
+    the version of the generation, i.e. of the alib's scenario generation code and of the topology files used.
+
+When extending a sweep (e.g. adding a topology or a number of requests), only the new parameter combinations are
+computed, while all others are loaded from the cache. The cache is a directory with one file per component,
+written atomically, such that the processes of generate-scenarios --threads share it.
+
+As the cached components must not depend on the order in which scenarios are generated, the random number
+generators are seeded with the fingerprint before each task is computed (see ScenarioGenerationSeeder). The same
+seeding is used when generating scenarios without the cache but with seeding per parameters, such that a cached
+scenario equals the one generated anew. The scenarios differ from the ones generated by the alib's default seeding
+(e.g. the published scenario sets), which is why both the seeding and the cache are opt-in.
+
+The strategies are hooked by replacing the apply method of their classes within the context of
+seed_scenario_generation, as the alib creates the strategy objects within its worker processes.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import random
+from contextlib import contextmanager
+
+import numpy as np
+
+from alib import scenariogeneration, util
+
+from . import pickle_io
+from . import topology_index
+
+"""
+The substrate is cheap to generate and is not cached; its parameters are part of the fingerprints of later tasks.
+"""
+SUBSTRATE_GENERATION_TASK = "substrate_generation"
+
+"""
+Attributes of the scenario which are not part of the cached state, as they identify the scenario.
+"""
+UNCACHED_SCENARIO_ATTRIBUTES = frozenset(["name", "substrate"])
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+class _SubstrateReferencingPickler(pickle.Pickler):
+
+    def __init__(self, f, substrate):
+        super(_SubstrateReferencingPickler, self).__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._substrate_id = id(substrate)
+
+    def persistent_id(self, obj):
+        if id(obj) == self._substrate_id:
+            return ("substrate",)
+        return None
+
+
+class _SubstrateReferencingUnpickler(pickle_io.FastUnpickler):
+
+    def __init__(self, f, substrate):
+        super(_SubstrateReferencingUnpickler, self).__init__(f)
+        self._substrate = substrate
+
+    def persistent_load(self, persistent_id):
+        if persistent_id[0] == "substrate":
+            return self._substrate
+        raise pickle.UnpicklingError("Unknown reference {}".format(persistent_id))
+
+
+def get_default_cache_directory():
+    return os.path.join(topology_index.CACHE_DIR, "scenario_generation")
+
+
+def get_referenced_topologies(parameters):
+    ''' Returns the set of topology names referenced (by the key "topology") anywhere in the parameters. '''
+    topologies = set()
+    if isinstance(parameters, dict):
+        for key, value in parameters.items():
+            if key == "topology":
+                topologies.update(value if isinstance(value, list) else [value])
+            else:
+                topologies.update(get_referenced_topologies(value))
+    elif isinstance(parameters, list):
+        for value in parameters:
+            topologies.update(get_referenced_topologies(value))
+    return topologies
+
+
+def get_generation_version(scenario_parameter_space):
+    ''' Returns a hash of the source of the alib's scenario generation and of the Topology Zoo files referenced in
+        the parameter space, such that cached components are not reused after either changed.
+    '''
+    version_hash = hashlib.sha1()
+    source_path = os.path.splitext(scenariogeneration.__file__)[0] + ".py"
+    paths = [source_path] + [os.path.join(scenariogeneration.DATA_PATH, "topologyZoo", "{}.yml".format(topology))
+                             for topology in sorted(get_referenced_topologies(scenario_parameter_space), key=str)]
+    for path in paths:
+        version_hash.update(path.encode("utf-8"))
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                version_hash.update(f.read())
+    return version_hash.hexdigest()
+
+
+def get_strategy_classes(scenario_parameter_space):
+    ''' Returns the dictionary strategy class name -> task of the classes referenced in the parameter space. '''
+    strategy_classes = {}
+    for task, strategies in scenario_parameter_space.items():
+        if not isinstance(strategies, list):
+            continue
+        for strategy in strategies:
+            for class_parameters in strategy.values():
+                for class_name in class_parameters.keys():
+                    strategy_classes[class_name] = task
+    return strategy_classes
+
+
+def get_seed(scenario_parameters, scenario):
+    ''' Returns the repetition of the scenario. Should the parameters not contain it, the scenario name is used,
+        i.e. the component is only reused for the scenario having the same index.
+    '''
+    if "repetition" in scenario_parameters:
+        return scenario_parameters["repetition"]
+    return scenario.name
+
+
+class ScenarioGenerationSeeder(object):
+    ''' Seeds the random number generators before each task with a fingerprint of the parameters of all tasks
+        applied to the scenario so far, of the repetition and of the generation version.
+    '''
+
+    def __init__(self, generation_version=None):
+        self.generation_version = generation_version
+        # id of the scenario -> fingerprint of the tasks applied so far; the substrate generation starts the chain
+        self._fingerprints = {}
+
+    def compute_fingerprint(self, task, scenario_parameters, scenario):
+        initial_fingerprint = repr((self.generation_version, get_seed(scenario_parameters, scenario)))
+        if task == SUBSTRATE_GENERATION_TASK:
+            previous_fingerprint = initial_fingerprint
+        else:
+            previous_fingerprint = self._fingerprints.get(id(scenario), initial_fingerprint)
+        key = repr((previous_fingerprint, task, json.dumps(scenario_parameters[task], sort_keys=True, default=repr)))
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def seed(fingerprint):
+        seed = int(fingerprint[:8], 16)
+        random.seed(seed)
+        np.random.seed(seed)
+
+    def apply_task(self, original_apply, strategy, task, scenario_parameters, scenario):
+        fingerprint = self.compute_fingerprint(task, scenario_parameters, scenario)
+        self.seed(fingerprint)
+        result = original_apply(strategy, scenario_parameters, scenario)
+        self._fingerprints[id(scenario)] = fingerprint
+        return result
+
+
+class ScenarioGenerationCache(ScenarioGenerationSeeder):
+    ''' Directory of cached scenario states, one file per fingerprint. Tasks not found in the cache are computed as
+        by the ScenarioGenerationSeeder.
+    '''
+
+    def __init__(self, cache_directory, generation_version=None):
+        super(ScenarioGenerationCache, self).__init__(generation_version)
+        self.cache_directory = cache_directory
+        self.number_of_hits = 0
+        self.number_of_misses = 0
+
+    def get_cache_path(self, task, fingerprint):
+        return os.path.join(self.cache_directory, "{}_{}.pickle".format(task, fingerprint))
+
+    def _load(self, cache_path, substrate):
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, "rb") as f:
+                return _SubstrateReferencingUnpickler(f, substrate).load()
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError) as e:
+            logger.warning("Could not read cached scenario component {}: {}".format(cache_path, e))
+            return None
+
+    def _store(self, cache_path, substrate, state):
+        os.makedirs(self.cache_directory, exist_ok=True)
+        temporary_path = "{}.{}.tmp".format(cache_path, os.getpid())
+        try:
+            with open(temporary_path, "wb") as f:
+                _SubstrateReferencingPickler(f, substrate).dump(state)
+            os.replace(temporary_path, cache_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def apply_task(self, original_apply, strategy, task, scenario_parameters, scenario):
+        ''' Applies the strategy to the scenario or restores the cached state of the scenario after the task. '''
+        if task == SUBSTRATE_GENERATION_TASK:
+            return super(ScenarioGenerationCache, self).apply_task(original_apply, strategy, task, scenario_parameters, scenario)
+        fingerprint = self.compute_fingerprint(task, scenario_parameters, scenario)
+        cache_path = self.get_cache_path(task, fingerprint)
+        state = self._load(cache_path, scenario.substrate)
+        if state is not None:
+            self.number_of_hits += 1
+            scenario.__dict__.update(state)
+            self._fingerprints[id(scenario)] = fingerprint
+            return None
+        self.number_of_misses += 1
+        result = super(ScenarioGenerationCache, self).apply_task(original_apply, strategy, task, scenario_parameters, scenario)
+        try:
+            state = {attribute: value for attribute, value in scenario.__dict__.items()
+                     if attribute not in UNCACHED_SCENARIO_ATTRIBUTES}
+            self._store(cache_path, scenario.substrate, state)
+        except (OSError, pickle.PicklingError, TypeError) as e:
+            logger.warning("Could not cache {} of {}: {}".format(task, scenario.name, e))
+        return result
+
+
+@contextmanager
+def seed_scenario_generation(seeder, scenario_parameter_space):
+    ''' Within this context, the strategies referenced in the parameter space are applied via the seeder (e.g. a
+        ScenarioGenerationCache). As the patch applies to the strategy classes, the worker processes of the
+        scenario generation must be forked within this context.
+    '''
+    original_apply_functions = {}
+    for class_name, task in get_strategy_classes(scenario_parameter_space).items():
+        strategy_class = getattr(scenariogeneration, class_name, None)
+        if strategy_class is None:
+            logger.warning("Unknown scenario generation strategy {}; it is not seeded per parameters".format(class_name))
+            continue
+        original_apply_functions[strategy_class] = strategy_class.apply
+
+        def apply(strategy, scenario_parameters, scenario, original_apply=strategy_class.apply, task=task):
+            return seeder.apply_task(original_apply, strategy, task, scenario_parameters, scenario)
+
+        strategy_class.apply = apply
+    try:
+        yield
+    finally:
+        for strategy_class, original_apply in original_apply_functions.items():
+            strategy_class.apply = original_apply
+        if getattr(seeder, "number_of_hits", 0) or getattr(seeder, "number_of_misses", 0):
+            logger.info("Scenario generation cache {}: {} hits, {} misses (of this process)".format(
+                seeder.cache_directory, seeder.number_of_hits, seeder.number_of_misses))
@@ -0,0 +1,170 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Benchmarks of writing and loading result pickles on synthetic data.
+
+The synthetic results resemble reduced baseline results of the evaluation: per scenario and execution, a
+ReducedBaselineSolution with the load of each substrate resource and a temporal log.
+
+As the benchmarks read files which were just written (i.e. from the page cache), the load times do not contain
+the time for reading from disk. For compressed pickles, it can be estimated from the file size and the disk
+bandwidth.
+"""
+
+import os
+import pickle
+import random
+import time
+from collections import namedtuple
+
+from . import pickle_io
+from . import plot_data
+
+SyntheticLogEntry = namedtuple("SyntheticLogEntry", "globaltime time_within_gurobi objective_value objective_bound")
+
+BenchmarkResult = namedtuple("BenchmarkResult", "name file_size dump_time load_time")
+
+CompressionBenchmarkResult = namedtuple("CompressionBenchmarkResult",
+                                        "codec file_size dump_time load_time load_throughput estimated_load_time")
+
+"""
+Codecs compared by benchmark_compression, identified by the suffix of the file name ("" is uncompressed).
+"""
+BENCHMARKED_CODECS = ["", ".gz", ".bz2", ".xz"]
+
+
+def create_synthetic_results(number_of_scenarios=7500,
+                             number_of_executions=2,
+                             number_of_resources=150,
+                             number_of_log_entries=30,
+                             seed=0):
+    ''' Returns the dictionary algorithm id -> scenario id -> execution id -> ReducedBaselineSolution. '''
+    rnd = random.Random(seed)
+    resources = [("universal", "node_{}".format(node)) for node in range(number_of_resources // 3)]
+    resources += [("node_{}".format(node), "node_{}".format(node + 1)) for node in range(number_of_resources - len(resources))]
+    solutions_of_algorithm = {}
+    for scenario_id in range(number_of_scenarios):
+        solutions_of_algorithm[scenario_id] = {}
+        for execution_id in range(number_of_executions):
+            temporal_log = [SyntheticLogEntry(globaltime=rnd.uniform(0, 3600),
+                                              time_within_gurobi=rnd.uniform(0, 3600),
+                                              objective_value=rnd.uniform(0, 1000),
+                                              objective_bound=rnd.uniform(0, 1000))
+                            for _ in range(number_of_log_entries)]
+            solutions_of_algorithm[scenario_id][execution_id] = plot_data.ReducedBaselineSolution(
+                load={resource: rnd.random() for resource in resources},
+                runtime=temporal_log[-1].time_within_gurobi,
+                status=rnd.choice([2, 9]),
+                found_solution=None,
+                embedding_ratio=rnd.random(),
+                temporal_log=temporal_log,
+                nu_real_req=rnd.randint(0, 100),
+                original_number_requests=100)
+    return {"ClassicMCF": solutions_of_algorithm}
+
+
+def _measure(function, repetitions):
+    ''' Returns the result of the last call and the minimal runtime of the function over the repetitions. '''
+    best_time = None
+    result = None
+    for _ in range(repetitions):
+        start_time = time.time()
+        result = function()
+        elapsed_time = time.time() - start_time
+        if best_time is None or elapsed_time < best_time:
+            best_time = elapsed_time
+    return result, best_time
+
+
+def _plain_dump(obj, path):
+    with open(path, "wb") as f:
+        pickle.dump(obj, f)
+
+
+def _plain_load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def benchmark_pickle_io(data, directory, repetitions=3):
+    ''' Compares plain pickle (default protocol, garbage collector enabled) with pickle_io on the data. '''
+    benchmarks = [("pickle (default protocol, gc enabled)", _plain_dump, _plain_load),
+                  ("pickle_io (protocol {}, gc suspended)".format(pickle_io.PROTOCOL), pickle_io.dump_file, pickle_io.load_file)]
+    results = []
+    for index, (name, dump_function, load_function) in enumerate(benchmarks):
+        path = os.path.join(directory, "benchmark_{}.pickle".format(index))
+        _, dump_time = _measure(lambda: dump_function(data, path), repetitions)
+        _, load_time = _measure(lambda: load_function(path), repetitions)
+        results.append(BenchmarkResult(name=name, file_size=os.path.getsize(path), dump_time=dump_time, load_time=load_time))
+        os.remove(path)
+    return results
+
+
+def format_benchmark_results(results):
+    lines = ["{:<48} {:>12} {:>10} {:>10}".format("method", "size [MB]", "dump [s]", "load [s]")]
+    for result in results:
+        lines.append("{:<48} {:>12.1f} {:>10.2f} {:>10.2f}".format(result.name,
+                                                                 result.file_size / 1024.0 ** 2,
+                                                                 result.dump_time,
+                                                                 result.load_time))
+    return lines
+
+
+def benchmark_compression(data, directory, repetitions=3, disk_bandwidth=None):
+    ''' Writes and loads the data via pickle_io for each codec of BENCHMARKED_CODECS. The load throughput refers to
+        the size of the uncompressed pickle. If the disk bandwidth (in MB/s) is given, the load time including
+        reading the file from disk is estimated as well.
+    '''
+    results = []
+    uncompressed_size = None
+    for codec in BENCHMARKED_CODECS:
+        path = os.path.join(directory, "benchmark.pickle" + codec)
+        _, dump_time = _measure(lambda: pickle_io.dump_file(data, path), repetitions)
+        _, load_time = _measure(lambda: pickle_io.load_file(path), repetitions)
+        file_size = os.path.getsize(path)
+        if uncompressed_size is None:
+            uncompressed_size = file_size
+        estimated_load_time = None
+        if disk_bandwidth is not None:
+            estimated_load_time = load_time + file_size / (disk_bandwidth * 1024.0 ** 2)
+        results.append(CompressionBenchmarkResult(codec=codec or "none",
+                                                  file_size=file_size,
+                                                  dump_time=dump_time,
+                                                  load_time=load_time,
+                                                  load_throughput=uncompressed_size / 1024.0 ** 2 / load_time,
+                                                  estimated_load_time=estimated_load_time))
+        os.remove(path)
+    return results
+
+
+def format_compression_benchmark_results(results):
+    lines = ["{:<6} {:>10} {:>9} {:>9} {:>12} {:>16}".format(
+        "codec", "size [MB]", "dump [s]", "load [s]", "load [MB/s]", "load+disk [s]")]
+    for result in results:
+        estimated_load_time = "n/a" if result.estimated_load_time is None else "{:.2f}".format(result.estimated_load_time)
+        lines.append("{:<6} {:>10.1f} {:>9.2f} {:>9.2f} {:>12.1f} {:>16}".format(result.codec,
+                                                                             result.file_size / 1024.0 ** 2,
+                                                                             result.dump_time,
+                                                                             result.load_time,
+                                                                             result.load_throughput,
+                                                                             estimated_load_time))
+    return lines
@@ -0,0 +1,318 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Heatmaps of experiments which are still running.
+
+The result shard directories of the experiments are polled periodically. Only the shards completed since the last
+poll are reduced (see plot_data.reduce_shards) and loaded. Their metric values are added to the statistics
+(count, sum, minimum and maximum) of the heatmap cells of their scenarios, such that no solution is looked at twice.
+Heatmaps whose cells changed are re-rendered at most once per render interval, always overwriting the same file.
+
+Heatmaps of a single algorithm contain every solution of that algorithm, while comparison heatmaps contain the
+scenarios solved by both algorithms.
+"""
+
+import os
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from alib import util
+
+from . import evaluation
+from . import plot_data
+from . import result_store
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+class HeatmapCellStatistics(object):
+    ''' Number, sum, minimum and maximum of the values of each cell of a heatmap. '''
+
+    def __init__(self, shape):
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def add(self, y_index, x_index, value):
+        self.count[y_index, x_index] += 1
+        self.sum[y_index, x_index] += value
+        self.min[y_index, x_index] = min(self.min[y_index, x_index], value)
+        self.max[y_index, x_index] = max(self.max[y_index, x_index], value)
+
+    def get_means(self):
+        ''' Returns the mean of each cell; cells without values are NaN. '''
+        means = np.full(self.count.shape, np.nan)
+        observed = self.count > 0
+        means[observed] = self.sum[observed] / self.count[observed]
+        return means
+
+
+class HeatmapAxes(object):
+    ''' The parameter values of a heatmap axes specification and the cell of each scenario. '''
+
+    def __init__(self, heatmap_axes_specification, scenario_parameter_container):
+        self.heatmap_axes_specification = heatmap_axes_specification
+        spd = scenario_parameter_container.scenario_parameter_dict
+        (path_x_axis, self.xaxis_parameters,
+         self.path_y_axis, self.yaxis_parameters) = evaluation.get_heatmap_axes_parameters(scenario_parameter_container.scenarioparameter_room,
+                                                                                             heatmap_axes_specification)
+        self.cell_of_scenario = {}
+        for x_index, x_val in enumerate(self.xaxis_parameters):
+            scenario_ids_matching_x_axis = evaluation.lookup_scenarios_having_specific_values(spd, path_x_axis, x_val)
+            for y_index, y_val in enumerate(self.yaxis_parameters):
+                scenario_ids_matching_y_axis = evaluation.lookup_scenarios_having_specific_values(spd, self.path_y_axis, y_val)
+                for scenario_id in scenario_ids_matching_x_axis & scenario_ids_matching_y_axis:
+                    self.cell_of_scenario[scenario_id] = (y_index, x_index)
+
+    @property
+    def shape(self):
+        return len(self.yaxis_parameters), len(self.xaxis_parameters)
+
+
+class LiveHeatmap(object):
+    ''' Heatmap of a single metric whose cell statistics are updated one solution at a time. '''
+
+    def __init__(self, heatmap_metric_specification, heatmap_axes):
+        self.heatmap_metric_specification = heatmap_metric_specification
+        self.heatmap_axes = heatmap_axes
+        self.statistics = HeatmapCellStatistics(heatmap_axes.shape)
+        self.changed = False
+
+    def add(self, scenario_id, solutions):
+        ''' Adds the metric value of the solution(s) of the scenario to the cell of the scenario. '''
+        cell = self.heatmap_axes.cell_of_scenario.get(scenario_id)
+        if cell is None:
+            return
+        value = self.heatmap_metric_specification['lookup_function'](*solutions)
+        if 'metric_filter' in self.heatmap_metric_specification and not self.heatmap_metric_specification['metric_filter'](value):
+            return
+        if np.isnan(value):
+            return
+        self.statistics.add(cell[0], cell[1], value)
+        self.changed = True
+
+    def get_output_filename(self, output_directory, output_filetype):
+        return os.path.join(output_directory,
+                            self.heatmap_axes.heatmap_axes_specification['foldername'],
+                            "{}.{}".format(self.heatmap_metric_specification['filename'], output_filetype))
+
+    def render(self, output_directory, output_filetype, paper_mode=True):
+        ''' Draws the heatmap and replaces the previous figure atomically, such that viewers never see partial files. '''
+        counts = self.statistics.count
+        title = "{}\n{} values".format(self.heatmap_metric_specification['name'], int(counts.sum()))
+        if not paper_mode:
+            observed = counts > 0
+            title += ", between {} and {} per square".format(counts.min(), counts.max())
+            if observed.any():
+                title += "\nmin: {:.2f}; mean: {:.2f}; max: {:.2f}".format(self.statistics.min[observed].min(),
+                                                                           self.statistics.sum.sum() / counts.sum(),
+                                                                           self.statistics.max[observed].max())
+        figure = evaluation.draw_heatmap(self.statistics.get_means(),
+                                         self.heatmap_axes.xaxis_parameters,
+                                         self.heatmap_axes.path_y_axis,
+                                         self.heatmap_axes.yaxis_parameters,
+                                         self.heatmap_metric_specification,
+                                         self.heatmap_axes.heatmap_axes_specification,
+                                         title,
+                                         paper_mode)
+        figure.tight_layout()
+        filename = self.get_output_filename(output_directory, output_filetype)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        temporary_filename = "{}.{}.tmp".format(filename, os.getpid())
+        try:
+            figure.savefig(temporary_filename, format=output_filetype)
+            os.replace(temporary_filename, filename)
+        finally:
+            plt.close(figure)
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+        self.changed = False
+
+
+class WatchedShardDirectory(object):
+    ''' Returns the (reduced) solutions of a single execution which were completed since the last poll. Only the
+        manifest entries appended since the last poll are read. New full result shards of the selected execution
+        are reduced into the reduced shards next to them (see plot_data.reduce_shards); the scenarios needed to
+        reduce them are loaded with the metadata only when such shards arrived and are released afterwards.
+    '''
+
+    def __init__(self, shard_directory, processes=1):
+        self.shard_directory = shard_directory
+        self.processes = processes
+        self.algorithm_id = None
+        self.execution_id = None
+        self.extractor = None
+        self._seen_pairs = set()
+        self._manifest_offset = 0
+        self.shard_store = result_store.ResultShardStore(shard_directory)
+        self.is_reduced = self.shard_store.is_reduced()
+        self.scenario_parameter_container, self.execution_parameter_container = self.shard_store.load_parameters()
+        self.reduced_shard_store = self.shard_store
+        if not self.is_reduced:
+            self.reduced_shard_store = result_store.ResultShardStore(plot_data.get_reduced_shard_directory(shard_directory))
+            self.reduced_shard_store.initialize(self.scenario_parameter_container, self.execution_parameter_container, reduced=True)
+
+    def select(self, algorithm_id, execution_id):
+        ''' Selects the execution to watch. For full result shards, the extractor reducing them is looked up right
+            away, such that unregistered algorithms are rejected before the first poll.
+        '''
+        if not self.is_reduced:
+            self.extractor = plot_data.get_result_extractor(algorithm_id)
+        self.algorithm_id = algorithm_id
+        self.execution_id = execution_id
+
+    def _reduce(self, entries):
+        ''' Reduces the shards of the entries which were not reduced before. '''
+        pending_entries = [entry for entry in entries
+                           if not os.path.exists(self.reduced_shard_store.get_shard_path(entry["scenario_id"], entry["execution_id"]))]
+        if not pending_entries:
+            return
+        scenario_container = None
+        if self.extractor.REQUIRES_SCENARIO:
+            scenario_container, _ = self.shard_store.load_metadata()
+        logger.info("Reducing {} new result shards of {}".format(len(pending_entries), self.shard_directory))
+        plot_data.reduce_shards(self.shard_store, self.reduced_shard_store, scenario_container, pending_entries, self.processes)
+
+    def poll(self):
+        ''' Returns the list of (scenario id, reduced solution) of the selected execution completed since the last
+            call.
+        '''
+        entries, self._manifest_offset = self.shard_store.read_manifest_from(self._manifest_offset)
+        new_entries = []
+        for entry in entries:
+            key = (entry["scenario_id"], entry["execution_id"])
+            if key in self._seen_pairs:
+                continue
+            self._seen_pairs.add(key)
+            if entry["algorithm_id"] == self.algorithm_id and entry["execution_id"] == self.execution_id:
+                new_entries.append(entry)
+        if not self.is_reduced:
+            self._reduce(new_entries)
+        result = []
+        for entry in new_entries:
+            _, solution = self.reduced_shard_store.load_shard(entry["scenario_id"], entry["execution_id"])
+            if solution is not None:
+                result.append((entry["scenario_id"], solution))
+        return result
+
+
+class LiveEvaluation(object):
+    ''' Maintains the heatmaps of the baseline, the randomized rounding and their comparison while solutions are
+        added.
+    '''
+
+    def __init__(self,
+                 baseline_source,
+                 randround_source,
+                 output_directory,
+                 output_filetype="png",
+                 paper_mode=True,
+                 metric_patterns=None,
+                 axes_patterns=None):
+        self.baseline_source = baseline_source
+        self.randround_source = randround_source
+        self.output_directory = output_directory
+        self.output_filetype = output_filetype
+        self.paper_mode = paper_mode
+
+        scenario_parameter_container = baseline_source.scenario_parameter_container
+        self.expected_scenario_ids = set(scenario_parameter_container.scenario_parameter_dict.get("all", ()))
+        list_of_heatmap_axes = [HeatmapAxes(heatmap_axes_specification, scenario_parameter_container)
+                                for heatmap_axes_specification in evaluation.global_heatmap_axes_specifications
+                                if evaluation.matches_any_pattern(heatmap_axes_specification['foldername'], axes_patterns)]
+        self.heatmaps_per_type = {}
+        for heatmap_plot_type in evaluation.HeatmapPlotType.VALUE_RANGE:
+            self.heatmaps_per_type[heatmap_plot_type] = [
+                LiveHeatmap(heatmap_metric_specification, heatmap_axes)
+                for heatmap_metric_specification in evaluation.heatmap_specifications_per_type[heatmap_plot_type]
+                if evaluation.matches_any_pattern(heatmap_metric_specification['filename'], metric_patterns)
+                for heatmap_axes in list_of_heatmap_axes]
+
+        # solutions of scenarios not yet solved by the other algorithm, kept for the comparison heatmaps
+        self._unmatched_baseline_solutions = {}
+        self._unmatched_randround_solutions = {}
+        self.compared_scenario_ids = set()
+
+    def _add(self, heatmap_plot_type, scenario_id, solutions):
+        for heatmap in self.heatmaps_per_type[heatmap_plot_type]:
+            heatmap.add(scenario_id, solutions)
+
+    def _compare(self, scenario_id):
+        if scenario_id in self._unmatched_baseline_solutions and scenario_id in self._unmatched_randround_solutions:
+            self._add(evaluation.HeatmapPlotType.Comparison_MCF_vs_RRT,
+                      scenario_id,
+                      (self._unmatched_baseline_solutions.pop(scenario_id), self._unmatched_randround_solutions.pop(scenario_id)))
+            self.compared_scenario_ids.add(scenario_id)
+
+    def update(self):
+        ''' Adds the solutions completed since the last update and returns their number. '''
+        number_of_solutions = 0
+        for scenario_id, solution in self.baseline_source.poll():
+            self._add(evaluation.HeatmapPlotType.Simple_MCF, scenario_id, (solution,))
+            self._unmatched_baseline_solutions[scenario_id] = solution
+            self._compare(scenario_id)
+            number_of_solutions += 1
+        for scenario_id, solution in self.randround_source.poll():
+            self._add(evaluation.HeatmapPlotType.Simple_RRT, scenario_id, (solution,))
+            self._unmatched_randround_solutions[scenario_id] = solution
+            self._compare(scenario_id)
+            number_of_solutions += 1
+        return number_of_solutions
+
+    def render_changed_heatmaps(self):
+        ''' Re-renders the heatmaps whose cells changed since they were rendered last and returns their number. '''
+        number_of_rendered_heatmaps = 0
+        for heatmaps in self.heatmaps_per_type.values():
+            for heatmap in heatmaps:
+                if heatmap.changed:
+                    heatmap.render(self.output_directory, self.output_filetype, self.paper_mode)
+                    number_of_rendered_heatmaps += 1
+        return number_of_rendered_heatmaps
+
+    def is_complete(self):
+        return bool(self.expected_scenario_ids) and self.expected_scenario_ids <= self.compared_scenario_ids
+
+
+def watch(live_evaluation, poll_interval=60.0, render_interval=300.0, stop_when_complete=True):
+    ''' Polls for new solutions every poll_interval seconds and re-renders the changed heatmaps at most every
+        render_interval seconds. Returns once all scenarios were compared (if stop_when_complete is set).
+    '''
+    last_render_time = None
+    while True:
+        number_of_solutions = live_evaluation.update()
+        if number_of_solutions:
+            logger.info("Added {} new solutions; {} of {} scenarios were solved by both algorithms".format(
+                number_of_solutions, len(live_evaluation.compared_scenario_ids), len(live_evaluation.expected_scenario_ids)))
+        is_complete = stop_when_complete and live_evaluation.is_complete()
+        current_time = time.time()
+        if is_complete or last_render_time is None or current_time - last_render_time >= render_interval:
+            number_of_rendered_heatmaps = live_evaluation.render_changed_heatmaps()
+            if number_of_rendered_heatmaps:
+                logger.info("Rendered {} heatmaps to {}".format(number_of_rendered_heatmaps, live_evaluation.output_directory))
+            last_render_time = current_time
+        if is_complete:
+            logger.info("All scenarios were solved by both algorithms.")
+            return
+        time.sleep(poll_interval)
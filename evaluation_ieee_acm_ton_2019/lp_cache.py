@@ -0,0 +1,194 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Cache of the LP solutions (and their decompositions) computed by the RandomizedRoundingTriumvirate.
+
+The randomized rounding first solves the cactus LP and decomposes its solution -- which may take hours -- and
+only then rounds the decomposition. When sweeping only rounding or post-processing parameters, the LP is hence
+solved again and again for the same scenario. The LPSolutionCache persists the result of
+ModelCreatorCactusDecomposition.compute_fractional_solution per scenario and LP-relevant parameters and returns
+it for all later executions with equal LP-relevant parameters.
+
+Within the cached decomposition, the scenario, its substrate and its requests are stored as references, such
+that after loading, the decomposition refers to the very objects of the scenario being solved (e.g. the
+requests used as dictionary keys).
+"""
+
+import hashlib
+import os
+import pickle
+
+from alib import util
+
+from vnep_approx import modelcreator_ecg_decomposition, randomized_rounding_triumvirate
+
+from . import pickle_io
+
+"""
+Algorithm parameters of the RandomizedRoundingTriumvirate which only influence the rounding and the
+post-processing (i.e. the MDK heuristic) but not the LP or its decomposition.
+"""
+ROUNDING_ONLY_PARAMETERS = frozenset(["number_of_solutions_to_round",
+                                      "mdk_gurobi_parameters"])
+
+"""
+Attributes of the model creator set while computing the fractional solution, which are restored on cache hits.
+"""
+LP_STATE_ATTRIBUTES = ("status",
+                       "solution",
+                       "temporal_log",
+                       "time_preprocess",
+                       "time_optimization",
+                       "time_postprocessing")
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+class _ScenarioReferencingPickler(pickle.Pickler):
+
+    def __init__(self, f, scenario):
+        super(_ScenarioReferencingPickler, self).__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._references = {id(scenario): ("scenario",), id(scenario.substrate): ("substrate",)}
+        for index, request in enumerate(scenario.requests):
+            self._references[id(request)] = ("request", index)
+
+    def persistent_id(self, obj):
+        return self._references.get(id(obj))
+
+
+class _ScenarioReferencingUnpickler(pickle_io.FastUnpickler):
+
+    def __init__(self, f, scenario):
+        super(_ScenarioReferencingUnpickler, self).__init__(f)
+        self._scenario = scenario
+
+    def persistent_load(self, persistent_id):
+        if persistent_id[0] == "scenario":
+            return self._scenario
+        if persistent_id[0] == "substrate":
+            return self._scenario.substrate
+        if persistent_id[0] == "request":
+            return self._scenario.requests[persistent_id[1]]
+        raise pickle.UnpicklingError("Unknown reference {}".format(persistent_id))
+
+
+def get_default_cache_directory(scenario_input_pickle):
+    ''' LP solutions of the scenarios in SCENARIO_INPUT_PICKLE are cached in ALIB_EXPERIMENT_HOME/output/<basename>_lp_cache.
+        Note that start-experiment does not require an empty output directory when the LP cache is used.
+    '''
+    basename = os.path.basename(scenario_input_pickle).split(".")[0]
+    return os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, "{}_lp_cache".format(basename))
+
+
+def get_file_version(path):
+    ''' Returns the size and the modification time of the file, such that the LP solutions of a regenerated scenario
+        pickle of the same name are not reused. Hashing the contents of the (possibly huge) pickle is avoided.
+    '''
+    if not os.path.exists(path):
+        return None
+    file_stat = os.stat(path)
+    return file_stat.st_size, file_stat.st_mtime_ns
+
+
+class LPSolutionCache(object):
+    ''' Directory of cached fractional solutions, one file per scenario and LP-relevant execution parameters.
+        On cache hits, the LP_STATE_ATTRIBUTES of the original computation are restored, i.e. the runtimes
+        reported for the LP are those of the run that actually solved it.
+    '''
+
+    def __init__(self, cache_directory, scenario_input_pickle):
+        self.cache_directory = cache_directory
+        self.scenario_input_pickle = os.path.basename(scenario_input_pickle)
+        self.scenario_input_version = get_file_version(os.path.join(util.ExperimentPathHandler.INPUT_DIR, scenario_input_pickle))
+
+    @staticmethod
+    def is_applicable(execution_parameters):
+        return execution_parameters["ALG_ID"] == randomized_rounding_triumvirate.RandomizedRoundingTriumvirate.ALGORITHM_ID
+
+    def get_lp_parameters(self, execution_parameters):
+        algorithm_parameters = execution_parameters.get("ALGORITHM_PARAMETERS") or {}
+        return (sorted((key, repr(value)) for key, value in algorithm_parameters.items() if key not in ROUNDING_ONLY_PARAMETERS),
+                sorted((key, repr(value)) for key, value in (execution_parameters.get("GUROBI_PARAMETERS") or {}).items()))
+
+    def get_cache_path(self, scenario_id, execution_parameters):
+        key = repr((self.scenario_input_pickle, self.scenario_input_version, scenario_id, self.get_lp_parameters(execution_parameters)))
+        key_hash = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_directory, "scenario_{}_lp_{}.pickle".format(scenario_id, key_hash))
+
+    def _load(self, cache_path, scenario):
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, "rb") as f:
+                return _ScenarioReferencingUnpickler(f, scenario).load()
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, IndexError) as e:
+            logger.warning("Could not read cached LP solution {}: {}".format(cache_path, e))
+            return None
+
+    def _store(self, cache_path, scenario, entry):
+        os.makedirs(self.cache_directory, exist_ok=True)
+        temporary_path = "{}.{}.tmp".format(cache_path, os.getpid())
+        try:
+            with open(temporary_path, "wb") as f:
+                _ScenarioReferencingPickler(f, scenario).dump(entry)
+            os.replace(temporary_path, cache_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def attach(self, algorithm, scenario_id, scenario, execution_parameters):
+        ''' Makes the model creator of the (initialized) algorithm return the cached fractional solution for the
+            given scenario and parameters, or compute and cache it. Only this model creator instance is wrapped, the
+            class of the vnep_approx is not modified. Returns False if the algorithm has no model creator.
+        '''
+        model_creators = [value for value in vars(algorithm).values()
+                          if isinstance(value, modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition)]
+        if len(model_creators) != 1:
+            logger.warning("Cannot cache the LP solution of scenario {}: found {} model creators.".format(scenario_id,
+                                                                                                      len(model_creators)))
+            return False
+        model_creator = model_creators[0]
+        original_compute_fractional_solution = model_creator.compute_fractional_solution
+        cache_path = self.get_cache_path(scenario_id, execution_parameters)
+
+        def compute_fractional_solution(*args, **kwargs):
+            entry = self._load(cache_path, scenario)
+            if entry is not None:
+                fractional_solution, lp_state = entry
+                logger.info("Reusing cached LP solution {} of scenario {}".format(cache_path, scenario_id))
+                for attribute, value in lp_state.items():
+                    setattr(model_creator, attribute, value)
+                return fractional_solution
+            fractional_solution = original_compute_fractional_solution(*args, **kwargs)
+            lp_state = {attribute: getattr(model_creator, attribute)
+                        for attribute in LP_STATE_ATTRIBUTES if hasattr(model_creator, attribute)}
+            try:
+                self._store(cache_path, scenario, (fractional_solution, lp_state))
+                logger.info("Cached LP solution of scenario {} at {}".format(scenario_id, cache_path))
+            except (OSError, pickle.PicklingError, TypeError) as e:
+                logger.warning("Could not cache LP solution of scenario {}: {}".format(scenario_id, e))
+            return fractional_solution
+
+        # the instance attribute shadows the method of the class for this model creator only
+        model_creator.compute_fractional_solution = compute_fractional_solution
+        return True
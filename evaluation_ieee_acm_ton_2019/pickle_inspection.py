@@ -0,0 +1,209 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Inspection of (parts of) result and scenario pickles.
+
+A query is a dot-separated path into the object graph, e.g.
+algorithm_scenario_solution_dictionary.ClassicMCF.42.0.status, where each component selects an attribute, a
+dictionary key (compared by its string representation) or a list index. The selected subtree is written line by
+line while it is traversed, limited in depth and in the number of items per container, such that huge objects can
+be inspected without building their complete representation.
+
+Besides pickles, the shard directories of result_store and the indexed scenario files of scenario_store are
+supported: only the parts of these selected by the query are loaded from disk.
+"""
+
+import itertools
+import os
+from collections.abc import Mapping
+
+from alib import solutions
+
+from . import pickle_io
+from . import result_store
+from . import scenario_store
+
+REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
+
+SCALAR_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+class NotLoaded(object):
+    ''' Placeholder shown for properties, which are listed without evaluating them since they may load data from
+        disk (e.g. the metadata of a shard directory). Query a property to show its value.
+    '''
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<not loaded>"
+
+
+NOT_LOADED = NotLoaded()
+
+
+class LazyMapping(Mapping):
+    ''' Read-only mapping with known keys whose values are only loaded (via load_value(key)) on access. '''
+
+    def __init__(self, keys, load_value):
+        self._keys = list(keys)
+        self._load_value = load_value
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return self._load_value(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class ShardedResultView(object):
+    ''' Mimics the attributes of a ScenarioSolutionStorage for a shard directory without loading any shard
+        (or the metadata) before it is accessed.
+    '''
+
+    def __init__(self, shard_directory):
+        self._shard_store = result_store.ResultShardStore(shard_directory)
+        self._metadata = None
+        shard_keys = {}
+        for entry in self._shard_store.read_manifest():
+            shard_keys.setdefault(entry["algorithm_id"], {}).setdefault(entry["scenario_id"], []).append(entry["execution_id"])
+        self.algorithm_scenario_solution_dictionary = LazyMapping(
+            sorted(shard_keys.keys()),
+            lambda algorithm_id: LazyMapping(
+                sorted(shard_keys[algorithm_id].keys()),
+                lambda scenario_id: LazyMapping(
+                    sorted(shard_keys[algorithm_id][scenario_id]),
+                    lambda execution_id: self._shard_store.load_shard(scenario_id, execution_id)[1])))
+
+    def _get_metadata(self):
+        if self._metadata is None:
+            self._metadata = self._shard_store.load_metadata()
+        return self._metadata
+
+    @property
+    def scenario_parameter_container(self):
+        return self._get_metadata()[0]
+
+    @property
+    def execution_parameter_container(self):
+        return self._get_metadata()[1]
+
+
+def open_inspectable(path):
+    ''' Returns the root object of the pickle, shard directory or indexed scenario file at path. '''
+    if os.path.isdir(path):
+        return ShardedResultView(path)
+    if scenario_store.is_indexed_scenario_file(path):
+        return scenario_store.read_indexed_scenario_file(path)
+    return pickle_io.load_file(path)
+
+
+def _select_child(obj, component):
+    if isinstance(obj, Mapping):
+        for key in (component, _parse_number(component)):
+            if key is not None:
+                try:
+                    return obj[key]
+                except (KeyError, TypeError):
+                    pass
+        for key in obj.keys():
+            if str(key) == component:
+                return obj[key]
+        raise KeyError(component)
+    if isinstance(obj, (list, tuple)):
+        index = _parse_number(component)
+        if not isinstance(index, int):
+            raise KeyError(component)
+        return obj[index]
+    if hasattr(obj, component):
+        return getattr(obj, component)
+    raise KeyError(component)
+
+
+def _parse_number(component):
+    for number_type in (int, float):
+        try:
+            return number_type(component)
+        except ValueError:
+            pass
+    return None
+
+
+def resolve_query(obj, query):
+    ''' Returns the object selected by the dot-separated query. '''
+    if not query:
+        return obj
+    selected = obj
+    for index, component in enumerate(query.split(".")):
+        try:
+            selected = _select_child(selected, component)
+        except (KeyError, IndexError):
+            raise ValueError("{} not found in {} (type {})".format(
+                component, ".".join(query.split(".")[:index]) or "<root>", type(selected).__name__))
+    return selected
+
+
+def _get_children(obj):
+    ''' Returns the number of children and an iterator over (label, child), or None for leaves. Children are only
+        accessed (i.e. possibly loaded from disk) when the iterator reaches them.
+    '''
+    if isinstance(obj, SCALAR_TYPES):
+        return None
+    if isinstance(obj, Mapping):
+        return len(obj), ((repr(key), obj[key]) for key in obj.keys())
+    if isinstance(obj, (list, tuple)):
+        return len(obj), (("[{}]".format(index), item) for index, item in enumerate(obj))
+    if isinstance(obj, (set, frozenset)):
+        return len(obj), (("-", item) for item in obj)
+    if hasattr(obj, "__dict__"):
+        names = [name for name in vars(obj).keys() if not name.startswith("_")]
+        property_names = [name for name in dir(type(obj)) if isinstance(getattr(type(obj), name, None), property)]
+        return len(names) + len(property_names), itertools.chain(((name, getattr(obj, name)) for name in names),
+                                                                 ((name, NOT_LOADED) for name in property_names))
+    return None
+
+
+def iterate_lines(obj, label, max_depth=3, max_items=20, indentation="  ", depth=0, path_ids=()):
+    ''' Yields the lines describing obj (labelled by label) and its descendants up to max_depth. At most max_items
+        children are shown per object.
+    '''
+    prefix = indentation * depth
+    if id(obj) in path_ids:
+        yield "{}{}: <cycle {}>".format(prefix, label, type(obj).__name__)
+        return
+    children = _get_children(obj)
+    if children is None:
+        yield "{}{}: {!r}".format(prefix, label, obj)
+        return
+    number_of_children, child_iterator = children
+    yield "{}{}: {} ({} items)".format(prefix, label, type(obj).__name__, number_of_children)
+    if depth >= max_depth:
+        return
+    for child_label, child in itertools.islice(child_iterator, max_items):
+        for line in iterate_lines(child, child_label, max_depth, max_items, indentation, depth + 1, path_ids + (id(obj),)):
+            yield line
+    if number_of_children > max_items:
+        yield "{}... {} more".format(indentation * (depth + 1), number_of_children - max_items)
@@ -0,0 +1,209 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Reading and writing of the scenario and result pickles used by all commands.
+
+Result pickles consist of millions of small objects. While unpickling them, each allocation may trigger the cyclic
+garbage collector, which repeatedly traverses all objects created so far although none of them is garbage.
+Hence, the garbage collector is suspended while loading. Furthermore, classes are resolved by a cached lookup that
+only admits the modules and classes which may occur in the pickles of this package (see ALLOWED_MODULE_PREFIXES and
+ALLOWED_GLOBALS).
+
+Pickles are written with the highest protocol available. All data is written in-band, i.e. no out-of-band buffers
+(buffer_callback of protocol 5) are used: the data of numpy arrays is copied into the pickle stream, such that each
+pickle remains a single file which can also be read via pickle.load.
+
+Files ending with .gz, .xz or .bz2 (e.g. results.pickle.xz) are compressed transparently with the respective codec
+of the standard library. (De)compression is streamed, i.e. the compressed data is never held in memory as a whole.
+When reading, the codec is recognized by the magic number of the file. The compression level used for writing can
+be set via set_compression_level.
+"""
+
+import _compat_pickle
+import bz2
+import gc
+import gzip
+import lzma
+import pickle
+from contextlib import contextmanager
+
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+"""
+File name suffixes of compressed pickles, the module implementing the codec and the default compression level.
+"""
+COMPRESSION_CODECS = {".gz": (gzip, 6),
+                      ".xz": (lzma, 6),
+                      ".bz2": (bz2, 9)}
+
+"""
+Magic numbers at the start of the files written by the codecs.
+"""
+COMPRESSION_MAGIC_NUMBERS = {".gz": b"\x1f\x8b",
+                             ".xz": b"\xfd7zXZ\x00",
+                             ".bz2": b"BZh"}
+
+_compression_level = None
+
+"""
+Modules whose classes (and functions) may be referenced by the pickles read via the FastUnpickler.
+"""
+ALLOWED_MODULE_PREFIXES = ("alib",
+                           "vnep_approx",
+                           "evaluation_ieee_acm_ton_2019",
+                           "datetime",
+                           "numpy.dtypes")
+
+"""
+Single classes and functions of the standard library's core modules and of numpy which may be referenced by the
+pickles. Allowing these modules as a whole would admit functions such as builtins.eval.
+"""
+ALLOWED_GLOBALS = frozenset([("builtins", name) for name in ("bool", "bytearray", "bytes", "complex", "dict", "float",
+                                                             "frozenset", "int", "list", "object", "range", "set",
+                                                             "slice", "str", "tuple")] +
+                            [("copyreg", "_reconstructor"),
+                             ("copyreg", "__newobj__"),
+                             ("copyreg", "__newobj_ex__"),
+                             ("_codecs", "encode"),
+                             ("collections", "OrderedDict"),
+                             ("collections", "defaultdict"),
+                             ("collections", "deque"),
+                             ("numpy", "dtype"),
+                             ("numpy", "ndarray")] +
+                            [(module, name) for module in ("numpy.core.multiarray", "numpy._core.multiarray")
+                             for name in ("_reconstruct", "scalar")] +
+                            [(module, "_frombuffer") for module in ("numpy.core.numeric", "numpy._core.numeric")])
+
+_resolved_classes = {}
+
+
+def is_allowed_module(module):
+    return any(module == prefix or module.startswith(prefix + ".") for prefix in ALLOWED_MODULE_PREFIXES)
+
+
+def map_python2_name(module, name):
+    ''' Maps Python 2 names (as contained in pickles written by Python 2) to their Python 3 counterparts, as done by
+        the unpickler.
+    '''
+    module, name = _compat_pickle.NAME_MAPPING.get((module, name), (module, name))
+    return _compat_pickle.IMPORT_MAPPING.get(module, module), name
+
+
+class FastUnpickler(pickle.Unpickler):
+    ''' Unpickler resolving classes via a cache shared by all instances and refusing classes neither listed in
+        ALLOWED_GLOBALS nor contained in the modules of ALLOWED_MODULE_PREFIXES.
+    '''
+
+    def find_class(self, module, name):
+        key = (module, name)
+        resolved_class = _resolved_classes.get(key)
+        if resolved_class is None:
+            if map_python2_name(module, name) in ALLOWED_GLOBALS:
+                resolved_class = super(FastUnpickler, self).find_class(module, name)
+            elif is_allowed_module(map_python2_name(module, name)[0]):
+                resolved_class = super(FastUnpickler, self).find_class(module, name)
+                # names may be dotted, hence objects imported by allowed modules (e.g. os.system) must be refused
+                if not is_allowed_module(getattr(resolved_class, "__module__", None) or ""):
+                    raise pickle.UnpicklingError("Refusing to load {}.{}: it is not defined in an allowed module".format(module, name))
+            else:
+                raise pickle.UnpicklingError("Refusing to load {}.{}: it is not allowed".format(module, name))
+            _resolved_classes[key] = resolved_class
+        return resolved_class
+
+
+@contextmanager
+def garbage_collection_suspended():
+    ''' Disables the cyclic garbage collector within this context (if it was enabled before). '''
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def set_compression_level(compression_level):
+    ''' Sets the compression level used when writing compressed pickles; None restores the default of each codec.
+        As bz2 does not support level 0, it uses level 1 instead.
+    '''
+    global _compression_level
+    _compression_level = compression_level
+
+
+def get_compression_suffix(path):
+    ''' Returns the suffix identifying the codec of the path (e.g. ".xz") or "" if the file is not compressed. '''
+    for suffix in COMPRESSION_CODECS:
+        if path.endswith(suffix):
+            return suffix
+    return ""
+
+
+def detect_compression_suffix(path):
+    ''' Returns the suffix of the codec which compressed the file according to its magic number, or "". '''
+    with open(path, "rb") as f:
+        header = f.read(max(len(magic_number) for magic_number in COMPRESSION_MAGIC_NUMBERS.values()))
+    for suffix, magic_number in COMPRESSION_MAGIC_NUMBERS.items():
+        if header.startswith(magic_number):
+            return suffix
+    return ""
+
+
+def open_file(path, mode, compression_suffix=None):
+    ''' Opens the file in binary mode ("rb" or "wb"), (de)compressing it according to compression_suffix. By default,
+        the codec is chosen based on the suffix of path when writing and based on the content when reading, such
+        that also uncompressed pickles named like compressed ones (e.g. written by the alib) can be read.
+    '''
+    if compression_suffix is None:
+        compression_suffix = detect_compression_suffix(path) if "r" in mode else get_compression_suffix(path)
+    if not compression_suffix:
+        return open(path, mode)
+    codec, default_compression_level = COMPRESSION_CODECS[compression_suffix]
+    if "r" in mode:
+        return codec.open(path, mode)
+    compression_level = default_compression_level if _compression_level is None else _compression_level
+    if codec is bz2:
+        # the levels of bz2 range from 1 to 9, i.e. level 0 (no compression) is not supported
+        compression_level = max(1, compression_level)
+    if codec is lzma:
+        return lzma.open(path, mode, preset=compression_level)
+    return codec.open(path, mode, compresslevel=compression_level)
+
+
+def load(f, create_unpickler=FastUnpickler):
+    ''' Loads a pickle from the binary file object f while the garbage collector is suspended. '''
+    with garbage_collection_suspended():
+        return create_unpickler(f).load()
+
+
+def load_file(path):
+    with open_file(path, "rb") as f:
+        return load(f)
+
+
+def dump(obj, f):
+    pickle.dump(obj, f, protocol=PROTOCOL)
+
+
+def dump_file(obj, path):
+    with open_file(path, "wb") as f:
+        dump(obj, f)
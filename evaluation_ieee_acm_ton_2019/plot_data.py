@@ -22,135 +22,263 @@
 #
 
 import os
-import pickle
 from collections import namedtuple
+from multiprocessing import Pool
 
-from alib import solutions, util
+import numpy as np
 
-from vnep_approx import randomized_rounding_triumvirate
+from alib import mip, solutions, util
+
+from vnep_approx import modelcreator_ecg_decomposition, randomized_rounding_triumvirate
+
+from . import pickle_io
+from . import quantile_sketch
+from . import result_store
 
 REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
 
 ReducedBaselineSolution = namedtuple("ReducedBaselineSolution",
                              "load runtime status found_solution embedding_ratio temporal_log nu_real_req original_number_requests")
 
+ReducedLPSolution = namedtuple("ReducedLPSolution", "runtime status temporal_log")
+
 logger = util.get_logger(__name__, make_file=False, propagate=True)
 
-class BaselineResultReducer(object):
+"""
+Samples of the randomized rounding retained by the RandRoundResultReducer besides the best feasible (or least
+violating) and the highest objective sample, which are always the first two samples of a reduced solution:
+- best:     no further samples
+- pareto:   the Pareto front over (profit, max node load, max edge load)
+- top_k:    the k best samples under each of the TOP_K_CRITERIA
+"""
+SAMPLE_RETENTION_BEST = "best"
+SAMPLE_RETENTION_PARETO = "pareto"
+SAMPLE_RETENTION_TOP_K = "top_k"
+SAMPLE_RETENTION_MODES = [SAMPLE_RETENTION_BEST, SAMPLE_RETENTION_PARETO, SAMPLE_RETENTION_TOP_K]
+
+"""
+Criteria of the top-k retention: name -> function mapping the profits, max node loads and max edge loads of the
+samples to the values of which the k smallest are retained.
+"""
+TOP_K_CRITERIA = {
+    "profit": lambda profits, max_node_loads, max_edge_loads: -profits,
+    "max_load": lambda profits, max_node_loads, max_edge_loads: np.maximum(max_node_loads, max_edge_loads),
+    "max_node_load": lambda profits, max_node_loads, max_edge_loads: max_node_loads,
+    "max_edge_load": lambda profits, max_node_loads, max_edge_loads: max_edge_loads,
+}
+
+_sample_retention = SAMPLE_RETENTION_BEST
+_number_of_retained_samples = 10
+
+
+def get_reduced_pickle_path(input_pickle_name, output_pickle_name=None, min_scenario_index=None, max_scenario_index=None):
+    ''' Returns the path in ALIB_EXPERIMENT_HOME/output to write the reduced results to. By default, the name is
+        derived from the input's basename and, if given, the range of reduced scenarios; the compression suffix of
+        the input is kept.
+    '''
+    if output_pickle_name is not None:
+        return os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, output_pickle_name)
+    file_basename = os.path.basename(input_pickle_name).split(".")[0] + "_reduced"
+    if min_scenario_index is not None or max_scenario_index is not None:
+        file_basename += "_{}_{}".format("min" if min_scenario_index is None else min_scenario_index,
+                                         "max" if max_scenario_index is None else max_scenario_index)
+    return os.path.join(util.ExperimentPathHandler.OUTPUT_DIR,
+                        file_basename + ".pickle" + pickle_io.get_compression_suffix(input_pickle_name))
+
+
+def set_sample_retention(sample_retention, number_of_retained_samples):
+    ''' Sets the samples retained by RandRoundResultReducers created afterwards (see SAMPLE_RETENTION_MODES). For the
+        Pareto front, number_of_retained_samples bounds the number of retained samples, for top_k it is k.
+    '''
+    global _sample_retention, _number_of_retained_samples
+    if sample_retention not in SAMPLE_RETENTION_MODES:
+        raise ValueError("Unknown sample retention {}; expected one of {}".format(sample_retention, SAMPLE_RETENTION_MODES))
+    _sample_retention = sample_retention
+    _number_of_retained_samples = number_of_retained_samples
+
+
+def get_sample_arrays(samples):
+    ''' Returns the profits, the max node loads and the max edge loads of the samples as arrays. '''
+    profits = np.fromiter((sample.profit for sample in samples), dtype=float, count=len(samples))
+    max_node_loads = np.fromiter((sample.max_node_load for sample in samples), dtype=float, count=len(samples))
+    max_edge_loads = np.fromiter((sample.max_edge_load for sample in samples), dtype=float, count=len(samples))
+    return profits, max_node_loads, max_edge_loads
+
+
+def select_pareto_front(profits, max_node_loads, max_edge_loads, max_number_of_samples=None):
+    ''' Returns the indices of the samples on the Pareto front, i.e. of the samples for which no other sample has at
+        least the profit and at most the loads, ordered by decreasing profit (samples equal in all three values are
+        retained once). The samples are swept in this order, such that each sample only has to be compared with the
+        front found so far. If the front contains more than max_number_of_samples samples, only samples evenly
+        spread along it are returned.
+    '''
+    order = np.lexsort((max_edge_loads, max_node_loads, -profits))
+    front = np.empty(len(order), dtype=np.intp)
+    front_max_node_loads = np.empty(len(order))
+    front_max_edge_loads = np.empty(len(order))
+    front_size = 0
+    for index in order:
+        # all samples of the front have at least the profit of the sample
+        if np.any((front_max_node_loads[:front_size] <= max_node_loads[index]) &
+                  (front_max_edge_loads[:front_size] <= max_edge_loads[index])):
+            continue
+        front[front_size] = index
+        front_max_node_loads[front_size] = max_node_loads[index]
+        front_max_edge_loads[front_size] = max_edge_loads[index]
+        front_size += 1
+    front = front[:front_size]
+    if max_number_of_samples is not None and front_size > max_number_of_samples:
+        front = front[np.unique(np.linspace(0, front_size - 1, max_number_of_samples).round().astype(np.intp))]
+    return front
+
+
+def select_top_k(profits, max_node_loads, max_edge_loads, k, criteria=None):
+    ''' Returns the indices of the k best samples under each of the criteria (by default all TOP_K_CRITERIA),
+        ordered by decreasing profit. Each selection is a partial sort (numpy.argpartition) in linear time; a sample
+        selected by several criteria is returned once.
+    '''
+    if criteria is None:
+        criteria = sorted(TOP_K_CRITERIA.keys())
+    selected = np.zeros(len(profits), dtype=bool)
+    for criterion in criteria:
+        values = TOP_K_CRITERIA[criterion](profits, max_node_loads, max_edge_loads)
+        if k < len(values):
+            selected[np.argpartition(values, k - 1)[:k]] = True
+        else:
+            selected[:] = True
+    indices = np.flatnonzero(selected)
+    return indices[np.argsort(-profits[indices], kind="stable")]
 
-    def __init__(self):
-        pass
 
-    def reduce_baseline_solution(self, baseline_solutions_input_pickle_name, reduced_baseline_solutions_output_pickle_name=None):
+def remove_solutions_outside_of_scenario_range(scenario_solution_storage, min_scenario_index=None, max_scenario_index=None):
+    ''' Removes the solutions of all scenarios not contained in [min_scenario_index, max_scenario_index] from the
+        storage, where None denotes an unbounded side of the range.
+    '''
+    for scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.values():
+        for scenario_id in list(scenario_solution_dict.keys()):
+            if not is_in_scenario_range(scenario_id, min_scenario_index, max_scenario_index):
+                del scenario_solution_dict[scenario_id]
 
-        baseline_solutions_input_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, baseline_solutions_input_pickle_name)
 
-        reduced_baseline_solutions_output_pickle_path = None
-        if reduced_baseline_solutions_output_pickle_name is None:
-            file_basename = os.path.basename(baseline_solutions_input_pickle_path).split(".")[0]
-            reduced_baseline_solutions_output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR,
-                                                                         file_basename + "_reduced.pickle")
-        else:
-            reduced_baseline_solutions_output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR,
-                                                                         baseline_solutions_input_pickle_name)
-
-        logger.info("\nWill read from ..\n\t{} \n\t\tand store reduced data into\n\t{}\n".format(baseline_solutions_input_pickle_path, reduced_baseline_solutions_output_pickle_path))
-
-        logger.info("Reading pickle file at {}".format(baseline_solutions_input_pickle_path))
-        with open(baseline_solutions_input_pickle_path, "rb") as input_file:
-            solution = pickle.load(input_file)
-
-        ssd = solution.algorithm_scenario_solution_dictionary
-        for algorithm in ssd:
-            logger.info(".. Reducing results of algorithm {}".format(algorithm))
-            for scenario_id in ssd[algorithm]:
-                logger.info("   .. handling scenario {}".format(scenario_id))
-                for exec_id in ssd[algorithm][scenario_id]:
-                    params, scenario = solution.scenario_parameter_container.scenario_triple[scenario_id]
-                    load = dict([((u, v), 0.0) for (u, v) in scenario.substrate.edges])
-                    for u in scenario.substrate.nodes:
-                        for types in scenario.substrate.node[u]['supported_types']:
-                            load[(types, u)] = 0.0
-                    mappings = ssd[algorithm][scenario_id][exec_id].solution.request_mapping
-                    number_of_embedde_reqs = 0
-                    number_of_req_profit = 0
-                    number_of_requests = len(ssd[algorithm][scenario_id][exec_id].solution.scenario.requests)
-                    for req in ssd[algorithm][scenario_id][exec_id].solution.scenario.requests:
-                        if req.profit > 0:
-                            number_of_req_profit += 1
-                        if mappings[req].is_embedded:
-                            number_of_embedde_reqs += 1
-                            for i, u in mappings[req].mapping_nodes.items():
-                                node_demand = req.get_node_demand(i)
-                                load[(req.get_type(i), u)] += node_demand
-                            for ve, sedge_list in mappings[req].mapping_edges.items():
-                                edge_demand = req.get_edge_demand(ve)
-                                for sedge in sedge_list:
-                                    load[sedge] += edge_demand
-                    percentage_embbed = number_of_embedde_reqs / float(number_of_requests)
-                    algo_result = ssd[algorithm][scenario_id][exec_id]
-                    ssd[algorithm][scenario_id][exec_id] = ReducedBaselineSolution(
-                        load=load,
-                        runtime=algo_result.temporal_log.log_entries[-1].time_within_gurobi,
-                        status=algo_result.status,
-                        found_solution=None,
-                        embedding_ratio=percentage_embbed,
-                        temporal_log=algo_result.temporal_log,
-                        nu_real_req=number_of_req_profit,
-                        original_number_requests=number_of_requests
-                    )
-        del solution.scenario_parameter_container.scenario_list
-        del solution.scenario_parameter_container.scenario_triple
-
-        logger.info("Writing result pickle to {}".format(reduced_baseline_solutions_output_pickle_path))
-        with open(reduced_baseline_solutions_output_pickle_path, "wb") as f:
-            pickle.dump(solution, f)
-        logger.info("All done.")
-
-class RandRoundResultReducer(object):
+class ResultExtractor(object):
+    ''' Derives the data to be plotted from the raw solution of an algorithm. FIELDS lists the attributes of the
+        reduced solutions and REQUIRES_SCENARIO states whether the scenario of the solution is needed.
+        Extractors are registered per algorithm id via register_result_extractor.
+    '''
 
-    def __init__(self):
-        pass
+    FIELDS = ()
+    REQUIRES_SCENARIO = False
 
-    def reduce_randomized_rounding_solution(self,
-                                            randround_solutions_input_pickle_name,
-                                            reduced_randround_solutions_output_pickle_name=None):
+    def extract(self, scenario, solution):
+        raise RuntimeError("This is an abstract method")
 
-        randround_solutions_input_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR,
-                                                             randround_solutions_input_pickle_name)
+    def get_ecdf_values(self, reduced_solution):
+        ''' Returns the values of the reduced solution whose distributions are summarized by quantile sketches
+            (see build_quantile_sketches), keyed by (data name, resource) as plotted in the ECDFs of resource loads.
+        '''
+        return {}
 
-        reduced_randround_solutions_output_pickle_path = None
-        if reduced_randround_solutions_output_pickle_name is None:
-            file_basename = os.path.basename(randround_solutions_input_pickle_path).split(".")[0]
-            reduced_randround_solutions_output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR,
-                                                                          file_basename + "_reduced.pickle")
-        else:
-            reduced_randround_solutions_output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR,
-                                                                          randround_solutions_input_pickle_name)
 
-        logger.info("\nWill read from ..\n\t{} \n\t\tand store reduced data into\n\t{}\n".format(
-            randround_solutions_input_pickle_path, reduced_randround_solutions_output_pickle_path))
+class BaselineResultReducer(ResultExtractor):
 
-        logger.info("Reading pickle file at {}".format(randround_solutions_input_pickle_path))
-        with open(randround_solutions_input_pickle_path, "rb") as f:
-            sss = pickle.load(f)
+    FIELDS = ReducedBaselineSolution._fields
+    REQUIRES_SCENARIO = True
 
-        sss.scenario_parameter_container.scenario_list = None
-        sss.scenario_parameter_container.scenario_triple = None
+    def __init__(self):
+        pass
 
-        for alg, scenario_solution_dict in sss.algorithm_scenario_solution_dictionary.items():
-            logger.info(".. Reducing results of algorithm {}".format(alg))
-            for sc_id, ex_param_solution_dict in scenario_solution_dict.items():
-                logger.info("   .. handling scenario {}".format(sc_id))
-                for ex_id, solution in ex_param_solution_dict.items():
-                    compressed = self.reduce_single_solution(solution)
-                    ex_param_solution_dict[ex_id] = compressed
+    def reduce_baseline_solution(self,
+                                 baseline_solutions_input_pickle_name,
+                                 reduced_baseline_solutions_output_pickle_name=None,
+                                 min_scenario_index=None,
+                                 max_scenario_index=None,
+                                 processes=1):
+        reduce_result_pickle(baseline_solutions_input_pickle_name,
+                             reduced_baseline_solutions_output_pickle_name,
+                             min_scenario_index,
+                             max_scenario_index,
+                             processes)
+
+    def extract(self, scenario, solution):
+        return self.reduce_single_solution(scenario, solution)
+
+    def get_ecdf_values(self, reduced_solution):
+        node_loads = [load for (x, _), load in reduced_solution.load.items() if x == "universal"]
+        edge_loads = [load for (x, _), load in reduced_solution.load.items() if x != "universal"]
+        values = {}
+        if node_loads:
+            values[("baseline", "node")] = max(node_loads)
+        if edge_loads:
+            values[("baseline", "edge")] = max(edge_loads)
+        return values
+
+    def reduce_single_solution(self, scenario, algo_result):
+        load = dict([((u, v), 0.0) for (u, v) in scenario.substrate.edges])
+        for u in scenario.substrate.nodes:
+            for types in scenario.substrate.node[u]['supported_types']:
+                load[(types, u)] = 0.0
+        mappings = algo_result.solution.request_mapping
+        number_of_embedde_reqs = 0
+        number_of_req_profit = 0
+        number_of_requests = len(algo_result.solution.scenario.requests)
+        for req in algo_result.solution.scenario.requests:
+            if req.profit > 0:
+                number_of_req_profit += 1
+            if mappings[req].is_embedded:
+                number_of_embedde_reqs += 1
+                for i, u in mappings[req].mapping_nodes.items():
+                    node_demand = req.get_node_demand(i)
+                    load[(req.get_type(i), u)] += node_demand
+                for ve, sedge_list in mappings[req].mapping_edges.items():
+                    edge_demand = req.get_edge_demand(ve)
+                    for sedge in sedge_list:
+                        load[sedge] += edge_demand
+        percentage_embbed = number_of_embedde_reqs / float(number_of_requests)
+        return ReducedBaselineSolution(
+            load=load,
+            runtime=algo_result.temporal_log.log_entries[-1].time_within_gurobi,
+            status=algo_result.status,
+            found_solution=None,
+            embedding_ratio=percentage_embbed,
+            temporal_log=algo_result.temporal_log,
+            nu_real_req=number_of_req_profit,
+            original_number_requests=number_of_requests
+        )
+
+class RandRoundResultReducer(ResultExtractor):
+
+    FIELDS = ("meta_data", "mdk_result", "mdk_meta_data", "result_wo_violations", "collection_of_samples_with_violations")
+
+    def __init__(self, sample_retention=None, number_of_retained_samples=None):
+        ''' By default, the sample retention set via set_sample_retention is used. '''
+        self.sample_retention = _sample_retention if sample_retention is None else sample_retention
+        self.number_of_retained_samples = _number_of_retained_samples if number_of_retained_samples is None else number_of_retained_samples
 
-        logger.info("Writing result pickle to {}".format(reduced_randround_solutions_output_pickle_path))
-        with open(os.path.join(reduced_randround_solutions_output_pickle_path),
-                  "wb") as f:
-            pickle.dump(sss, f)
-        logger.info("All done.")
+    def reduce_randomized_rounding_solution(self,
+                                            randround_solutions_input_pickle_name,
+                                            reduced_randround_solutions_output_pickle_name=None,
+                                            min_scenario_index=None,
+                                            max_scenario_index=None,
+                                            processes=1):
+        reduce_result_pickle(randround_solutions_input_pickle_name,
+                             reduced_randround_solutions_output_pickle_name,
+                             min_scenario_index,
+                             max_scenario_index,
+                             processes)
+
+    def extract(self, scenario, solution):
+        return self.reduce_single_solution(solution)
+
+    def get_ecdf_values(self, reduced_solution):
+        samples = {"min_aug": reduced_solution.collection_of_samples_with_violations[0],
+                   "max_profit": reduced_solution.collection_of_samples_with_violations[1],
+                   "wo_viol": reduced_solution.result_wo_violations,
+                   "mdk": reduced_solution.mdk_result}
+        values = {}
+        for data_name, sample in samples.items():
+            values[(data_name, "node")] = sample.max_node_load * 100.0
+            values[(data_name, "edge")] = sample.max_edge_load * 100.0
+        return values
 
     def reduce_single_solution(self, solution):
         if solution is None:
@@ -158,6 +286,7 @@ class RandRoundResultReducer(object):
         avg_runtime = self.get_avg_runtime(solution)
         best_feasible = self.get_best_feasible_or_least_violating_solution(solution)
         best_objective = self.get_highest_obj_sol(solution)
+        retained_samples = self.get_retained_samples(solution)
         del solution.collection_of_samples_with_violations[:]
 
         # set the time of both to avg_runtime
@@ -171,8 +300,28 @@ class RandRoundResultReducer(object):
 
         solution.collection_of_samples_with_violations.append(best_feasible)
         solution.collection_of_samples_with_violations.append(best_objective)
+        solution.collection_of_samples_with_violations.extend(retained_samples)
         return solution
 
+    def get_retained_samples(self, full_solution):
+        ''' Returns the samples retained according to the sample retention, which are stored after the best feasible
+            and the highest objective sample. At most number_of_retained_samples samples (per top-k criterion) are
+            returned.
+        '''
+        if self.sample_retention == SAMPLE_RETENTION_BEST:
+            return []
+        samples = [sample for sample in full_solution.collection_of_samples_with_violations if sample is not None]
+        if not samples:
+            return []
+        sample_arrays = get_sample_arrays(samples)
+        if self.sample_retention == SAMPLE_RETENTION_PARETO:
+            indices = select_pareto_front(*sample_arrays, max_number_of_samples=self.number_of_retained_samples)
+        elif self.sample_retention == SAMPLE_RETENTION_TOP_K:
+            indices = select_top_k(*sample_arrays, k=self.number_of_retained_samples)
+        else:
+            raise ValueError("Unknown sample retention {}".format(self.sample_retention))
+        return [samples[index] for index in indices]
+
     def get_avg_runtime(self, full_solution):
         t = 0.0
         for sample in full_solution.collection_of_samples_with_violations:
@@ -250,3 +399,311 @@ class RandRoundResultReducer(object):
                 logger.debug("      Discard: " + str(sample))
         logger.debug("Best objective with obj {} and max load {}: {}".format(best_obj, best_max_load, best_sample))
         return best_sample
+
+
+class LPResultExtractor(ResultExtractor):
+    ''' Keeps the runtime, the status (containing the LP's objective) and the temporal log of the LP solved by the
+        ModelCreatorCactusDecomposition, dropping the (decomposed) fractional solution.
+    '''
+
+    FIELDS = ReducedLPSolution._fields
+
+    def extract(self, scenario, solution):
+        return ReducedLPSolution(runtime=solution.temporal_log.log_entries[-1].time_within_gurobi,
+                                 status=solution.status,
+                                 temporal_log=solution.temporal_log)
+
+
+_result_extractor_classes = {}
+
+
+def register_result_extractor(algorithm_id, extractor_class):
+    ''' Registers the ResultExtractor reducing the solutions of the algorithm, replacing a previously registered one. '''
+    _result_extractor_classes[algorithm_id] = extractor_class
+
+
+def is_result_extractor_registered(algorithm_id):
+    return algorithm_id in _result_extractor_classes
+
+
+def get_result_extractor(algorithm_id):
+    ''' Returns the extractor registered for the algorithm. Raises a RuntimeError for unregistered algorithms, whose
+        solutions cannot be reduced.
+    '''
+    if algorithm_id not in _result_extractor_classes:
+        raise RuntimeError("No result extractor is registered for the algorithm {} (registered are: {}); register one "
+                           "via register_result_extractor.".format(algorithm_id,
+                                                                    ", ".join(sorted(_result_extractor_classes.keys()))))
+    return _result_extractor_classes[algorithm_id]()
+
+
+register_result_extractor(mip.ClassicMCFModel.ALGORITHM_ID, BaselineResultReducer)
+register_result_extractor(randomized_rounding_triumvirate.RandomizedRoundingTriumvirate.ALGORITHM_ID, RandRoundResultReducer)
+register_result_extractor(modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition.ALGORITHM_ID, LPResultExtractor)
+
+
+def reduce_solution_of_algorithm(algorithm_id, scenario, solution):
+    ''' Reduces a single solution by the extractor registered for the algorithm (see get_result_extractor).
+        Note that the solution may be modified.
+    '''
+    if solution is None:
+        return None
+    return get_result_extractor(algorithm_id).extract(scenario, solution)
+
+
+def build_quantile_sketches(scenario_solution_storage):
+    ''' Summarizes the values of the reduced solutions (see ResultExtractor.get_ecdf_values) by mergeable quantile
+        sketches, which are stored in the storage as quantile_sketches: (algorithm id, execution id) -> key -> sketch.
+        They allow plotting the ECDFs over all scenarios without looking at the solutions again.
+    '''
+    values = {}
+    for algorithm_id, scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.items():
+        extractor = get_result_extractor(algorithm_id)
+        for execution_solution_dict in scenario_solution_dict.values():
+            for execution_id, solution in execution_solution_dict.items():
+                if solution is None:
+                    continue
+                for key, value in extractor.get_ecdf_values(solution).items():
+                    values.setdefault((algorithm_id, execution_id), {}).setdefault(key, []).append(value)
+    scenario_solution_storage.quantile_sketches = {
+        algorithm_execution: {key: quantile_sketch.QuantileSketch.from_values(key_values) for key, key_values in values_per_key.items()}
+        for algorithm_execution, values_per_key in values.items()}
+
+
+def merge_quantile_sketches(quantile_sketches, other_quantile_sketches):
+    ''' Merges the other quantile sketches (see build_quantile_sketches) into the first ones, which are returned. If
+        either is None, e.g. as the results were reduced before the sketches were introduced, None is returned.
+    '''
+    if quantile_sketches is None or other_quantile_sketches is None:
+        return None
+    for algorithm_execution, other_sketch_per_key in other_quantile_sketches.items():
+        sketch_per_key = quantile_sketches.setdefault(algorithm_execution, {})
+        for key, other_sketch in other_sketch_per_key.items():
+            if key in sketch_per_key:
+                sketch_per_key[key].merge(other_sketch)
+            else:
+                sketch_per_key[key] = other_sketch
+    return quantile_sketches
+
+
+def reduce_results(scenario_solution_storage):
+    ''' Reduces the solutions of all algorithms of the storage in a single pass, each by the extractor registered
+        for its algorithm, and removes the scenarios from the storage.
+    '''
+    scenario_triple = scenario_solution_storage.scenario_parameter_container.scenario_triple
+    for algorithm_id, scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.items():
+        extractor = get_result_extractor(algorithm_id)
+        logger.info(".. Reducing results of algorithm {} by the {}".format(algorithm_id, type(extractor).__name__))
+        for scenario_id, execution_solution_dict in scenario_solution_dict.items():
+            logger.info("   .. handling scenario {}".format(scenario_id))
+            scenario = scenario_triple[scenario_id][1] if extractor.REQUIRES_SCENARIO else None
+            for execution_id, solution in execution_solution_dict.items():
+                if solution is not None:
+                    execution_solution_dict[execution_id] = extractor.extract(scenario, solution)
+    scenario_solution_storage.scenario_parameter_container.scenario_list = None
+    scenario_solution_storage.scenario_parameter_container.scenario_triple = None
+
+
+def reduce_result_pickle(input_pickle_name, output_pickle_name=None, min_scenario_index=None, max_scenario_index=None, processes=1):
+    ''' Reads the result pickle (or result shard directory, see reduce_result_shards_to_pickle) input_pickle_name
+        in ALIB_EXPERIMENT_HOME/input once, reduces the solutions of all contained algorithms (see reduce_results)
+        of the scenario range and writes them to get_reduced_pickle_path.
+
+        Note that a result pickle can only be unpickled as a whole, i.e. all of its solutions are loaded even if
+        only a small scenario range is reduced. Only for result shard directories, the shards outside of the
+        range are neither loaded nor reduced.
+    '''
+    input_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, input_pickle_name)
+    output_pickle_path = get_reduced_pickle_path(input_pickle_name, output_pickle_name, min_scenario_index, max_scenario_index)
+    if os.path.isdir(input_pickle_path):
+        reduce_result_shards_to_pickle(input_pickle_path, output_pickle_path, min_scenario_index, max_scenario_index, processes)
+        return
+
+    logger.info("\nWill read from ..\n\t{} \n\t\tand store reduced data into\n\t{}\n".format(input_pickle_path, output_pickle_path))
+
+    logger.info("Reading pickle file at {}".format(input_pickle_path))
+    scenario_solution_storage = pickle_io.load_file(input_pickle_path)
+
+    remove_solutions_outside_of_scenario_range(scenario_solution_storage, min_scenario_index, max_scenario_index)
+    reduce_results(scenario_solution_storage)
+    build_quantile_sketches(scenario_solution_storage)
+
+    logger.info("Writing result pickle to {}".format(output_pickle_path))
+    result_store.write_pickle_atomically(scenario_solution_storage, output_pickle_path)
+    logger.info("All done.")
+
+
+def strip_scenarios(scenario_parameter_container):
+    ''' Returns a shallow copy of the container without the scenarios, as contained in reduced result pickles. '''
+    return result_store.strip_scenarios(scenario_parameter_container)
+
+
+def is_in_scenario_range(scenario_id, min_scenario_index=None, max_scenario_index=None):
+    return ((min_scenario_index is None or scenario_id >= min_scenario_index) and
+            (max_scenario_index is None or scenario_id <= max_scenario_index))
+
+
+def get_reduced_shard_directory(shard_directory):
+    ''' Reduced shards are stored next to the shards, as done by start-experiment --reduce_results. '''
+    return os.path.normpath(shard_directory) + "_reduced"
+
+
+def is_reduced_shard_directory(shard_directory):
+    ''' Directories of reduced shards are marked when they are initialized (see ResultShardStore.is_reduced). '''
+    return result_store.ResultShardStore(shard_directory).is_reduced()
+
+
+_shard_reduction_context = None
+
+
+def _initialize_shard_reduction(shard_store, reduced_shard_store, scenario_container):
+    global _shard_reduction_context
+    _shard_reduction_context = (shard_store, reduced_shard_store, scenario_container)
+
+
+def _reduce_shard(entry):
+    shard_store, reduced_shard_store, scenario_container = _shard_reduction_context
+    scenario_id, execution_id = entry["scenario_id"], entry["execution_id"]
+    algorithm_id, solution = shard_store.load_shard(scenario_id, execution_id)
+    scenario = None
+    if get_result_extractor(algorithm_id).REQUIRES_SCENARIO:
+        scenario = scenario_container.scenario_triple[scenario_id][1]
+    reduced_shard_store.write_shard(scenario_id, execution_id, algorithm_id,
+                                    reduce_solution_of_algorithm(algorithm_id, scenario, solution))
+    return scenario_id, execution_id
+
+
+def reduce_shards(shard_store, reduced_shard_store, scenario_container, entries, processes=1):
+    ''' Reduces the shards of the given manifest entries of shard_store into reduced_shard_store by the given number
+        of processes. Scenarios are only looked up for algorithms whose extractor requires them.
+    '''
+    if processes <= 1 or len(entries) <= 1:
+        _initialize_shard_reduction(shard_store, reduced_shard_store, scenario_container)
+        for entry in entries:
+            _reduce_shard(entry)
+        return
+    # the scenario container is handed to the forked workers without pickling it
+    pool = Pool(processes, initializer=_initialize_shard_reduction,
+                initargs=(shard_store, reduced_shard_store, scenario_container))
+    try:
+        for _ in pool.imap_unordered(_reduce_shard, entries):
+            pass
+    finally:
+        pool.close()
+        pool.join()
+
+
+def reduce_result_shards(shard_directory, min_scenario_index=None, max_scenario_index=None, processes=1, metadata=None):
+    ''' Reduces the completed shards of shard_directory (e.g. of a running experiment) into the reduced shards of
+        get_reduced_shard_directory and returns the ResultShardStore of the latter. Shards which were reduced before
+        are skipped, such that repeated calls only reduce the shards completed in the meantime. The shards are
+        reduced by the given number of processes. The metadata of the shard directory (which contains all
+        scenarios) is only loaded if there are shards to reduce, unless it is given.
+    '''
+    shard_store = result_store.ResultShardStore(shard_directory)
+    reduced_shard_store = result_store.ResultShardStore(get_reduced_shard_directory(shard_directory))
+    reduced_pairs = reduced_shard_store.get_completed_pairs()
+    pending_entries = [entry for entry in shard_store.read_manifest()
+                       if (entry["scenario_id"], entry["execution_id"]) not in reduced_pairs and
+                       is_in_scenario_range(entry["scenario_id"], min_scenario_index, max_scenario_index)]
+    if not pending_entries and os.path.exists(reduced_shard_store.metadata_path):
+        return reduced_shard_store
+    if metadata is None:
+        metadata = shard_store.load_metadata()
+    scenario_container, execution_parameter_container = metadata
+    if not os.path.exists(reduced_shard_store.metadata_path):
+        reduced_shard_store.initialize(strip_scenarios(scenario_container), execution_parameter_container, reduced=True)
+    logger.info("Reducing {} new result shards of {} ({} reduced before)".format(len(pending_entries), shard_directory, len(reduced_pairs)))
+    reduce_shards(shard_store, reduced_shard_store, scenario_container, pending_entries, processes)
+    return reduced_shard_store
+
+
+def load_reduced_results(path, processes=1):
+    ''' Returns the reduced results stored at path, which is either a reduced pickle, a directory of reduced shards
+        or a directory of (full) result shards, which is reduced via reduce_result_shards first. In the latter two
+        cases, the results of experiments which are still running can be loaded.
+    '''
+    if not os.path.isdir(path):
+        return pickle_io.load_file(path)
+    shard_store = result_store.ResultShardStore(path)
+    if shard_store.is_reduced():
+        scenario_solution_storage = shard_store.merge()
+    else:
+        scenario_solution_storage = reduce_result_shards(path, processes=processes).merge()
+    build_quantile_sketches(scenario_solution_storage)
+    return scenario_solution_storage
+
+
+def reduce_result_shards_to_pickle(shard_directory, output_pickle_path, min_scenario_index=None, max_scenario_index=None, processes=1):
+    ''' Reduces the result shards (see reduce_result_shards) and writes the reduced results of the scenario range
+        to output_pickle_path.
+    '''
+    reduced_shard_store = reduce_result_shards(shard_directory, min_scenario_index, max_scenario_index, processes)
+    reduced_scenario_solution_storage = reduced_shard_store.merge(
+        scenario_filter=lambda scenario_id: is_in_scenario_range(scenario_id, min_scenario_index, max_scenario_index))
+    build_quantile_sketches(reduced_scenario_solution_storage)
+    logger.info("Writing result pickle to {}".format(output_pickle_path))
+    result_store.write_pickle_atomically(reduced_scenario_solution_storage, output_pickle_path)
+    logger.info("All done.")
+
+
+def merge_reduced_results(reduced_pickle_paths):
+    ''' Returns the reduced results of all given (partial) reduced pickles, e.g. written by the reducers for disjoint
+        scenario ranges, as a single storage. The pickles are loaded one after another and their solutions are moved
+        into the storage of the first one, and their quantile sketches are merged (see merge_quantile_sketches).
+        Raises a RuntimeError if the pickles stem from different executions or if a solution is contained in more
+        than one of them.
+    '''
+    merged_storage = None
+    origin_of_solution = {}
+    for index, reduced_pickle_path in enumerate(reduced_pickle_paths):
+        logger.info("Reading reduced pickle at {}".format(reduced_pickle_path))
+        partial_storage = pickle_io.load_file(reduced_pickle_path)
+        if merged_storage is None:
+            merged_storage = solutions.ScenarioSolutionStorage(partial_storage.scenario_parameter_container,
+                                                               partial_storage.execution_parameter_container)
+            merged_storage.quantile_sketches = getattr(partial_storage, "quantile_sketches", None)
+        elif (partial_storage.execution_parameter_container.algorithm_parameter_list !=
+              merged_storage.execution_parameter_container.algorithm_parameter_list):
+            raise RuntimeError("The execution parameters of {} differ from the ones of {}.".format(reduced_pickle_path,
+                                                                                                 reduced_pickle_paths[0]))
+        else:
+            merged_storage.quantile_sketches = merge_quantile_sketches(merged_storage.quantile_sketches,
+                                                                       getattr(partial_storage, "quantile_sketches", None))
+        number_of_solutions = 0
+        for algorithm_id, scenario_solution_dict in partial_storage.algorithm_scenario_solution_dictionary.items():
+            for scenario_id, execution_solution_dict in scenario_solution_dict.items():
+                for execution_id, solution in execution_solution_dict.items():
+                    key = (algorithm_id, scenario_id, execution_id)
+                    if key in origin_of_solution:
+                        raise RuntimeError("The solution of algorithm {}, scenario {} and execution {} is contained in both "
+                                           "{} and {}.".format(algorithm_id, scenario_id, execution_id,
+                                                               reduced_pickle_paths[origin_of_solution[key]], reduced_pickle_path))
+                    origin_of_solution[key] = index
+                    merged_storage.add_solution(algorithm_id, scenario_id, execution_id, solution)
+                    number_of_solutions += 1
+        logger.info(".. added {} solutions".format(number_of_solutions))
+        del partial_storage
+
+    if merged_storage is None:
+        raise RuntimeError("No reduced pickles given.")
+    scenario_parameter_dict = getattr(merged_storage.scenario_parameter_container, "scenario_parameter_dict", None)
+    if isinstance(scenario_parameter_dict, dict) and "all" in scenario_parameter_dict:
+        missing_scenario_ids = set(scenario_parameter_dict["all"]) - set(scenario_id for _, scenario_id, _ in origin_of_solution)
+        if missing_scenario_ids:
+            logger.warning("The merged results do not contain any solution for {} of {} scenarios.".format(
+                len(missing_scenario_ids), len(scenario_parameter_dict["all"])))
+    return merged_storage
+
+
+def merge_reduced_pickles(reduced_pickle_names, output_pickle_name):
+    ''' Merges the reduced pickles contained in ALIB_EXPERIMENT_HOME/input into output_pickle_name within
+        ALIB_EXPERIMENT_HOME/output.
+    '''
+    reduced_pickle_paths = [os.path.join(util.ExperimentPathHandler.INPUT_DIR, reduced_pickle_name)
+                            for reduced_pickle_name in reduced_pickle_names]
+    output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, os.path.basename(output_pickle_name))
+    merged_storage = merge_reduced_results(reduced_pickle_paths)
+    logger.info("Writing merged reduced pickle to {}".format(output_pickle_path))
+    result_store.write_pickle_atomically(merged_storage, output_pickle_path)
+    logger.info("All done.")
@@ -0,0 +1,140 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Mergeable quantile sketches used for plotting ECDFs of large data series.
+
+The sketch follows the compactor hierarchy of Manku et al. / Karnin et al. (KLL): items are collected in
+level 0; whenever a level holds more than k items, these are sorted and every second one is promoted to the
+next level, where each item represents twice as many observations. The memory of a sketch is hence
+O(k log(n/k)) and the rank error is O(log(n/k) / k). Sketches can be merged, such that they may be computed
+independently (e.g. per worker process or per chunk of scenarios) and combined afterwards.
+"""
+
+import numpy as np
+
+
+class QuantileSketch(object):
+    ''' Mergeable quantile summary of a stream of floats. NaN values are not inserted but counted separately.
+        Compactions alternate between keeping the items at even and odd positions, making the sketch deterministic.
+    '''
+
+    def __init__(self, k=256):
+        if k < 2:
+            raise RuntimeError("The capacity of the compactors must be at least 2, but is {}.".format(k))
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.nan_count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._compaction_parity = 0
+
+    @classmethod
+    def from_values(cls, values, k=256):
+        sketch = cls(k=k)
+        sketch.update(values)
+        return sketch
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        nan_mask = np.isnan(values)
+        self.nan_count += int(np.count_nonzero(nan_mask))
+        values = values[~nan_mask]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        for start in range(0, len(values), self.k):
+            self.levels[0] = np.concatenate((self.levels[0], values[start:start + self.k]))
+            self._compress()
+
+    def merge(self, other):
+        ''' Merges the other sketch into this one. Both sketches should use the same k. '''
+        if other.k != self.k:
+            raise RuntimeError("Cannot merge sketches of different capacities ({} and {}).".format(self.k, other.k))
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self.nan_count += other.nan_count
+        self.min = np.nanmin([self.min, other.min])
+        self.max = np.nanmax([self.max, other.max])
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                if len(items) % 2 == 1:
+                    # the largest item stays on this level to keep the weights exact
+                    remaining, items = items[-1:], items[:-1]
+                else:
+                    remaining = np.empty(0)
+                promoted = items[self._compaction_parity::2]
+                self._compaction_parity = 1 - self._compaction_parity
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level] = remaining
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def _sorted_items_and_weights(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind="mergesort")
+        return items[order], weights[order]
+
+    def quantiles(self, fractions):
+        ''' Returns the (approximate) values at the given fractions (each in [0,1]) of the non-NaN values. '''
+        fractions = np.asarray(fractions, dtype=float)
+        if self.count == 0:
+            return np.full(fractions.shape, np.nan)
+        items, weights = self._sorted_items_and_weights()
+        cumulative = np.cumsum(weights) / weights.sum()
+        indices = np.searchsorted(cumulative, fractions, side="left")
+        result = items[np.minimum(indices, len(items) - 1)]
+        result = np.where(fractions <= 0.0, self.min, result)
+        return np.where(fractions >= 1.0, self.max, result)
+
+    def ecdf_points(self, number_of_points=200, count_nan=False):
+        ''' Returns at most number_of_points (x, y) pairs describing the ECDF of the inserted values. If count_nan is
+            set, NaN values are accounted for in the total, i.e. the ECDF does not reach 1.0 (as np.sort based ECDFs
+            containing NaN values do).
+        '''
+        if self.count == 0:
+            return np.empty(0), np.empty(0)
+        items, weights = self._sorted_items_and_weights()
+        if len(items) <= number_of_points:
+            xs = items
+            ys = np.cumsum(weights) / float(self.count)
+        else:
+            ys = np.linspace(1.0 / number_of_points, 1.0, number_of_points)
+            xs = self.quantiles(ys)
+        if count_nan:
+            ys = ys * self.count / float(self.count + self.nan_count)
+        return xs, ys
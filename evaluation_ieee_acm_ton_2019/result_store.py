@@ -0,0 +1,268 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Sharded storage of experiment results.
+
+Instead of keeping all solutions in memory until the end of an experiment, each solution of a single
+(scenario id, execution id) pair is written atomically into its own shard. Completed shards are recorded in
+an append-only manifest, such that an interrupted experiment can be resumed by skipping the completed
+pairs. The shards can be merged into the ScenarioSolutionStorage pickle expected by the other commands
+or be read directly (and in parallel) by later stages.
+
+Layout of a shard directory:
+
+    metadata.pickle                                   (scenario container, execution parameter container)
+    parameters.pickle                                 the same without the scenarios (see strip_scenarios)
+    manifest.jsonl                                    one JSON object per completed shard
+    reduced                                           empty marker of directories of reduced shards
+    scenario_<scenario id>_execution_<execution id>.pickle   (algorithm id, solution)
+    substrates/substrate_<fingerprint>.pickle         substrates referenced by the shards
+
+Substrates are stored only once (see substrate_interning) and the merged results share one substrate object per
+fingerprint.
+"""
+
+import copy
+import json
+import os
+import shutil
+
+from alib import solutions, util
+
+from . import pickle_io
+from . import scenario_store
+from . import substrate_interning
+
+REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
+
+METADATA_FILENAME = "metadata.pickle"
+PARAMETERS_FILENAME = "parameters.pickle"
+MANIFEST_FILENAME = "manifest.jsonl"
+REDUCED_MARKER_FILENAME = "reduced"
+SUBSTRATE_DIRECTORY_NAME = "substrates"
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def write_pickle_atomically(obj, path, create_pickler=None):
+    ''' Writes the pickle into a temporary file first, such that path either holds the complete pickle or none.
+        If given, create_pickler(file) is used to create the pickler. The pickle is compressed according to the
+        suffix of path (see pickle_io).
+    '''
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    with pickle_io.open_file(temporary_path, "wb", compression_suffix=pickle_io.get_compression_suffix(path)) as f:
+        if create_pickler is None:
+            pickle_io.dump(obj, f)
+        else:
+            create_pickler(f).dump(obj)
+    # synchronize after closing, such that compressed files are complete
+    file_descriptor = os.open(temporary_path, os.O_RDONLY)
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+    os.replace(temporary_path, path)
+
+
+def strip_scenarios(scenario_parameter_container):
+    ''' Returns a shallow copy of the container without the scenarios, as contained in reduced result pickles. '''
+    stripped_container = copy.copy(scenario_parameter_container)
+    stripped_container.scenario_list = None
+    stripped_container.scenario_triple = None
+    return stripped_container
+
+
+class ResultShardStore(object):
+    ''' Stores the solution of each (scenario id, execution id) pair in its own file within shard_directory.
+
+        Shards may be written concurrently by several processes: each shard is written atomically and its
+        manifest entry is appended via a single write to a file opened with O_APPEND.
+    '''
+
+    def __init__(self, shard_directory):
+        self.shard_directory = shard_directory
+        self.manifest_path = os.path.join(shard_directory, MANIFEST_FILENAME)
+        self.metadata_path = os.path.join(shard_directory, METADATA_FILENAME)
+        self.parameters_path = os.path.join(shard_directory, PARAMETERS_FILENAME)
+        self.reduced_marker_path = os.path.join(shard_directory, REDUCED_MARKER_FILENAME)
+        self.substrate_directory = substrate_interning.SubstrateDirectory(os.path.join(shard_directory, SUBSTRATE_DIRECTORY_NAME))
+
+    def initialize(self, scenario_container, execution_parameter_container, overwrite=False, reduced=False):
+        ''' Creates the shard directory and stores the containers needed to build a ScenarioSolutionStorage.
+            With overwrite, existing shards are removed; otherwise they are kept to resume the experiment. Resuming
+            requires the stored execution parameters to equal the given ones, as the shards were computed with the
+            former. The containers are only written if they are not stored yet; scenarios of indexed scenario files
+            are loaded and stored with them (see scenario_store.materialize_scenarios), such that the shard directory
+            and the merged results do not depend on the indexed file. Directories of reduced shards are marked as
+            such (see is_reduced).
+        '''
+        if overwrite and os.path.exists(self.shard_directory):
+            logger.info("Removing existing result shards in {}".format(self.shard_directory))
+            shutil.rmtree(self.shard_directory)
+        os.makedirs(self.shard_directory, exist_ok=True)
+        if reduced and not os.path.exists(self.reduced_marker_path):
+            open(self.reduced_marker_path, "w").close()
+        if not os.path.exists(self.metadata_path):
+            write_pickle_atomically((strip_scenarios(scenario_container), execution_parameter_container), self.parameters_path)
+            write_pickle_atomically((scenario_store.materialize_scenarios(scenario_container), execution_parameter_container),
+                                    self.metadata_path)
+            return
+        _, stored_execution_parameter_container = self.load_parameters()
+        if stored_execution_parameter_container.algorithm_parameter_list != execution_parameter_container.algorithm_parameter_list:
+            raise RuntimeError("The result shards in {} were computed with different execution parameters ({} instead of {}). "
+                               "Remove or overwrite them to start anew.".format(self.shard_directory,
+                                                                               stored_execution_parameter_container.algorithm_parameter_list,
+                                                                               execution_parameter_container.algorithm_parameter_list))
+        logger.info("Resuming the result shards in {}".format(self.shard_directory))
+
+    def remove(self):
+        shutil.rmtree(self.shard_directory)
+
+    def get_shard_filename(self, scenario_id, execution_id):
+        return "scenario_{}_execution_{}.pickle".format(scenario_id, execution_id)
+
+    def get_shard_path(self, scenario_id, execution_id):
+        return os.path.join(self.shard_directory, self.get_shard_filename(scenario_id, execution_id))
+
+    def write_shard(self, scenario_id, execution_id, algorithm_id, solution):
+        write_pickle_atomically((algorithm_id, solution),
+                                self.get_shard_path(scenario_id, execution_id),
+                                create_pickler=lambda f: substrate_interning.SubstrateReferencingPickler(f, self.substrate_directory.store))
+        entry = {"scenario_id": scenario_id,
+                 "execution_id": execution_id,
+                 "algorithm_id": algorithm_id,
+                 "shard": self.get_shard_filename(scenario_id, execution_id)}
+        line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+        file_descriptor = os.open(self.manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(file_descriptor, line)
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+
+    def read_manifest_from(self, offset=0):
+        ''' Returns the manifest entries appended after the given byte offset together with the offset following
+            the last complete line. Entries whose shard is missing are ignored; an incomplete last line (being
+            appended or truncated as the process was killed) is read again on the next call.
+        '''
+        entries = []
+        if not os.path.exists(self.manifest_path):
+            return entries, offset
+        with open(self.manifest_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    entry = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    logger.warning("Ignoring malformed manifest entry {!r} in {}".format(line, self.manifest_path))
+                    continue
+                if not os.path.exists(os.path.join(self.shard_directory, entry["shard"])):
+                    continue
+                entries.append(entry)
+        return entries, offset
+
+    def read_manifest(self):
+        ''' Returns the manifest entries of all completed shards, ordered by scenario id and execution id. '''
+        entries = {}
+        for entry in self.read_manifest_from(0)[0]:
+            entries[(entry["scenario_id"], entry["execution_id"])] = entry
+        return [entries[key] for key in sorted(entries.keys())]
+
+    def get_completed_pairs(self):
+        return set((entry["scenario_id"], entry["execution_id"]) for entry in self.read_manifest())
+
+    def load_metadata(self):
+        with open(self.metadata_path, "rb") as f:
+            return pickle_io.load(f)
+
+    def load_parameters(self):
+        ''' Returns the metadata without the scenarios, which is much smaller than the full metadata. For shard
+            directories written before the parameters were stored separately, they are derived from the metadata
+            and stored, and reduced directories are marked.
+        '''
+        if not os.path.exists(self.parameters_path):
+            scenario_container, execution_parameter_container = self.load_metadata()
+            if scenario_container.scenario_triple is None:
+                open(self.reduced_marker_path, "w").close()
+            write_pickle_atomically((strip_scenarios(scenario_container), execution_parameter_container), self.parameters_path)
+        return pickle_io.load_file(self.parameters_path)
+
+    def is_reduced(self):
+        ''' Returns whether the shards contain reduced solutions, without loading the metadata (except once for
+            shard directories written before the marker was introduced, see load_parameters).
+        '''
+        if not os.path.exists(self.reduced_marker_path) and not os.path.exists(self.parameters_path) and os.path.exists(self.metadata_path):
+            self.load_parameters()
+        return os.path.exists(self.reduced_marker_path)
+
+    def load_shard(self, scenario_id, execution_id):
+        with open(self.get_shard_path(scenario_id, execution_id), "rb") as f:
+            return substrate_interning.SubstrateReferencingUnpickler(f, self.substrate_directory.load).load()
+
+    def iterate_shards(self, scenario_filter=None):
+        ''' Yields (algorithm id, scenario id, execution id, solution) for all completed shards, or only for those
+            whose scenario id satisfies scenario_filter. Other shards are not loaded.
+        '''
+        for entry in self.read_manifest():
+            if scenario_filter is not None and not scenario_filter(entry["scenario_id"]):
+                continue
+            algorithm_id, solution = self.load_shard(entry["scenario_id"], entry["execution_id"])
+            yield algorithm_id, entry["scenario_id"], entry["execution_id"], solution
+
+    def merge(self, scenario_filter=None):
+        ''' Returns a ScenarioSolutionStorage containing the solutions of all completed shards (see iterate_shards). '''
+        scenario_container, execution_parameter_container = self.load_metadata()
+        scenario_solution_storage = solutions.ScenarioSolutionStorage(scenario_container, execution_parameter_container)
+        number_of_shards = 0
+        for algorithm_id, scenario_id, execution_id, solution in self.iterate_shards(scenario_filter):
+            scenario_solution_storage.add_solution(algorithm_id, scenario_id, execution_id, solution)
+            number_of_shards += 1
+        substrate_interning.SubstrateInterner().intern_scenario_solution_storage(scenario_solution_storage)
+        logger.info("Merged {} result shards from {}".format(number_of_shards, self.shard_directory))
+        return scenario_solution_storage
+
+
+class CompletedPairTracker(object):
+    ''' Keeps the set of completed (scenario id, execution id) pairs of a ResultShardStore up to date by reading
+        only the manifest entries appended since the previous update, instead of re-reading the whole manifest.
+    '''
+
+    def __init__(self, shard_store):
+        self.shard_store = shard_store
+        self.manifest_offset = 0
+        self.completed_pairs = set()
+
+    def update(self):
+        entries, self.manifest_offset = self.shard_store.read_manifest_from(self.manifest_offset)
+        for entry in entries:
+            self.completed_pairs.add((entry["scenario_id"], entry["execution_id"]))
+        return self.completed_pairs
+
+
+def get_default_shard_directory(result_output_pickle):
+    ''' Shards of the result RESULT_OUTPUT_PICKLE are stored in ALIB_EXPERIMENT_HOME/output/<basename>_shards. '''
+    basename = os.path.basename(result_output_pickle).split(".")[0]
+    return os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, "{}_shards".format(basename))
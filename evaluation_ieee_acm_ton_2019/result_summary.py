@@ -0,0 +1,206 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Summary statistics of result files: contained algorithms and execution configurations, present and missing
+scenarios, the distribution of the solution status and runtime percentiles.
+
+Only the status and the runtime of each solution are kept while reading the results, and the statistics are
+computed on arrays afterwards. Result shard directories are read shard by shard.
+"""
+
+import os
+
+import numpy as np
+
+from alib import solutions
+
+from . import experiment_execution
+from . import pickle_io
+from . import result_store
+
+REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
+
+RUNTIME_PERCENTILES = (0, 25, 50, 75, 90, 99, 100)
+
+
+def extract_status(solution):
+    ''' Returns a label of the status of a (possibly reduced) solution. For Gurobi status objects, the Gurobi status
+        code is used.
+    '''
+    if solution is None:
+        return "no solution"
+    status = getattr(solution, "status", None)
+    if status is None:
+        return "unknown"
+    return str(getattr(status, "status", status))
+
+
+def get_expected_scenario_ids(scenario_parameter_container):
+    ''' Returns the ids of all generated scenarios, also for reduced results not containing the scenarios. '''
+    scenario_parameter_dict = getattr(scenario_parameter_container, "scenario_parameter_dict", None)
+    if isinstance(scenario_parameter_dict, dict) and "all" in scenario_parameter_dict:
+        return set(scenario_parameter_dict["all"])
+    if getattr(scenario_parameter_container, "scenario_triple", None) is not None:
+        return set(scenario_parameter_container.scenario_triple.keys())
+    return None
+
+
+class ResultSummary(object):
+    ''' Collects status and runtime of solutions, which are added one at a time, and computes the statistics. '''
+
+    def __init__(self, scenario_parameter_container, execution_parameter_container):
+        self.expected_scenario_ids = get_expected_scenario_ids(scenario_parameter_container)
+        self.execution_parameter_list = execution_parameter_container.algorithm_parameter_list
+        self._algorithm_ids = []
+        self._scenario_ids = []
+        self._execution_ids = []
+        self._statuses = []
+        self._runtimes = []
+
+    def add_solution(self, algorithm_id, scenario_id, execution_id, solution):
+        runtime = experiment_execution.extract_runtime(solution)
+        self._algorithm_ids.append(algorithm_id)
+        self._scenario_ids.append(scenario_id)
+        self._execution_ids.append(execution_id)
+        self._statuses.append(extract_status(solution))
+        self._runtimes.append(np.nan if runtime is None else runtime)
+
+    def add_scenario_solution_storage(self, scenario_solution_storage):
+        ''' Adds all solutions of the storage, removing them from the storage to free memory early. '''
+        for algorithm_id, scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.items():
+            for scenario_id, execution_solution_dict in scenario_solution_dict.items():
+                for execution_id in list(execution_solution_dict.keys()):
+                    self.add_solution(algorithm_id, scenario_id, execution_id, execution_solution_dict.pop(execution_id))
+
+    def _summarize_runtimes(self, runtimes):
+        runtimes = runtimes[~np.isnan(runtimes)]
+        if len(runtimes) == 0:
+            return None
+        percentiles = np.percentile(runtimes, RUNTIME_PERCENTILES)
+        result = {"mean": float(np.mean(runtimes))}
+        for percentile, value in zip(RUNTIME_PERCENTILES, percentiles):
+            result["p{}".format(percentile)] = float(value)
+        return result
+
+    def _summarize_statuses(self, statuses):
+        labels, counts = np.unique(statuses, return_counts=True)
+        return {str(label): int(count) for label, count in zip(labels, counts)}
+
+    def summarize(self):
+        ''' Returns the statistics as a dictionary which can be serialized as JSON. '''
+        algorithm_ids = np.array(self._algorithm_ids, dtype=object)
+        scenario_ids = np.array(self._scenario_ids, dtype=np.int64)
+        execution_ids = np.array(self._execution_ids, dtype=np.int64)
+        statuses = np.array(self._statuses, dtype=object)
+        runtimes = np.array(self._runtimes, dtype=np.float64)
+
+        present_scenario_ids = set(np.unique(scenario_ids).tolist())
+        summary = {"number_of_solutions": len(scenario_ids),
+                   "algorithm_ids": sorted(set(self._algorithm_ids)),
+                   "number_of_scenarios_present": len(present_scenario_ids),
+                   "number_of_scenarios_expected": None,
+                   "missing_scenario_ids": None,
+                   "executions": []}
+        if self.expected_scenario_ids is not None:
+            summary["number_of_scenarios_expected"] = len(self.expected_scenario_ids)
+            summary["missing_scenario_ids"] = sorted(self.expected_scenario_ids - present_scenario_ids)
+
+        for execution_id, execution_parameters in enumerate(self.execution_parameter_list):
+            selection = execution_ids == execution_id
+            execution_scenario_ids = set(scenario_ids[selection].tolist())
+            execution_summary = {"execution_id": execution_id,
+                                 "algorithm_id": execution_parameters["ALG_ID"],
+                                 "algorithm_parameters": repr(execution_parameters.get("ALGORITHM_PARAMETERS")),
+                                 "gurobi_parameters": repr(execution_parameters.get("GUROBI_PARAMETERS")),
+                                 "number_of_solutions": int(np.count_nonzero(selection)),
+                                 "missing_scenario_ids": None,
+                                 "status": self._summarize_statuses(statuses[selection]),
+                                 "runtime": self._summarize_runtimes(runtimes[selection])}
+            if self.expected_scenario_ids is not None:
+                execution_summary["missing_scenario_ids"] = sorted(self.expected_scenario_ids - execution_scenario_ids)
+            summary["executions"].append(execution_summary)
+        unknown_execution_ids = sorted(set(self._execution_ids) - set(range(len(self.execution_parameter_list))))
+        if unknown_execution_ids:
+            summary["unknown_execution_ids"] = unknown_execution_ids
+        summary["algorithms"] = {}
+        for algorithm_id in summary["algorithm_ids"]:
+            selection = algorithm_ids == algorithm_id
+            summary["algorithms"][algorithm_id] = {"number_of_solutions": int(np.count_nonzero(selection)),
+                                                   "status": self._summarize_statuses(statuses[selection]),
+                                                   "runtime": self._summarize_runtimes(runtimes[selection])}
+        return summary
+
+
+def summarize_results(path):
+    ''' Returns the statistics of the (raw or reduced) result pickle or result shard directory at path. '''
+    if os.path.isdir(path):
+        shard_store = result_store.ResultShardStore(path)
+        result_summary = ResultSummary(*shard_store.load_parameters())
+        for algorithm_id, scenario_id, execution_id, solution in shard_store.iterate_shards():
+            result_summary.add_solution(algorithm_id, scenario_id, execution_id, solution)
+        return result_summary.summarize()
+    scenario_solution_storage = pickle_io.load_file(path)
+    result_summary = ResultSummary(scenario_solution_storage.scenario_parameter_container,
+                                   scenario_solution_storage.execution_parameter_container)
+    result_summary.add_scenario_solution_storage(scenario_solution_storage)
+    return result_summary.summarize()
+
+
+def _format_id_list(ids, limit=10):
+    if len(ids) <= limit:
+        return ", ".join(str(i) for i in ids)
+    return ", ".join(str(i) for i in ids[:limit]) + ", ... ({} overall)".format(len(ids))
+
+
+def _format_runtime(runtime_summary):
+    if runtime_summary is None:
+        return "n/a"
+    return "mean {:.2f}s, ".format(runtime_summary["mean"]) + ", ".join(
+        "p{} {:.2f}s".format(percentile, runtime_summary["p{}".format(percentile)]) for percentile in RUNTIME_PERCENTILES)
+
+
+def format_summary(summary):
+    ''' Returns the lines of a human readable representation of the summary. '''
+    lines = ["solutions:  {}".format(summary["number_of_solutions"]),
+             "algorithms: {}".format(", ".join(str(algorithm_id) for algorithm_id in summary["algorithm_ids"])),
+             "scenarios:  {} present".format(summary["number_of_scenarios_present"])]
+    if summary["number_of_scenarios_expected"] is not None:
+        lines[-1] += " of {} expected".format(summary["number_of_scenarios_expected"])
+        if summary["missing_scenario_ids"]:
+            lines.append("  missing: {}".format(_format_id_list(summary["missing_scenario_ids"])))
+    for algorithm_id, algorithm_summary in sorted(summary["algorithms"].items()):
+        lines.append("algorithm {}: {} solutions".format(algorithm_id, algorithm_summary["number_of_solutions"]))
+        lines.append("  status:  {}".format(algorithm_summary["status"]))
+        lines.append("  runtime: {}".format(_format_runtime(algorithm_summary["runtime"])))
+    for execution_summary in summary["executions"]:
+        lines.append("execution {} ({}): {} solutions".format(execution_summary["execution_id"],
+                                                             execution_summary["algorithm_id"],
+                                                             execution_summary["number_of_solutions"]))
+        lines.append("  algorithm parameters: {}".format(execution_summary["algorithm_parameters"]))
+        lines.append("  gurobi parameters:    {}".format(execution_summary["gurobi_parameters"]))
+        if execution_summary["missing_scenario_ids"]:
+            lines.append("  missing scenarios:    {}".format(_format_id_list(execution_summary["missing_scenario_ids"])))
+        lines.append("  status:  {}".format(execution_summary["status"]))
+        lines.append("  runtime: {}".format(_format_runtime(execution_summary["runtime"])))
+    if summary.get("unknown_execution_ids"):
+        lines.append("solutions of unknown execution ids: {}".format(_format_id_list(summary["unknown_execution_ids"])))
+    return lines
@@ -0,0 +1,189 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Indexed scenario files allowing to load single scenarios without unpickling all of them.
+
+An indexed scenario file consists of
+
+    header:  MAGIC, format version, byte offset of the index
+    records: one pickle of (generation parameters, scenario) per scenario
+    index:   pickle of the scenario container without scenarios, of the dictionary
+             scenario id -> (byte offset, length, generation parameters), and of the substrate table
+             fingerprint -> substrate
+
+Substrates are stored only once in the substrate table and are referenced by the records (see
+substrate_interning), such that all loaded scenarios share one substrate object per fingerprint.
+
+Loading an indexed scenario file (see load_scenario_container) returns the original scenario container whose
+scenario_triple is a LazyScenarioTriple: scenarios are only read from disk when accessed, while the generation
+parameters are available from the index. Worker processes are handed ScenarioReferences and load their scenario
+themselves.
+"""
+
+import copy
+import io
+import os
+import struct
+from collections.abc import Mapping
+
+from alib import util
+
+from . import pickle_io
+from . import substrate_interning
+
+MAGIC = b"VNEPSIDX"
+FORMAT_VERSION = 2
+HEADER_FORMAT = "<8sIQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def is_indexed_scenario_file(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_indexed_scenario_file(scenario_container, path):
+    ''' Writes the scenarios of the container into an indexed scenario file at path. '''
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    index = {}
+    substrates = {}
+    with open(temporary_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, 0))
+        for scenario_id in sorted(scenario_container.scenario_triple.keys()):
+            generation_parameters, scenario = scenario_container.scenario_triple[scenario_id]
+            offset = f.tell()
+            substrate_interning.SubstrateReferencingPickler(f, substrates.setdefault).dump((generation_parameters, scenario))
+            index[scenario_id] = (offset, f.tell() - offset, generation_parameters)
+
+        stripped_container = copy.copy(scenario_container)
+        stripped_container.scenario_list = None
+        stripped_container.scenario_triple = None
+        index_offset = f.tell()
+        pickle_io.dump((stripped_container, index, substrates), f)
+        f.seek(0)
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, index_offset))
+    os.replace(temporary_path, path)
+    logger.info("Wrote {} scenarios with {} distinct substrates into indexed scenario file {}".format(len(index), len(substrates), path))
+
+
+class ScenarioReference(object):
+    ''' Reference to a single scenario of an indexed scenario file, which is cheap to hand to worker processes. '''
+
+    def __init__(self, path, scenario_id, offset, length, substrates):
+        self.path = path
+        self.scenario_id = scenario_id
+        self.offset = offset
+        self.length = length
+        self.substrates = substrates
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            return substrate_interning.SubstrateReferencingUnpickler(io.BytesIO(f.read(self.length)),
+                                                                     self.substrates.__getitem__).load()
+
+
+class LazyScenarioTriple(Mapping):
+    ''' Read-only replacement of scenario_container.scenario_triple loading the (generation parameters, scenario)
+        tuples from the indexed scenario file on access. Pickles containing it refer to the file by its absolute
+        path, hence containers are materialized (see materialize_scenarios) before they are persisted.
+    '''
+
+    def __init__(self, path, index, substrates):
+        self.path = path
+        self.index = index
+        self.substrates = substrates
+
+    def __getitem__(self, scenario_id):
+        return self.get_reference(scenario_id).load()
+
+    def __iter__(self):
+        return iter(sorted(self.index.keys()))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, scenario_id):
+        return scenario_id in self.index
+
+    def get_generation_parameters(self, scenario_id):
+        return self.index[scenario_id][2]
+
+    def get_reference(self, scenario_id):
+        offset, length, _ = self.index[scenario_id]
+        return ScenarioReference(self.path, scenario_id, offset, length, self.substrates)
+
+
+def read_indexed_scenario_file(path):
+    ''' Returns the scenario container of the indexed scenario file with a LazyScenarioTriple. '''
+    with open(path, "rb") as f:
+        magic, version, index_offset = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+        if magic != MAGIC:
+            raise RuntimeError("{} is not an indexed scenario file.".format(path))
+        if version != FORMAT_VERSION:
+            raise RuntimeError("Indexed scenario file {} has version {}, but {} is supported.".format(path, version, FORMAT_VERSION))
+        f.seek(index_offset)
+        scenario_container, index, substrates = pickle_io.load(f)
+    scenario_container.scenario_triple = LazyScenarioTriple(os.path.abspath(path), index, substrates)
+    return scenario_container
+
+
+def materialize_scenarios(scenario_container):
+    ''' Returns the container if its scenarios are held in memory and otherwise a shallow copy whose scenario_triple
+        and scenario_list hold all scenarios of the indexed scenario file, such that it does not depend on the file.
+    '''
+    scenario_triple = scenario_container.scenario_triple
+    if not isinstance(scenario_triple, LazyScenarioTriple):
+        return scenario_container
+    logger.info("Loading {} scenarios from {}".format(len(scenario_triple), scenario_triple.path))
+    materialized_container = copy.copy(scenario_container)
+    materialized_container.scenario_triple = {scenario_id: scenario_triple[scenario_id] for scenario_id in scenario_triple}
+    materialized_container.scenario_list = [materialized_container.scenario_triple[scenario_id][1]
+                                            for scenario_id in sorted(materialized_container.scenario_triple)]
+    return materialized_container
+
+
+def lookup_generation_parameters(scenario_container, scenario_id):
+    ''' Returns the generation parameters of the scenario without loading lazily stored scenarios. '''
+    scenario_triple = scenario_container.scenario_triple
+    if isinstance(scenario_triple, LazyScenarioTriple):
+        return scenario_triple.get_generation_parameters(scenario_id)
+    generation_parameters, _ = scenario_triple[scenario_id]
+    return generation_parameters
+
+
+def lookup_scenario_for_worker(scenario_container, scenario_id):
+    ''' Returns the scenario or, if it is stored lazily, a ScenarioReference to be resolved by the worker. '''
+    scenario_triple = scenario_container.scenario_triple
+    if isinstance(scenario_triple, LazyScenarioTriple):
+        return scenario_triple.get_reference(scenario_id)
+    _, scenario = scenario_triple[scenario_id]
+    return scenario
+
+
+def resolve_scenario(scenario_or_reference):
+    if isinstance(scenario_or_reference, ScenarioReference):
+        return scenario_or_reference.load()[1]
+    return scenario_or_reference
@@ -0,0 +1,301 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Export of reduced result pickles into an SQLite database for ad hoc analysis.
+
+The database contains the following tables:
+
+    scenarios:  the scenario id and one column per generation parameter (e.g. topology, number_of_requests)
+    executions: the parameters per algorithm and execution id
+    baseline:   per scenario and execution, the values of reduced baseline solutions used by the plots
+    randround:  per scenario and execution, the values of reduced randomized rounding solutions used by the plots
+
+All generation parameters and the scenario ids are indexed, such that slices can be queried directly, e.g.
+
+    SELECT topology, AVG(embedding_ratio) FROM baseline JOIN scenarios USING (scenario_id) GROUP BY topology;
+
+Generation parameters named like one of the other columns (e.g. scenario_id) are rejected. The executions table lists
+the executions the exported solutions stem from; their execution ids index the algorithm parameter list.
+
+The table of an algorithm's solutions is chosen by the result extractor registered for the algorithm (see
+plot_data.get_result_extractor): solutions reduced by the RandRoundResultReducer are written to the randround table
+and solutions reduced by the BaselineResultReducer to the baseline table. Solutions of other algorithms, also of
+algorithms without a registered extractor, are skipped with a warning.
+"""
+
+import os
+import sqlite3
+
+from alib import solutions, util
+
+from . import pickle_io
+from . import plot_data
+
+REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
+
+SCENARIO_TABLE = "scenarios"
+EXECUTION_TABLE = "executions"
+BASELINE_TABLE = "baseline"
+RANDROUND_TABLE = "randround"
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def _get_loads(solution, node_loads):
+    ''' Returns the node loads (of the single universal node type) or the edge loads of a reduced baseline solution. '''
+    return [value for (x, y), value in solution.load.items() if (x == "universal") == node_loads]
+
+
+def _get_total_runtime(meta_data):
+    return meta_data.time_preprocessing + meta_data.time_optimization + meta_data.time_postprocessing
+
+
+"""
+Columns of the solution tables: name, SQLite type and the function computing the value from the reduced solution.
+Values which cannot be computed (e.g. as the solution lacks an attribute) are stored as NULL.
+"""
+BASELINE_COLUMNS = [
+    ("status", "INTEGER", lambda solution: solution.status.status),
+    ("objective_value", "REAL", lambda solution: solution.status.objValue),
+    ("objective_bound", "REAL", lambda solution: solution.status.objBound),
+    ("objective_gap", "REAL", lambda solution: solution.status.objGap),
+    ("runtime", "REAL", lambda solution: solution.temporal_log.log_entries[-1].globaltime),
+    ("runtime_within_gurobi", "REAL", lambda solution: solution.runtime),
+    ("embedding_ratio", "REAL", lambda solution: solution.embedding_ratio),
+    ("nu_real_req", "INTEGER", lambda solution: solution.nu_real_req),
+    ("original_number_requests", "INTEGER", lambda solution: solution.original_number_requests),
+    ("max_node_load", "REAL", lambda solution: max(_get_loads(solution, True))),
+    ("max_edge_load", "REAL", lambda solution: max(_get_loads(solution, False))),
+    ("avg_node_load", "REAL", lambda solution: sum(_get_loads(solution, True)) / len(_get_loads(solution, True))),
+    ("avg_edge_load", "REAL", lambda solution: sum(_get_loads(solution, False)) / len(_get_loads(solution, False))),
+]
+
+RANDROUND_COLUMNS = [
+    ("lp_objective_value", "REAL", lambda solution: solution.meta_data.status.objValue),
+    ("time_preprocessing", "REAL", lambda solution: solution.meta_data.time_preprocessing),
+    ("time_optimization", "REAL", lambda solution: solution.meta_data.time_optimization),
+    ("time_postprocessing", "REAL", lambda solution: solution.meta_data.time_postprocessing),
+    ("runtime", "REAL", lambda solution: _get_total_runtime(solution.meta_data)),
+    ("mdk_runtime", "REAL", lambda solution: _get_total_runtime(solution.mdk_meta_data)),
+    ("mdk_profit", "REAL", lambda solution: solution.mdk_result.profit),
+    ("heuristic_profit", "REAL", lambda solution: solution.result_wo_violations.profit),
+    ("min_load_profit", "REAL", lambda solution: solution.collection_of_samples_with_violations[0].profit),
+    ("min_load_max_node_load", "REAL", lambda solution: solution.collection_of_samples_with_violations[0].max_node_load),
+    ("min_load_max_edge_load", "REAL", lambda solution: solution.collection_of_samples_with_violations[0].max_edge_load),
+    ("max_profit_profit", "REAL", lambda solution: solution.collection_of_samples_with_violations[1].profit),
+    ("max_profit_max_node_load", "REAL", lambda solution: solution.collection_of_samples_with_violations[1].max_node_load),
+    ("max_profit_max_edge_load", "REAL", lambda solution: solution.collection_of_samples_with_violations[1].max_edge_load),
+]
+
+SOLUTION_KEY_COLUMNS = [("algorithm_id", "TEXT"), ("execution_id", "INTEGER"), ("scenario_id", "INTEGER")]
+
+"""
+Names of the columns which are not generation parameters (lower case, as SQLite compares names case-insensitively).
+Generation parameters of the same name are rejected, as they would clash with the scenario id or make the columns of
+joined tables ambiguous.
+"""
+RESERVED_COLUMN_NAMES = frozenset(name.lower() for name, _ in SOLUTION_KEY_COLUMNS) | \
+    frozenset(name.lower() for name, _, _ in BASELINE_COLUMNS + RANDROUND_COLUMNS) | \
+    frozenset(["algorithm_parameters", "gurobi_parameters"])
+
+
+def quote_identifier(name):
+    return '"{}"'.format(str(name).replace('"', '""'))
+
+
+def to_sqlite_value(value):
+    ''' Returns the value if SQLite can store it and its representation otherwise. '''
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return repr(value)
+
+
+def _compute_column_value(lookup_function, solution):
+    try:
+        return to_sqlite_value(lookup_function(solution))
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _collect_parameter_values(value, path, result):
+    ''' Collects (path, parameter value, scenario ids) for all leaves of the scenario parameter dictionary, i.e. for
+        all sets of scenario ids. Lists are only descended into if they contain a single element
+        (cf. evaluation.extract_generation_parameters).
+    '''
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if isinstance(child, set):
+                if path:
+                    result.append((tuple(path), key, child))
+            else:
+                _collect_parameter_values(child, path + [key], result)
+    elif isinstance(value, list) and len(value) == 1:
+        _collect_parameter_values(value[0], path, result)
+
+
+def get_generation_parameters(scenario_parameter_dict):
+    ''' Returns the dictionary column name -> scenario id -> value of the generation parameters. The column of a
+        parameter is its name; should several generation tasks use the same name, the path in the scenario
+        parameter dictionary is used instead.
+    '''
+    parameter_values = []
+    if isinstance(scenario_parameter_dict, dict):
+        _collect_parameter_values(scenario_parameter_dict, [], parameter_values)
+    paths_of_name = {}
+    for path, _, _ in parameter_values:
+        paths_of_name.setdefault(path[-1], set()).add(path)
+    result = {}
+    for path, value, scenario_ids in parameter_values:
+        column = str(path[-1]) if len(paths_of_name[path[-1]]) == 1 else "__".join(str(element) for element in path)
+        values_of_column = result.setdefault(column, {})
+        for scenario_id in scenario_ids:
+            values_of_column[scenario_id] = to_sqlite_value(value)
+    return result
+
+
+class SQLiteExporter(object):
+    ''' Writes the solutions of reduced result storages (added one at a time) and their generation parameters into an
+        SQLite database.
+    '''
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._scenario_ids = set()
+        self._generation_parameters = {}
+        self._executions = {}
+        for table, columns in [(BASELINE_TABLE, BASELINE_COLUMNS), (RANDROUND_TABLE, RANDROUND_COLUMNS)]:
+            column_definitions = ["{} {}".format(quote_identifier(name), sql_type) for name, sql_type in SOLUTION_KEY_COLUMNS]
+            column_definitions += ["{} {}".format(quote_identifier(name), sql_type) for name, sql_type, _ in columns]
+            column_definitions.append("PRIMARY KEY (algorithm_id, execution_id, scenario_id)")
+            self.connection.execute("CREATE TABLE {} ({})".format(quote_identifier(table), ", ".join(column_definitions)))
+
+    def add_scenario_solution_storage(self, scenario_solution_storage):
+        ''' Adds all solutions of the storage, removing them from the storage to free memory early. '''
+        scenario_parameter_dict = scenario_solution_storage.scenario_parameter_container.scenario_parameter_dict
+        if isinstance(scenario_parameter_dict, dict):
+            self._scenario_ids.update(scenario_parameter_dict.get("all", ()))
+        for column, values in get_generation_parameters(scenario_parameter_dict).items():
+            self._generation_parameters.setdefault(column, {}).update(values)
+        execution_parameter_list = scenario_solution_storage.execution_parameter_container.algorithm_parameter_list
+
+        for algorithm_id, scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.items():
+            self._add_executions(algorithm_id, scenario_solution_dict, execution_parameter_list)
+            if not plot_data.is_result_extractor_registered(algorithm_id):
+                logger.warning(".. Skipping the solutions of {}, as no result extractor is registered for it".format(algorithm_id))
+                continue
+            extractor = plot_data.get_result_extractor(algorithm_id)
+            if isinstance(extractor, plot_data.RandRoundResultReducer):
+                table, columns = RANDROUND_TABLE, RANDROUND_COLUMNS
+            elif isinstance(extractor, plot_data.BaselineResultReducer):
+                table, columns = BASELINE_TABLE, BASELINE_COLUMNS
+            else:
+                logger.warning(".. Skipping the solutions of {}, as no table holds the fields of the {}".format(
+                    algorithm_id, type(extractor).__name__))
+                continue
+            logger.info(".. Exporting {} solutions of {} to table {}".format(
+                sum(len(execution_solution_dict) for execution_solution_dict in scenario_solution_dict.values()), algorithm_id, table))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO {} VALUES ({})".format(quote_identifier(table),
+                                                               ", ".join("?" * (len(SOLUTION_KEY_COLUMNS) + len(columns)))),
+                self._iterate_rows(algorithm_id, scenario_solution_dict, columns))
+
+    def _add_executions(self, algorithm_id, scenario_solution_dict, execution_parameter_list):
+        ''' Records the parameters of the executions the solutions of the algorithm stem from. The execution ids of the
+            solutions index the algorithm parameter list of the execution parameter container.
+        '''
+        execution_ids = set()
+        for execution_solution_dict in scenario_solution_dict.values():
+            execution_ids.update(execution_solution_dict.keys())
+        for execution_id in execution_ids:
+            if not isinstance(execution_id, int) or not 0 <= execution_id < len(execution_parameter_list):
+                raise RuntimeError("The solutions of {} refer to the execution id {}, which is not contained in the "
+                                   "execution parameters.".format(algorithm_id, execution_id))
+            execution_parameters = execution_parameter_list[execution_id]
+            if execution_parameters["ALG_ID"] != algorithm_id:
+                raise RuntimeError("The solutions of {} refer to the execution id {}, which belongs to {}.".format(
+                    algorithm_id, execution_id, execution_parameters["ALG_ID"]))
+            self._executions[(algorithm_id, execution_id)] = (repr(execution_parameters.get("ALGORITHM_PARAMETERS")),
+                                                              repr(execution_parameters.get("GUROBI_PARAMETERS")))
+
+    def _iterate_rows(self, algorithm_id, scenario_solution_dict, columns):
+        for scenario_id, execution_solution_dict in scenario_solution_dict.items():
+            self._scenario_ids.add(scenario_id)
+            for execution_id in list(execution_solution_dict.keys()):
+                solution = execution_solution_dict.pop(execution_id)
+                if solution is None:
+                    continue
+                yield [algorithm_id, execution_id, scenario_id] + [_compute_column_value(lookup_function, solution)
+                                                                  for _, _, lookup_function in columns]
+
+    def finish(self):
+        ''' Writes the scenario and execution tables and creates the indices. '''
+        parameter_columns = sorted(self._generation_parameters.keys())
+        colliding_columns = [column for column in parameter_columns if column.lower() in RESERVED_COLUMN_NAMES]
+        if colliding_columns:
+            raise RuntimeError("The generation parameters {} collide with the fixed columns of the database.".format(
+                ", ".join(colliding_columns)))
+        column_definitions = ["scenario_id INTEGER PRIMARY KEY"] + [quote_identifier(column) for column in parameter_columns]
+        self.connection.execute("CREATE TABLE {} ({})".format(SCENARIO_TABLE, ", ".join(column_definitions)))
+        self.connection.executemany(
+            "INSERT INTO {} VALUES ({})".format(SCENARIO_TABLE, ", ".join("?" * (len(parameter_columns) + 1))),
+            ([scenario_id] + [self._generation_parameters[column].get(scenario_id) for column in parameter_columns]
+             for scenario_id in sorted(self._scenario_ids)))
+        for column in parameter_columns:
+            self.connection.execute("CREATE INDEX {} ON {} ({})".format(quote_identifier("{}_{}".format(SCENARIO_TABLE, column)),
+                                                                       SCENARIO_TABLE,
+                                                                       quote_identifier(column)))
+
+        self.connection.execute("CREATE TABLE {} (algorithm_id TEXT, execution_id INTEGER, algorithm_parameters TEXT, "
+                                "gurobi_parameters TEXT, PRIMARY KEY (algorithm_id, execution_id))".format(EXECUTION_TABLE))
+        self.connection.executemany("INSERT INTO {} VALUES (?, ?, ?, ?)".format(EXECUTION_TABLE),
+                                    (list(key) + list(parameters) for key, parameters in sorted(self._executions.items())))
+
+        # the primary keys of the solution tables already index algorithm and execution id
+        for table in [BASELINE_TABLE, RANDROUND_TABLE]:
+            self.connection.execute("CREATE INDEX {0}_scenario_id ON {0} (scenario_id)".format(table))
+        self.connection.commit()
+
+
+def export_reduced_pickles(reduced_pickle_paths, database_path):
+    ''' Writes the reduced result pickles into a new SQLite database at database_path (replacing an existing file
+        only once the export has completed). The pickles are loaded one after another.
+    '''
+    temporary_path = "{}.{}.tmp".format(database_path, os.getpid())
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    try:
+        connection = sqlite3.connect(temporary_path)
+        try:
+            # the database is written to a temporary file which is discarded on failure
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            exporter = SQLiteExporter(connection)
+            for reduced_pickle_path in reduced_pickle_paths:
+                logger.info("Reading reduced pickle at {}".format(reduced_pickle_path))
+                exporter.add_scenario_solution_storage(pickle_io.load_file(reduced_pickle_path))
+            exporter.finish()
+        finally:
+            connection.close()
+        os.replace(temporary_path, database_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
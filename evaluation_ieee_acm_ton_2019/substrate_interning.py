@@ -0,0 +1,186 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Interning of substrates, i.e. sharing a single object among all scenarios having identical substrates.
+
+All scenarios of the evaluation are generated on a handful of Topology Zoo substrates with identical capacities,
+yet every scenario holds its own substrate object. As pickle memoizes objects by identity, interning the
+substrates -- replacing each by the canonical object of equal content -- suffices to store each substrate only
+once within a single pickle. For data pickled separately (result shards, records of indexed scenario files),
+the SubstrateReferencingPickler stores substrates by their fingerprint in a table and the
+SubstrateReferencingUnpickler resolves these references again, sharing one object per fingerprint.
+"""
+
+import hashlib
+import os
+import pickle
+
+from alib import datamodel, util
+
+from . import pickle_io
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def _canonicalize(obj):
+    ''' Returns a representation of obj which is independent of the iteration order of its dicts and sets. '''
+    if isinstance(obj, dict):
+        return "{" + ",".join(sorted(_canonicalize(key) + ":" + _canonicalize(value) for key, value in obj.items())) + "}"
+    if isinstance(obj, (set, frozenset)):
+        return "set(" + ",".join(sorted(_canonicalize(item) for item in obj)) + ")"
+    if isinstance(obj, (list, tuple)):
+        return "(" + ",".join(_canonicalize(item) for item in obj) + ")"
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return type(obj).__name__ + _canonicalize(vars(obj))
+    return repr(obj)
+
+
+def compute_substrate_fingerprint(substrate):
+    ''' Returns a hash of the complete content (i.e. all attributes) of the substrate. '''
+    return hashlib.sha1(_canonicalize(substrate).encode("utf-8")).hexdigest()
+
+
+def _find_scenarios(obj, depth=2):
+    ''' Yields the scenarios referenced by obj or its attributes (up to the given depth). '''
+    if isinstance(obj, datamodel.Scenario):
+        yield obj
+        return
+    if depth == 0 or not hasattr(obj, "__dict__"):
+        return
+    for value in vars(obj).values():
+        for scenario in _find_scenarios(value, depth - 1):
+            yield scenario
+
+
+class SubstrateInterner(object):
+    ''' Replaces the substrates of scenarios by a canonical object per fingerprint. '''
+
+    def __init__(self):
+        self.canonical_substrates = {}
+        self._fingerprints = {}
+        self.number_of_interned_substrates = 0
+
+    def intern(self, substrate):
+        if id(substrate) not in self._fingerprints:
+            self._fingerprints[id(substrate)] = (compute_substrate_fingerprint(substrate), substrate)
+        fingerprint, _ = self._fingerprints[id(substrate)]
+        canonical_substrate = self.canonical_substrates.setdefault(fingerprint, substrate)
+        if canonical_substrate is not substrate:
+            self.number_of_interned_substrates += 1
+        return canonical_substrate
+
+    def intern_scenario(self, scenario):
+        scenario.substrate = self.intern(scenario.substrate)
+
+    def intern_scenario_container(self, scenario_container):
+        for _, scenario in (scenario_container.scenario_triple or {}).values():
+            self.intern_scenario(scenario)
+        for scenario in (getattr(scenario_container, "scenario_list", None) or []):
+            self.intern_scenario(scenario)
+
+    def intern_scenario_solution_storage(self, scenario_solution_storage):
+        ''' Interns the substrates of the contained scenarios and of the scenarios referenced by the solutions. '''
+        container = scenario_solution_storage.scenario_parameter_container
+        if getattr(container, "scenario_triple", None) is not None and isinstance(container.scenario_triple, dict):
+            self.intern_scenario_container(container)
+        for scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.values():
+            for execution_solution_dict in scenario_solution_dict.values():
+                for solution in execution_solution_dict.values():
+                    for scenario in _find_scenarios(solution):
+                        self.intern_scenario(scenario)
+
+
+def intern_substrates_of_scenario_pickle(scenario_pickle_path):
+    ''' Interns the substrates of the scenario pickle and rewrites it, compressed according to its suffix. '''
+    from . import result_store
+
+    scenario_container = pickle_io.load_file(scenario_pickle_path)
+    interner = SubstrateInterner()
+    interner.intern_scenario_container(scenario_container)
+    logger.info("Found {} distinct substrates in {}".format(len(interner.canonical_substrates), scenario_pickle_path))
+    result_store.write_pickle_atomically(scenario_container, scenario_pickle_path)
+
+
+class SubstrateReferencingPickler(pickle.Pickler):
+    ''' Pickles substrates as references ("substrate", fingerprint); store_substrate(fingerprint, substrate) is
+        called once per substrate and pickler to put the substrate into the table.
+    '''
+
+    def __init__(self, f, store_substrate, protocol=pickle.HIGHEST_PROTOCOL):
+        super(SubstrateReferencingPickler, self).__init__(f, protocol=protocol)
+        self._store_substrate = store_substrate
+        self._fingerprints = {}
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, datamodel.Substrate):
+            return None
+        if id(obj) not in self._fingerprints:
+            fingerprint = compute_substrate_fingerprint(obj)
+            self._store_substrate(fingerprint, obj)
+            self._fingerprints[id(obj)] = fingerprint
+        return ("substrate", self._fingerprints[id(obj)])
+
+
+class SubstrateReferencingUnpickler(pickle_io.FastUnpickler):
+    ''' Resolves substrate references via load_substrate(fingerprint). '''
+
+    def __init__(self, f, load_substrate):
+        super(SubstrateReferencingUnpickler, self).__init__(f)
+        self._load_substrate = load_substrate
+
+    def persistent_load(self, persistent_id):
+        if persistent_id[0] != "substrate":
+            raise pickle.UnpicklingError("Unknown reference {}".format(persistent_id))
+        return self._load_substrate(persistent_id[1])
+
+
+class SubstrateDirectory(object):
+    ''' Table of substrates stored as one pickle per fingerprint within a directory. Storing is idempotent and
+        atomic, such that several processes may share the directory. Loaded substrates are cached per process.
+    '''
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = {}
+
+    def _get_path(self, fingerprint):
+        return os.path.join(self.directory, "substrate_{}.pickle".format(fingerprint))
+
+    def store(self, fingerprint, substrate):
+        path = self._get_path(fingerprint)
+        if os.path.exists(path):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary_path, "wb") as f:
+            pickle_io.dump(substrate, f)
+        os.replace(temporary_path, path)
+
+    def load(self, fingerprint):
+        if fingerprint not in self._cache:
+            with open(self._get_path(fingerprint), "rb") as f:
+                self._cache[fingerprint] = pickle_io.load(f)
+        return self._cache[fingerprint]
+
+    def __getstate__(self):
+        return {"directory": self.directory, "_cache": {}}
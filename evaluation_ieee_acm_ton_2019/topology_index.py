@@ -0,0 +1,194 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Persistent index of Topology Zoo metadata.
+
+Parsing the Topology Zoo graphs via the alib is slow while the evaluation only needs a few facts per
+topology (number of nodes, number of edges and the abbreviation used on axis labels). Topologies are
+parsed lazily, i.e. only when their metadata is requested, and the metadata is stored on disk per
+topology file, such that later runs -- and each worker process -- only need to unpickle a single small
+file.
+"""
+
+import os
+import pickle
+import hashlib
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from alib import scenariogeneration, util
+
+from . import pickle_io
+from . import result_store
+
+TopologyMetadata = namedtuple("TopologyMetadata", "name number_of_nodes number_of_edges short_name")
+
+"""
+Abbreviations of the substrates used in the paper. Topologies not contained here have no short name.
+"""
+TOPOLOGY_SHORT_NAMES = {
+    "Uunet": "UU",
+    "Surfnet": "SN",
+    "Geant2012": "GE",
+    "Ntt": "NT",
+    "DeutscheTelekom": "DT",
+}
+
+INDEX_FORMAT_VERSION = 2
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "evaluation_ieee_acm_ton_2019")
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+class TopologyIndex(object):
+    ''' Maps topology names to TopologyMetadata. The metadata of a topology is parsed from its YAML file when it is
+        first looked up and is persisted in a pickle in CACHE_DIR together with the modification time and size of
+        the file, such that it is parsed again only if the file changed.
+    '''
+
+    def __init__(self, topology_directory=None, index_path=None):
+        if topology_directory is None:
+            topology_directory = os.path.join(scenariogeneration.DATA_PATH, "topologyZoo")
+        self.topology_directory = os.path.abspath(topology_directory)
+        if index_path is None:
+            directory_hash = hashlib.sha1(self.topology_directory.encode("utf-8")).hexdigest()[:12]
+            index_path = os.path.join(CACHE_DIR, "topology_index_{}.pickle".format(directory_hash))
+        self.index_path = index_path
+        self._entries = None
+        self._validated_topology_names = set()
+
+    def _get_topology_path(self, topology_name):
+        return os.path.join(self.topology_directory, "{}.yml".format(topology_name))
+
+    def _file_signature(self, topology_name):
+        try:
+            file_stat = os.stat(self._get_topology_path(topology_name))
+        except OSError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            version, entries = pickle_io.load_file(self.index_path)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError) as e:
+            logger.warning("Could not read topology index {}: {}. Rebuilding it.".format(self.index_path, e))
+            return {}
+        if version != INDEX_FORMAT_VERSION:
+            logger.info("Topology index {} has an outdated format. Rebuilding it.".format(self.index_path))
+            return {}
+        return entries
+
+    @contextmanager
+    def _locked(self):
+        ''' Serializes updates of the index file by concurrent processes (where fcntl is available). '''
+        if fcntl is None:
+            yield
+            return
+        with open(self.index_path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _store(self):
+        index_directory = os.path.dirname(self.index_path)
+        try:
+            if not os.path.exists(index_directory):
+                os.makedirs(index_directory)
+            with self._locked():
+                # entries added by other processes in the meantime are kept
+                entries = self._load()
+                entries.update(self._entries)
+                result_store.write_pickle_atomically((INDEX_FORMAT_VERSION, entries), self.index_path)
+        except OSError as e:
+            logger.warning("Could not store topology index at {}: {}".format(self.index_path, e))
+
+    def _parse_topology(self, topology_name):
+        reader = scenariogeneration.TopologyZooReader()
+        raw_parameters = {"topology": topology_name,
+                          "node_types": ["universal"],
+                          "node_capacity": 100.0,
+                          "edge_capacity": 100.0,
+                          "node_type_distribution": 1.0}
+        number_of_nodes = None
+        number_of_edges = None
+        try:
+            graph = reader.read_from_yaml(raw_parameters)
+        except Exception as e:
+            logger.warning("Could not parse topology {}: {}".format(topology_name, e))
+            graph = None
+        if graph is not None:
+            number_of_nodes = graph.get_number_of_nodes()
+            number_of_edges = len(graph.edges)
+        return TopologyMetadata(name=topology_name,
+                                number_of_nodes=number_of_nodes,
+                                number_of_edges=number_of_edges,
+                                short_name=TOPOLOGY_SHORT_NAMES.get(topology_name))
+
+    @property
+    def entries(self):
+        ''' The cached entries as topology name -> (file signature, TopologyMetadata). '''
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def lookup(self, topology_name):
+        ''' Returns the TopologyMetadata of the topology, parsing its file if it is not cached or changed, or None
+            if the Topology Zoo contains no such topology. Each file is only checked for changes once per index.
+        '''
+        if topology_name in self._validated_topology_names:
+            return self.entries[topology_name][1]
+        signature = self._file_signature(topology_name)
+        if signature is None:
+            return None
+        entry = self.entries.get(topology_name)
+        if entry is None or entry[0] != signature:
+            logger.info("Adding topology {} to the topology index {}".format(topology_name, self.index_path))
+            entry = (signature, self._parse_topology(topology_name))
+            self.entries[topology_name] = entry
+            self._store()
+        self._validated_topology_names.add(topology_name)
+        return entry[1]
+
+
+_topology_index = None
+
+
+def get_topology_index():
+    global _topology_index
+    if _topology_index is None:
+        _topology_index = TopologyIndex()
+    return _topology_index
+
+
+def lookup_topology_metadata(topology_name):
+    return get_topology_index().lookup(topology_name)
@@ -0,0 +1,339 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""SQLite based work queue for distributing the scenarios of an experiment among workers.
+
+Any number of worker processes -- on one or on many hosts sharing ALIB_EXPERIMENT_HOME -- pull scenario ids from
+the queue. A pulled scenario is leased to the worker for lease_timeout seconds; workers renew the leases of the
+scenarios they are working on via heartbeats. Leases of dead workers expire and the corresponding scenarios are
+handed out again, until max_attempts is reached. The solutions are written into a shared ResultShardStore, such
+that scenarios which were partially solved by a dead worker are only completed.
+
+Note that SQLite relies on working POSIX file locks: the queue must be placed on a file system supporting them
+(e.g. local disks or NFSv4 with locking enabled).
+"""
+
+import os
+import socket
+import sqlite3
+import time
+from multiprocessing import Process
+from multiprocessing.connection import wait
+
+from alib import util
+
+from . import experiment_execution
+from . import result_store
+from . import scenario_store
+
+TASK_PENDING = "pending"
+TASK_LEASED = "leased"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def get_default_queue_path(result_output_pickle):
+    ''' The queue of RESULT_OUTPUT_PICKLE is stored at ALIB_EXPERIMENT_HOME/output/<basename>_queue.sqlite. '''
+    basename = os.path.basename(result_output_pickle).split(".")[0]
+    return os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, "{}_queue.sqlite".format(basename))
+
+
+def get_worker_id():
+    return "{}:{}".format(socket.gethostname(), os.getpid())
+
+
+class WorkQueue(object):
+    ''' Queue of scenario ids stored in a SQLite database. Scenarios are handed out by decreasing priority
+        (ties are broken by the scenario id). All state changes are performed within immediate transactions.
+    '''
+
+    def __init__(self, queue_path, lease_timeout=600.0, max_attempts=3):
+        self.queue_path = queue_path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.queue_path, timeout=120.0, isolation_level=None)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _transaction(self, statements):
+        ''' Executes the list of (sql, parameters) tuples atomically and returns the cursor of the last one. '''
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, parameters in statements:
+                cursor.execute(sql, parameters)
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        return cursor
+
+    def initialize(self, scenario_priorities):
+        ''' Creates the queue (if necessary) and adds the scenarios of the dictionary scenario id -> priority.
+            Scenarios already contained in the queue keep their state, such that all workers may call this.
+        '''
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                scenario_id INTEGER PRIMARY KEY,
+                priority REAL NOT NULL,
+                state TEXT NOT NULL,
+                worker_id TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS tasks_by_state_and_priority ON tasks (state, priority);
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                last_heartbeat REAL NOT NULL
+            );
+        """)
+        self._transaction([("INSERT OR IGNORE INTO tasks (scenario_id, priority, state) VALUES (?, ?, ?)",
+                            (scenario_id, priority, TASK_PENDING))
+                           for scenario_id, priority in sorted(scenario_priorities.items())])
+
+    def _release_expired_leases_statements(self, now):
+        return [("UPDATE tasks SET state = ?, worker_id = NULL, lease_expires = NULL "
+                 "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                 (TASK_FAILED, TASK_LEASED, now, self.max_attempts)),
+                ("UPDATE tasks SET state = ?, worker_id = NULL, lease_expires = NULL "
+                 "WHERE state = ? AND lease_expires < ?",
+                 (TASK_PENDING, TASK_LEASED, now))]
+
+    def release_expired_leases(self):
+        self._transaction(self._release_expired_leases_statements(time.time()))
+
+    def claim(self, worker_id):
+        ''' Leases the pending scenario of highest priority to the worker and returns its id (or None). '''
+        now = time.time()
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, parameters in self._release_expired_leases_statements(now):
+                cursor.execute(sql, parameters)
+            cursor.execute("SELECT scenario_id FROM tasks WHERE state = ? ORDER BY priority DESC, scenario_id ASC LIMIT 1",
+                           (TASK_PENDING,))
+            row = cursor.fetchone()
+            if row is not None:
+                cursor.execute("UPDATE tasks SET state = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1 "
+                               "WHERE scenario_id = ?",
+                               (TASK_LEASED, worker_id, now + self.lease_timeout, row[0]))
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        return None if row is None else row[0]
+
+    def heartbeat(self, worker_id):
+        ''' Renews the leases of all scenarios of the worker. '''
+        now = time.time()
+        self._transaction([("INSERT OR REPLACE INTO workers (worker_id, last_heartbeat) VALUES (?, ?)", (worker_id, now)),
+                           ("UPDATE tasks SET lease_expires = ? WHERE state = ? AND worker_id = ?",
+                            (now + self.lease_timeout, TASK_LEASED, worker_id))])
+
+    def complete(self, scenario_id, worker_id):
+        self._transaction([("UPDATE tasks SET state = ?, lease_expires = NULL WHERE scenario_id = ? AND worker_id = ?",
+                            (TASK_DONE, scenario_id, worker_id))])
+
+    def fail(self, scenario_id, worker_id):
+        ''' Hands the scenario out again or marks it as failed when it was attempted max_attempts times. '''
+        self._transaction([("UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                            "worker_id = NULL, lease_expires = NULL WHERE scenario_id = ? AND worker_id = ?",
+                            (self.max_attempts, TASK_FAILED, TASK_PENDING, scenario_id, worker_id))])
+
+    def get_state_counts(self):
+        cursor = self.connection.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state")
+        return {state: count for state, count in cursor.fetchall()}
+
+    def get_failed_scenario_ids(self):
+        cursor = self.connection.execute("SELECT scenario_id FROM tasks WHERE state = ? ORDER BY scenario_id", (TASK_FAILED,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def has_unfinished_scenarios(self):
+        counts = self.get_state_counts()
+        return counts.get(TASK_PENDING, 0) + counts.get(TASK_LEASED, 0) > 0
+
+
+class QueueWorker(object):
+    ''' Pulls scenarios from the WorkQueue and solves up to concurrent of them at a time, each in its own process.
+        Heartbeats are sent every heartbeat_interval seconds while scenarios are being solved. When no scenario
+        is pending, the worker waits for the leases of other workers to either complete or expire.
+    '''
+
+    def __init__(self,
+                 work_queue,
+                 scenario_container,
+                 execution_parameter_container,
+                 shard_store,
+                 concurrent=1,
+                 cpu_sets=None,
+                 heartbeat_interval=None,
+                 poll_interval=30.0):
+        self.work_queue = work_queue
+        self.scenario_container = scenario_container
+        self.execution_parameter_container = execution_parameter_container
+        self.shard_store = shard_store
+        self.completion_tracker = result_store.CompletedPairTracker(shard_store)
+        self.cpu_sets = cpu_sets
+        if cpu_sets is not None:
+            concurrent = len(cpu_sets)
+        self.concurrent = max(1, concurrent)
+        if heartbeat_interval is None:
+            heartbeat_interval = work_queue.lease_timeout / 3.0
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.worker_id = get_worker_id()
+
+    def _spawn(self, scenario_id, slot):
+        scenario = scenario_store.lookup_scenario_for_worker(self.scenario_container, scenario_id)
+        execution_ids = experiment_execution.get_open_execution_ids(self.execution_parameter_container,
+                                                                    scenario_id,
+                                                                    self.completion_tracker.update())
+        process = Process(target=experiment_execution.execute_scenario,
+                          args=(scenario_id,
+                                scenario,
+                                self.execution_parameter_container,
+                                execution_ids,
+                                self.shard_store.shard_directory,
+                                self.cpu_sets[slot] if self.cpu_sets is not None else None),
+                          name="scenario_{}".format(scenario_id))
+        process.start()
+        return process
+
+    def run(self):
+        logger.info("Worker {} starts pulling scenarios from {}".format(self.worker_id, self.work_queue.queue_path))
+        self.work_queue.heartbeat(self.worker_id)
+        running = {}
+        free_slots = list(range(self.concurrent))
+        number_of_solved_scenarios = 0
+        while True:
+            while free_slots:
+                scenario_id = self.work_queue.claim(self.worker_id)
+                if scenario_id is None:
+                    break
+                if scenario_id not in self.scenario_container.scenario_triple:
+                    logger.error("Scenario {} is not contained in the scenario pickle of this worker".format(scenario_id))
+                    self.work_queue.fail(scenario_id, self.worker_id)
+                    continue
+                logger.info("Worker {} starts scenario {}".format(self.worker_id, scenario_id))
+                slot = free_slots.pop(0)
+                process = self._spawn(scenario_id, slot)
+                running[process.sentinel] = (process, scenario_id, slot)
+
+            if not running:
+                if not self.work_queue.has_unfinished_scenarios():
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            for sentinel in wait(list(running.keys()), timeout=self.heartbeat_interval):
+                process, scenario_id, slot = running.pop(sentinel)
+                process.join()
+                free_slots.append(slot)
+                if process.exitcode != 0:
+                    logger.error("Scenario {} failed with exit code {}".format(scenario_id, process.exitcode))
+                    self.work_queue.fail(scenario_id, self.worker_id)
+                    continue
+                self.work_queue.complete(scenario_id, self.worker_id)
+                number_of_solved_scenarios += 1
+                logger.info("Worker {} finished scenario {}; queue state: {}".format(self.worker_id,
+                                                                                   scenario_id,
+                                                                                   self.work_queue.get_state_counts()))
+            self.work_queue.heartbeat(self.worker_id)
+
+        failed_scenario_ids = self.work_queue.get_failed_scenario_ids()
+        if failed_scenario_ids:
+            logger.error("The following scenarios failed: {}".format(failed_scenario_ids))
+        logger.info("Worker {} solved {} scenarios; the queue is empty".format(self.worker_id, number_of_solved_scenarios))
+        return number_of_solved_scenarios
+
+
+def run_worker(experiment_yaml,
+               min_scenario_index,
+               max_scenario_index,
+               concurrent=1,
+               cores=None,
+               pin_cores=False,
+               longest_first=False,
+               cost_model=None,
+               queue_path=None,
+               shard_directory=None,
+               lease_timeout=600.0,
+               max_attempts=3,
+               poll_interval=30.0):
+    ''' Adds the scenarios of [min_scenario_index, max_scenario_index] to the queue (if not already contained) and
+        processes scenarios until the queue is empty. The results are written into the shard directory of the
+        experiment and can be merged via merge-results.
+    '''
+    experiment_specification = experiment_execution.load_experiment_specification(experiment_yaml)
+    scenario_container = experiment_execution.load_scenario_container(experiment_specification)
+    execution_parameter_container = experiment_execution.create_execution_parameter_container(experiment_specification)
+    cpu_sets = None
+    solving_execution_parameter_container = execution_parameter_container
+    if cores is not None:
+        plan = experiment_execution.plan_concurrency(execution_parameter_container, cores, pin_cores=pin_cores)
+        concurrent = plan.concurrent
+        cpu_sets = plan.cpu_sets
+        solving_execution_parameter_container = plan.execution_parameter_container
+    scenario_ids = experiment_execution.select_scenario_ids(scenario_container, min_scenario_index, max_scenario_index)
+
+    if longest_first:
+        if cost_model is None:
+            cost_model = experiment_execution.ScenarioCostModel()
+        scenario_priorities = {}
+        for scenario_id in scenario_ids:
+            generation_parameters = scenario_store.lookup_generation_parameters(scenario_container, scenario_id)
+            scenario_priorities[scenario_id] = cost_model.estimate(generation_parameters)
+    else:
+        scenario_priorities = {scenario_id: 0.0 for scenario_id in scenario_ids}
+
+    if shard_directory is None:
+        shard_directory = result_store.get_default_shard_directory(experiment_specification["RESULT_OUTPUT_PICKLE"])
+    shard_store = result_store.ResultShardStore(shard_directory)
+    shard_store.initialize(scenario_container, execution_parameter_container)
+
+    if queue_path is None:
+        queue_path = get_default_queue_path(experiment_specification["RESULT_OUTPUT_PICKLE"])
+    work_queue = WorkQueue(queue_path, lease_timeout=lease_timeout, max_attempts=max_attempts)
+    try:
+        work_queue.initialize(scenario_priorities)
+        worker = QueueWorker(work_queue,
+                             scenario_container,
+                             solving_execution_parameter_container,
+                             shard_store,
+                             concurrent=concurrent,
+                             cpu_sets=cpu_sets,
+                             poll_interval=poll_interval)
+        return worker.run()
+    finally:
+        work_queue.close()
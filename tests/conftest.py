@@ -0,0 +1,121 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Fixtures shared by the tests.
+
+Most modules of this package import the alib and vnep_approx at module level. The test modules covering them are
+skipped via pytest.importorskip when these packages are not installed.
+"""
+
+import pytest
+
+try:
+    from alib import datamodel
+except ImportError:
+    datamodel = None
+
+from evaluation_ieee_acm_ton_2019 import pickle_io
+
+
+class ScenarioParameterContainer(object):
+    ''' Holds the attributes of the alib's ScenarioParameterContainer which are accessed by this package. '''
+
+    def __init__(self, scenario_triple=None):
+        self.scenario_triple = scenario_triple if scenario_triple is not None else {}
+        self.scenario_list = [scenario for _, (_, scenario) in sorted(self.scenario_triple.items())]
+        self.scenario_parameter_dict = {"all": set(self.scenario_triple) if scenario_triple is not None else {0, 1, 2}}
+
+
+class ExecutionParameterContainer(object):
+    ''' Holds the attributes of the alib's ExecutionParameterContainer which are accessed by this package. '''
+
+    def __init__(self, algorithm_parameter_list):
+        self.algorithm_parameter_list = algorithm_parameter_list
+
+
+if datamodel is not None:
+    class Substrate(datamodel.Substrate):
+        ''' Substrate whose fingerprint is determined by its name and capacity. '''
+
+        def __init__(self, name, capacity=1.0):
+            self.name = name
+            self.capacity = capacity
+
+    class Scenario(datamodel.Scenario):
+
+        def __init__(self, name, substrate):
+            self.name = name
+            self.substrate = substrate
+            self.requests = []
+
+
+@pytest.fixture(autouse=True)
+def allow_test_classes(monkeypatch):
+    ''' Admits the containers defined here when unpickling via pickle_io. '''
+    monkeypatch.setattr(pickle_io, "ALLOWED_MODULE_PREFIXES", pickle_io.ALLOWED_MODULE_PREFIXES + (__name__,))
+
+
+@pytest.fixture
+def scenario_parameter_container():
+    return ScenarioParameterContainer()
+
+
+@pytest.fixture
+def make_execution_parameter_container():
+    return ExecutionParameterContainer
+
+
+@pytest.fixture
+def execution_parameter_container():
+    return ExecutionParameterContainer([{"ALG_ID": "ClassicMCF"}, {"ALG_ID": "RandomizedRoundingTriumvirate"}])
+
+
+@pytest.fixture
+def make_substrate():
+    pytest.importorskip("alib")
+    return Substrate
+
+
+@pytest.fixture
+def make_scenario():
+    pytest.importorskip("alib")
+    return Scenario
+
+
+@pytest.fixture
+def make_scenario_container():
+    ''' Returns a function creating a container of scenarios on number_of_substrates distinct substrates. Each
+        scenario holds its own substrate object.
+    '''
+    pytest.importorskip("alib")
+
+    def make_scenario_container(number_of_scenarios, number_of_substrates=2):
+        scenario_triple = {}
+        for scenario_id in range(number_of_scenarios):
+            substrate = Substrate("substrate_{}".format(scenario_id % number_of_substrates))
+            scenario_triple[scenario_id] = ({"number_of_requests": scenario_id},
+                                            Scenario("scenario_{}".format(scenario_id), substrate))
+        return ScenarioParameterContainer(scenario_triple)
+
+    return make_scenario_container
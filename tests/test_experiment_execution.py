@@ -0,0 +1,194 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of the scheduling, the concurrency planning and the memory admission control of experiment_execution."""
+
+import copy
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_ieee_acm_ton_2019 import experiment_execution
+
+
+def make_generation_parameters(number_of_requests, node_resource_factor):
+    return {"request_generation": {"number_of_requests": number_of_requests},
+            "node_resource_factor": node_resource_factor,
+            "edge_resource_factor": 0.5}
+
+
+def test_cost_model_without_coefficients_uses_heuristic():
+    model = experiment_execution.ScenarioCostModel()
+    assert model.estimate(make_generation_parameters(40, 0.5)) == 40.0
+    assert model.estimate(make_generation_parameters(100, 0.5)) > model.estimate(make_generation_parameters(40, 0.5))
+
+
+def test_cost_model_fit_falls_back_to_heuristic_for_few_runtimes():
+    model = experiment_execution.ScenarioCostModel.fit([make_generation_parameters(40, 0.5)] * 3, [1.0, 2.0, 3.0])
+    assert model.coefficients is None
+
+
+def test_cost_model_fit_recovers_ordering_of_runtimes():
+    list_of_generation_parameters = []
+    runtimes = []
+    for number_of_requests in (20, 40, 60, 80, 100):
+        for node_resource_factor in (0.2, 0.5, 0.8):
+            list_of_generation_parameters.append(make_generation_parameters(number_of_requests, node_resource_factor))
+            runtimes.append(10.0 * number_of_requests ** 2 / node_resource_factor)
+    model = experiment_execution.ScenarioCostModel.fit(list_of_generation_parameters, runtimes)
+    assert model.coefficients is not None
+    estimates = [model.estimate(parameters) for parameters in list_of_generation_parameters]
+    for i in range(len(runtimes)):
+        for j in range(len(runtimes)):
+            if runtimes[i] < runtimes[j]:
+                assert estimates[i] < estimates[j]
+    assert max(estimates) == pytest.approx(max(runtimes), rel=0.01)
+
+
+def test_cost_model_rejects_wrong_number_of_coefficients():
+    with pytest.raises(RuntimeError):
+        experiment_execution.ScenarioCostModel(coefficients=[1.0, 2.0])
+
+
+def test_order_scenarios_longest_first_breaks_ties_by_scenario_id():
+    generation_parameters = {0: make_generation_parameters(20, 0.5),
+                             1: make_generation_parameters(100, 0.5),
+                             2: make_generation_parameters(60, 0.5),
+                             3: make_generation_parameters(100, 0.5)}
+    ordered = experiment_execution.order_scenarios_longest_first([0, 1, 2, 3], generation_parameters,
+                                                                 experiment_execution.ScenarioCostModel())
+    assert ordered == [1, 3, 2, 0]
+
+
+def test_plan_concurrency_uses_maximal_threads_including_mdk_stage(make_execution_parameter_container):
+    container = make_execution_parameter_container([
+        {"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {"threads": 2}},
+        {"ALG_ID": "RandomizedRoundingTriumvirate",
+         "GUROBI_PARAMETERS": {"threads": 1},
+         "ALGORITHM_PARAMETERS": {"mdk_gurobi_parameters": ("threads", 4)}},
+    ])
+    plan = experiment_execution.plan_concurrency(container, cores=8)
+    assert plan.threads_per_process == 4
+    assert plan.concurrent == 2
+    assert plan.cpu_sets is None
+
+
+def test_plan_concurrency_does_not_modify_given_parameters(make_execution_parameter_container):
+    container = make_execution_parameter_container([{"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {}}])
+    original_parameters = copy.deepcopy(container.algorithm_parameter_list)
+    plan = experiment_execution.plan_concurrency(container, cores=4, default_threads=2)
+    assert container.algorithm_parameter_list == original_parameters
+    assert plan.execution_parameter_container.algorithm_parameter_list[0]["GUROBI_PARAMETERS"]["threads"] == 2
+    assert plan.concurrent == 2
+
+
+@pytest.mark.parametrize("mdk_gurobi_parameters, expected_threads", [
+    ({"threads": 3}, 3),
+    (("timelimit", 60, "threads", 3), 3),
+    ((("timelimit", 60), ("threads", 3)), 3),
+    (("timelimit", 60), None),
+    (None, None),
+])
+def test_get_threads_of_gurobi_parameters(mdk_gurobi_parameters, expected_threads):
+    assert experiment_execution.get_threads_of_gurobi_parameters(mdk_gurobi_parameters) == expected_threads
+
+
+def test_plan_concurrency_rejects_more_threads_than_cores(make_execution_parameter_container):
+    container = make_execution_parameter_container([{"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {"threads": 8}}])
+    with pytest.raises(RuntimeError):
+        experiment_execution.plan_concurrency(container, cores=4)
+
+
+@pytest.mark.parametrize("mdk_gurobi_parameters, expected_mdk_gurobi_parameters", [
+    (None, ("threads", 1)),
+    (("timelimit", 60), ("timelimit", 60, "threads", 1)),
+    ((("timelimit", 60),), (("timelimit", 60), ("threads", 1))),
+    ({"timelimit": 60}, {"timelimit": 60, "threads": 1}),
+])
+def test_plan_concurrency_limits_threads_of_mdk_stage(make_execution_parameter_container, mdk_gurobi_parameters,
+                                                      expected_mdk_gurobi_parameters):
+    container = make_execution_parameter_container([
+        {"ALG_ID": "RandomizedRoundingTriumvirate",
+         "GUROBI_PARAMETERS": {"threads": 1},
+         "ALGORITHM_PARAMETERS": {"mdk_gurobi_parameters": mdk_gurobi_parameters}},
+    ])
+    plan = experiment_execution.plan_concurrency(container, cores=4)
+    assert plan.concurrent == 4
+    algorithm_parameters = plan.execution_parameter_container.algorithm_parameter_list[0]["ALGORITHM_PARAMETERS"]
+    assert algorithm_parameters["mdk_gurobi_parameters"] == expected_mdk_gurobi_parameters
+    assert container.algorithm_parameter_list[0]["ALGORITHM_PARAMETERS"]["mdk_gurobi_parameters"] == mdk_gurobi_parameters
+
+
+@pytest.fixture
+def resident_set_sizes(monkeypatch):
+    sizes = {}
+    monkeypatch.setattr(experiment_execution, "get_resident_set_size", lambda pid: sizes.get(pid, 0))
+    return sizes
+
+
+def test_memory_admission_reserves_estimates(resident_set_sizes):
+    control = experiment_execution.MemoryAdmissionControl(memory_budget=100, default_estimate=40)
+    parameters = make_generation_parameters(40, 0.5)
+    assert control.admits(0, parameters)
+    control.reserve(1000, 0, parameters)
+    assert control.admits(1, parameters)
+    control.reserve(1001, 1, parameters)
+    assert not control.admits(2, parameters)
+    resident_set_sizes[1000] = 10
+    assert control.sample_resident_set_sizes() == 10
+    assert control.release(1000) == 10
+    assert control.admits(2, parameters)
+
+
+def test_memory_admission_learns_bytes_per_cost(resident_set_sizes):
+    control = experiment_execution.MemoryAdmissionControl(memory_budget=1000, default_estimate=500)
+    parameters = make_generation_parameters(40, 0.5)
+    control.observe(parameters, peak_memory=80)
+    assert control.estimate(0, parameters) == pytest.approx(80)
+    assert control.estimate(0, make_generation_parameters(80, 0.5)) == pytest.approx(160)
+
+
+def test_memory_admission_kills_most_recent_process_exceeding_budget(resident_set_sizes):
+    control = experiment_execution.MemoryAdmissionControl(memory_budget=100, default_estimate=10)
+    parameters = make_generation_parameters(40, 0.5)
+    control.reserve(1000, 0, parameters)
+    resident_set_sizes[1000] = 150
+    assert control.select_process_exceeding_budget() is None
+    assert control.reservations[1000]["peak"] == 150
+    control.reserve(1001, 1, parameters)
+    control.reservations[1001]["start_time"] = control.reservations[1000]["start_time"] + 1
+    resident_set_sizes[1001] = 10
+    assert control.select_process_exceeding_budget() == 1001
+
+
+def test_memory_admission_requeues_killed_scenarios_until_retries_are_exhausted(resident_set_sizes):
+    control = experiment_execution.MemoryAdmissionControl(memory_budget=100, default_estimate=10, max_memory_retries=2)
+    parameters = make_generation_parameters(40, 0.5)
+    assert control.register_memory_failure(0, peak_memory=30)
+    assert control.estimate(0, parameters) == 60
+    assert control.register_memory_failure(0, peak_memory=60)
+    assert control.estimate(0, parameters) == 100
+    assert not control.register_memory_failure(0, peak_memory=90)
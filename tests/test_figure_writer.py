@@ -0,0 +1,96 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of writing figures in background threads."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from evaluation_ieee_acm_ton_2019 import evaluation
+
+
+def make_figure():
+    figure = plt.figure()
+    plt.plot([0, 1, 2], [2, 0, 1])
+    return figure
+
+
+def test_written_figures_equal_synchronously_saved_figures(tmp_path):
+    figure = make_figure()
+    synchronous_filename = str(tmp_path / "synchronous.png")
+    figure.savefig(synchronous_filename)
+    output_path = str(tmp_path / "nested" / "output")
+    filename = output_path + "/figure.png"
+    figure_writer = evaluation.FigureWriter(number_of_threads=2, max_pending_figures=1)
+    try:
+        figure_writer.submit(figure, output_path, filename)
+        figure_writer.submit(figure, output_path, output_path + "/figure.pdf")
+    finally:
+        figure_writer.close()
+        plt.close(figure)
+    with open(filename, "rb") as f, open(synchronous_filename, "rb") as g:
+        assert f.read() == g.read()
+    with open(output_path + "/figure.pdf", "rb") as f:
+        assert f.read(4) == b"%PDF"
+
+
+def test_figures_are_rendered_in_the_submitting_thread(tmp_path, monkeypatch):
+    rendering_threads = []
+    original_savefig = matplotlib.figure.Figure.savefig
+
+    def savefig(figure, *args, **kwargs):
+        rendering_threads.append(threading.current_thread())
+        return original_savefig(figure, *args, **kwargs)
+
+    monkeypatch.setattr(matplotlib.figure.Figure, "savefig", savefig)
+    figure = make_figure()
+    figure_writer = evaluation.FigureWriter(number_of_threads=1)
+    try:
+        figure_writer.submit(figure, str(tmp_path), str(tmp_path / "figure.png"))
+    finally:
+        figure_writer.close()
+        plt.close(figure)
+    assert rendering_threads == [threading.current_thread()]
+    assert (tmp_path / "figure.png").exists()
+
+
+def test_write_errors_are_raised_on_flush(tmp_path):
+    (tmp_path / "file").write_text("")
+    figure = make_figure()
+    figure_writer = evaluation.FigureWriter(number_of_threads=1)
+    try:
+        figure_writer.submit(figure, str(tmp_path / "file"), str(tmp_path / "file" / "figure.png"))
+        with pytest.raises(OSError):
+            figure_writer.flush()
+    finally:
+        figure_writer.close()
+        plt.close(figure)
@@ -0,0 +1,101 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of seeding and caching the scenario generation."""
+
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("alib")
+
+from evaluation_ieee_acm_ton_2019 import generation_cache
+
+TASKS = ["substrate_generation", "request_generation", "profit_calculation"]
+
+
+@pytest.fixture
+def generate_scenario(make_scenario, make_substrate):
+    ''' Returns a function generating a scenario via the given seeder by strategies using random and numpy. '''
+
+    def generate_substrate(strategy, scenario_parameters, scenario):
+        scenario.substrate = make_substrate(scenario_parameters["substrate_generation"]["TopologyZooReader"]["topology"],
+                                            capacity=random.random())
+
+    def generate_requests(strategy, scenario_parameters, scenario):
+        number_of_requests = scenario_parameters["request_generation"]["CactusRequestGenerator"]["number_of_requests"]
+        scenario.requests = [random.random() for _ in range(number_of_requests)]
+
+    def calculate_profits(strategy, scenario_parameters, scenario):
+        scenario.profits = np.random.rand(len(scenario.requests))
+
+    strategies = {"substrate_generation": generate_substrate,
+                  "request_generation": generate_requests,
+                  "profit_calculation": calculate_profits}
+
+    def generate_scenario(seeder, repetition, number_of_requests, topology="Geant2012"):
+        scenario_parameters = {"substrate_generation": {"TopologyZooReader": {"topology": topology}},
+                               "request_generation": {"CactusRequestGenerator": {"number_of_requests": number_of_requests}},
+                               "profit_calculation": {"OptimalEmbeddingProfitCalculator": {}},
+                               "repetition": repetition}
+        scenario = make_scenario("scenario_{}_{}".format(repetition, number_of_requests), None)
+        for task in TASKS:
+            seeder.apply_task(strategies[task], None, task, scenario_parameters, scenario)
+        return scenario
+
+    return generate_scenario
+
+
+def describe(scenario):
+    return scenario.substrate.capacity, list(scenario.requests), list(scenario.profits)
+
+
+def test_cached_scenarios_equal_freshly_seeded_scenarios(tmp_path, generate_scenario):
+    fresh_scenarios = [describe(generate_scenario(generation_cache.ScenarioGenerationSeeder("version"), repetition, 3))
+                       for repetition in range(2)]
+    first_cache = generation_cache.ScenarioGenerationCache(str(tmp_path), "version")
+    assert [describe(generate_scenario(first_cache, repetition, 3)) for repetition in range(2)] == fresh_scenarios
+    assert (first_cache.number_of_hits, first_cache.number_of_misses) == (0, 4)
+    second_cache = generation_cache.ScenarioGenerationCache(str(tmp_path), "version")
+    random.seed(1234)
+    assert [describe(generate_scenario(second_cache, repetition, 3)) for repetition in range(2)] == fresh_scenarios
+    assert (second_cache.number_of_hits, second_cache.number_of_misses) == (4, 0)
+
+
+def test_seeded_scenarios_do_not_depend_on_generation_order(generate_scenario):
+    seeder = generation_cache.ScenarioGenerationSeeder("version")
+    in_order = [describe(generate_scenario(seeder, 0, number_of_requests)) for number_of_requests in (2, 4)]
+    reversed_order = [describe(generate_scenario(seeder, 0, number_of_requests)) for number_of_requests in (4, 2)]
+    assert in_order == reversed_order[::-1]
+
+
+def test_changed_parameters_or_versions_are_not_served_from_the_cache(tmp_path, generate_scenario):
+    generate_scenario(generation_cache.ScenarioGenerationCache(str(tmp_path), "version"), 0, 3)
+    for version, number_of_requests, topology in [("version", 4, "Geant2012"),
+                                                  ("version", 3, "Uunet"),
+                                                  ("other version", 3, "Geant2012")]:
+        cache = generation_cache.ScenarioGenerationCache(str(tmp_path), version)
+        generate_scenario(cache, 0, number_of_requests, topology=topology)
+        assert cache.number_of_hits == 0
@@ -0,0 +1,137 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+
+"""Tests of polling result shard directories and updating the heatmap statistics incrementally."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_ieee_acm_ton_2019 import evaluation
+from evaluation_ieee_acm_ton_2019 import live_evaluation
+from evaluation_ieee_acm_ton_2019 import plot_data
+from evaluation_ieee_acm_ton_2019 import result_store
+
+
+@pytest.fixture
+def shard_store(tmp_path, scenario_parameter_container, execution_parameter_container):
+    store = result_store.ResultShardStore(str(tmp_path / "results_shards"))
+    store.initialize(scenario_parameter_container, execution_parameter_container)
+    return store
+
+
+@pytest.fixture
+def reduced_entries(monkeypatch):
+    ''' Replaces the reduction of shards by marking the solutions as reduced; returns the reduced entries. '''
+    entries_of_calls = []
+
+    def reduce_shards(shard_store, reduced_shard_store, scenario_container, entries, processes=1):
+        entries_of_calls.append([(entry["scenario_id"], entry["execution_id"]) for entry in entries])
+        for entry in entries:
+            algorithm_id, solution = shard_store.load_shard(entry["scenario_id"], entry["execution_id"])
+            reduced_shard_store.write_shard(entry["scenario_id"], entry["execution_id"], algorithm_id, "reduced " + solution)
+
+    monkeypatch.setattr(plot_data, "reduce_shards", reduce_shards)
+    return entries_of_calls
+
+
+def test_polls_return_only_new_solutions_of_the_selected_execution(shard_store, reduced_entries):
+    watched_directory = live_evaluation.WatchedShardDirectory(shard_store.shard_directory)
+    watched_directory.select("ClassicMCF", 0)
+    assert watched_directory.poll() == []
+    shard_store.write_shard(0, 0, "ClassicMCF", "a")
+    shard_store.write_shard(0, 1, "RandomizedRoundingTriumvirate", "b")
+    assert watched_directory.poll() == [(0, "reduced a")]
+    assert watched_directory.poll() == []
+    shard_store.write_shard(2, 0, "ClassicMCF", "c")
+    assert watched_directory.poll() == [(2, "reduced c")]
+    assert reduced_entries == [[(0, 0)], [(2, 0)]]
+
+
+def test_reduced_shards_are_not_reduced_again(tmp_path, scenario_parameter_container, execution_parameter_container,
+                                              reduced_entries):
+    reduced_store = result_store.ResultShardStore(str(tmp_path / "results_shards_reduced"))
+    reduced_store.initialize(result_store.strip_scenarios(scenario_parameter_container), execution_parameter_container,
+                             reduced=True)
+    reduced_store.write_shard(1, 1, "RandomizedRoundingTriumvirate", "a")
+    watched_directory = live_evaluation.WatchedShardDirectory(reduced_store.shard_directory)
+    watched_directory.select("RandomizedRoundingTriumvirate", 1)
+    assert watched_directory.poll() == [(1, "a")]
+    assert reduced_entries == []
+
+
+class HeatmapAxes(object):
+
+    shape = (1, 2)
+    cell_of_scenario = {0: (0, 0), 1: (0, 1), 2: (0, 1)}
+
+
+def test_heatmap_cells_are_updated_per_solution():
+    heatmap = live_evaluation.LiveHeatmap({"lookup_function": lambda value: value,
+                                           "metric_filter": lambda value: value >= 0}, HeatmapAxes())
+    for scenario_id, value in [(1, 2.0), (2, 4.0), (2, -1.0), (3, 5.0), (0, np.nan)]:
+        heatmap.add(scenario_id, (value,))
+    assert heatmap.changed
+    assert heatmap.statistics.count.tolist() == [[0, 2]]
+    means = heatmap.statistics.get_means()
+    assert np.isnan(means[0, 0]) and means[0, 1] == 3.0
+    assert (heatmap.statistics.min[0, 1], heatmap.statistics.max[0, 1]) == (2.0, 4.0)
+
+
+class Source(object):
+
+    def __init__(self, scenario_parameter_container, polls):
+        self.scenario_parameter_container = scenario_parameter_container
+        self.polls = list(polls)
+
+    def poll(self):
+        return self.polls.pop(0) if self.polls else []
+
+
+def test_scenarios_are_compared_once_solved_by_both_algorithms(tmp_path, scenario_parameter_container, monkeypatch):
+    baseline_source = Source(scenario_parameter_container, [[(0, "a"), (1, "b")], [(2, "c")]])
+    randround_source = Source(scenario_parameter_container, [[(1, "x")], [(0, "y"), (2, "z")]])
+    compared_solutions = []
+
+    def add(self, heatmap_plot_type, scenario_id, solutions):
+        if heatmap_plot_type == evaluation.HeatmapPlotType.Comparison_MCF_vs_RRT:
+            compared_solutions.append((scenario_id, solutions))
+
+    monkeypatch.setattr(live_evaluation.LiveEvaluation, "_add", add)
+    evaluator = live_evaluation.LiveEvaluation(baseline_source, randround_source, str(tmp_path), axes_patterns=[])
+    assert evaluator.update() == 3
+    assert compared_solutions == [(1, ("b", "x"))]
+    assert not evaluator.is_complete()
+    assert evaluator.update() == 3
+    assert compared_solutions == [(1, ("b", "x")), (0, ("a", "y")), (2, ("c", "z"))]
+    assert evaluator.is_complete()
+
+
+def test_full_shards_of_unregistered_algorithms_are_rejected(shard_store):
+    watched_directory = live_evaluation.WatchedShardDirectory(shard_store.shard_directory)
+    with pytest.raises(RuntimeError, match="UnknownAlgorithm"):
+        watched_directory.select("UnknownAlgorithm", 0)
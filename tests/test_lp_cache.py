@@ -0,0 +1,128 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of caching the LP solutions of the randomized rounding."""
+
+import os
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from alib import util
+from vnep_approx import modelcreator_ecg_decomposition
+
+from evaluation_ieee_acm_ton_2019 import lp_cache
+
+
+class Scenario(object):
+
+    def __init__(self):
+        self.substrate = object()
+        self.requests = ["request_{}".format(index) for index in range(3)]
+
+
+class CountingModelCreator(modelcreator_ecg_decomposition.ModelCreatorCactusDecomposition):
+    ''' Model creator returning a fractional solution referencing the requests without solving any LP. '''
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.number_of_computations = 0
+
+    def compute_fractional_solution(self):
+        self.number_of_computations += 1
+        self.status = "optimal"
+        self.time_optimization = 42.0
+        return {request: [(1.0, "mapping of {}".format(request))] for request in self.scenario.requests}
+
+
+class Algorithm(object):
+
+    def __init__(self, scenario):
+        self.model_creator = CountingModelCreator(scenario)
+
+    def compute_integral_solution(self):
+        return self.model_creator.compute_fractional_solution()
+
+
+@pytest.fixture
+def scenario_input_pickle(tmp_path, monkeypatch):
+    monkeypatch.setattr(util.ExperimentPathHandler, "INPUT_DIR", str(tmp_path), raising=False)
+    (tmp_path / "scenarios.pickle").write_bytes(b"scenarios")
+    return "scenarios.pickle"
+
+
+def make_execution_parameters(threads=1, number_of_solutions_to_round=100):
+    return {"ALG_ID": "RandomizedRoundingTriumvirate",
+            "GUROBI_PARAMETERS": {"threads": threads},
+            "ALGORITHM_PARAMETERS": {"number_of_solutions_to_round": number_of_solutions_to_round}}
+
+
+def solve(cache, scenario, execution_parameters):
+    algorithm = Algorithm(scenario)
+    assert cache.attach(algorithm, 0, scenario, execution_parameters)
+    return algorithm, algorithm.compute_integral_solution()
+
+
+def test_cache_hits_restore_solution_and_lp_state(tmp_path, scenario_input_pickle):
+    cache = lp_cache.LPSolutionCache(str(tmp_path / "lp_cache"), scenario_input_pickle)
+    scenario = Scenario()
+    first_algorithm, first_solution = solve(cache, scenario, make_execution_parameters(number_of_solutions_to_round=100))
+    second_algorithm, second_solution = solve(cache, scenario, make_execution_parameters(number_of_solutions_to_round=1000))
+    assert first_algorithm.model_creator.number_of_computations == 1
+    assert second_algorithm.model_creator.number_of_computations == 0
+    assert second_solution == first_solution
+    assert all(second_solution_request is scenario_request
+               for second_solution_request, scenario_request in zip(sorted(second_solution), sorted(scenario.requests)))
+    for attribute in ("status", "time_optimization"):
+        assert getattr(second_algorithm.model_creator, attribute) == getattr(first_algorithm.model_creator, attribute)
+
+
+def test_changed_gurobi_parameters_invalidate_the_cache(tmp_path, scenario_input_pickle):
+    cache = lp_cache.LPSolutionCache(str(tmp_path / "lp_cache"), scenario_input_pickle)
+    scenario = Scenario()
+    solve(cache, scenario, make_execution_parameters(threads=1))
+    algorithm, _ = solve(cache, scenario, make_execution_parameters(threads=2))
+    assert algorithm.model_creator.number_of_computations == 1
+
+
+def test_regenerated_scenario_pickle_invalidates_the_cache(tmp_path, scenario_input_pickle):
+    scenario = Scenario()
+    solve(lp_cache.LPSolutionCache(str(tmp_path / "lp_cache"), scenario_input_pickle), scenario,
+          make_execution_parameters())
+    os.utime(str(tmp_path / scenario_input_pickle), ns=(0, 0))
+    algorithm, _ = solve(lp_cache.LPSolutionCache(str(tmp_path / "lp_cache"), scenario_input_pickle), scenario,
+                         make_execution_parameters())
+    assert algorithm.model_creator.number_of_computations == 1
+
+
+def test_only_the_attached_model_creator_is_wrapped(tmp_path, scenario_input_pickle):
+    cache = lp_cache.LPSolutionCache(str(tmp_path / "lp_cache"), scenario_input_pickle)
+    scenario = Scenario()
+    solve(cache, scenario, make_execution_parameters())
+    assert "compute_fractional_solution" not in vars(CountingModelCreator(scenario))
+    unattached_algorithm = Algorithm(scenario)
+    unattached_algorithm.compute_integral_solution()
+    assert unattached_algorithm.model_creator.number_of_computations == 1
@@ -0,0 +1,93 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+
+"""Tests of querying and listing pickles, shard directories and indexed scenario files."""
+
+import pytest
+
+pytest.importorskip("alib")
+
+from evaluation_ieee_acm_ton_2019 import pickle_inspection
+from evaluation_ieee_acm_ton_2019 import pickle_io
+from evaluation_ieee_acm_ton_2019 import result_store
+from evaluation_ieee_acm_ton_2019 import scenario_store
+
+
+def test_queries_select_attributes_keys_and_indices(tmp_path):
+    path = str(tmp_path / "data.pickle")
+    pickle_io.dump_file({"ClassicMCF": {42: [{"status": "optimal"}]}}, path)
+    obj = pickle_inspection.open_inspectable(path)
+    assert pickle_inspection.resolve_query(obj, "ClassicMCF.42.0.status") == "optimal"
+    with pytest.raises(ValueError) as excinfo:
+        pickle_inspection.resolve_query(obj, "ClassicMCF.43")
+    assert "43 not found in ClassicMCF" in str(excinfo.value)
+
+
+def test_listing_is_limited_in_depth_and_items():
+    lines = list(pickle_inspection.iterate_lines({"values": list(range(5)), "nested": {"a": {"b": 1}}}, "<root>",
+                                                 max_depth=2, max_items=3))
+    assert lines[0] == "<root>: dict (2 items)"
+    assert "    [2]: 2" in lines
+    assert "    ... 2 more" in lines
+    assert "    'a': dict (1 items)" in lines
+    assert all("'b'" not in line for line in lines)
+
+
+def test_cycles_are_not_followed():
+    cyclic = []
+    cyclic.append(cyclic)
+    assert list(pickle_inspection.iterate_lines(cyclic, "<root>")) == ["<root>: list (1 items)", "  [0]: <cycle list>"]
+
+
+def test_shard_directories_are_loaded_on_access(tmp_path, scenario_parameter_container, execution_parameter_container,
+                                                monkeypatch):
+    shard_store = result_store.ResultShardStore(str(tmp_path / "results_shards"))
+    shard_store.initialize(scenario_parameter_container, execution_parameter_container)
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    shard_store.write_shard(1, 1, "RandomizedRoundingTriumvirate", {"objective": 2.0})
+    loaded_shards = []
+    load_shard = result_store.ResultShardStore.load_shard
+
+    def recording_load_shard(self, scenario_id, execution_id):
+        loaded_shards.append((scenario_id, execution_id))
+        return load_shard(self, scenario_id, execution_id)
+
+    monkeypatch.setattr(result_store.ResultShardStore, "load_shard", recording_load_shard)
+    view = pickle_inspection.open_inspectable(shard_store.shard_directory)
+    lines = list(pickle_inspection.iterate_lines(view, "<root>", max_depth=1))
+    assert "  scenario_parameter_container: <not loaded>" in lines
+    assert loaded_shards == []
+    query = "algorithm_scenario_solution_dictionary.RandomizedRoundingTriumvirate.1.1.objective"
+    assert pickle_inspection.resolve_query(view, query) == 2.0
+    assert loaded_shards == [(1, 1)]
+    assert pickle_inspection.resolve_query(view, "execution_parameter_container").algorithm_parameter_list == \
+        execution_parameter_container.algorithm_parameter_list
+
+
+def test_indexed_scenario_files_are_inspectable(tmp_path, make_scenario_container):
+    path = str(tmp_path / "scenarios_indexed.pickle")
+    scenario_store.write_indexed_scenario_file(make_scenario_container(3), path)
+    scenario_container = pickle_inspection.open_inspectable(path)
+    assert pickle_inspection.resolve_query(scenario_container, "scenario_triple.2.1.name") == "scenario_2"
@@ -0,0 +1,129 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+
+"""Tests of the restricted unpickler and the compression codecs of pickle_io."""
+
+import collections
+import io
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from evaluation_ieee_acm_ton_2019 import pickle_io
+
+
+def load_bytes(data):
+    return pickle_io.load(io.BytesIO(data))
+
+
+def test_containers_and_arrays_of_the_standard_library_and_numpy_are_loaded():
+    obj = {"ordered": collections.OrderedDict([("b", 1), ("a", 2)]),
+           "default": collections.defaultdict(list, {"a": [1]}),
+           "queue": collections.deque([1, 2], maxlen=3),
+           "array": np.arange(6, dtype=np.float64).reshape(2, 3),
+           "scalar": np.float64(1.5)}
+    for protocol in (2, pickle_io.PROTOCOL):
+        loaded = load_bytes(pickle.dumps(obj, protocol=protocol))
+        assert list(loaded["ordered"].items()) == [("b", 1), ("a", 2)]
+        assert loaded["default"]["b"] == [] and loaded["default"]["a"] == [1]
+        assert loaded["queue"] == collections.deque([1, 2]) and loaded["queue"].maxlen == 3
+        assert np.array_equal(loaded["array"], obj["array"])
+        assert loaded["scalar"] == 1.5
+
+
+@pytest.mark.parametrize("function", [eval, os.system, collections.namedtuple])
+def test_functions_of_the_standard_library_are_refused(function):
+    with pytest.raises(pickle.UnpicklingError):
+        load_bytes(pickle.dumps(function, protocol=pickle_io.PROTOCOL))
+
+
+def build_global_pickle(module, name):
+    def encode(text):
+        return pickle.SHORT_BINUNICODE + bytes([len(text)]) + text.encode()
+    return pickle.PROTO + b"\x04" + encode(module) + encode(name) + pickle.STACK_GLOBAL + pickle.STOP
+
+
+def test_objects_imported_by_allowed_modules_are_refused():
+    assert load_bytes(build_global_pickle("evaluation_ieee_acm_ton_2019.pickle_io", "FastUnpickler")) is \
+        pickle_io.FastUnpickler
+    with pytest.raises(pickle.UnpicklingError):
+        load_bytes(build_global_pickle("evaluation_ieee_acm_ton_2019.pickle_io", "gc.disable"))
+
+
+def test_pickles_are_written_in_band(tmp_path):
+    path = str(tmp_path / "array.pickle")
+    pickle_io.dump_file(np.arange(10), path)
+    with open(path, "rb") as f:
+        assert np.array_equal(pickle.load(f), np.arange(10))
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".xz", ".bz2"])
+def test_compressed_pickles_are_written_and_read(tmp_path, suffix):
+    path = str(tmp_path / ("results.pickle" + suffix))
+    obj = {"array": np.zeros(1000), "values": list(range(1000))}
+    pickle_io.dump_file(obj, path)
+    assert pickle_io.detect_compression_suffix(path) == suffix
+    assert os.path.getsize(path) < len(pickle.dumps(obj, protocol=pickle_io.PROTOCOL))
+    loaded = pickle_io.load_file(path)
+    assert np.array_equal(loaded["array"], obj["array"]) and loaded["values"] == obj["values"]
+
+
+def test_codec_is_detected_when_reading(tmp_path):
+    uncompressed_path = str(tmp_path / "results.pickle.gz")
+    with open(uncompressed_path, "wb") as f:
+        pickle.dump([1, 2, 3], f)
+    assert pickle_io.detect_compression_suffix(uncompressed_path) == ""
+    assert pickle_io.load_file(uncompressed_path) == [1, 2, 3]
+    misnamed_path = str(tmp_path / "results.pickle")
+    with pickle_io.open_file(misnamed_path, "wb", compression_suffix=".xz") as f:
+        pickle_io.dump([1, 2, 3], f)
+    assert pickle_io.load_file(misnamed_path) == [1, 2, 3]
+
+
+@pytest.fixture
+def compression_level():
+    yield pickle_io.set_compression_level
+    pickle_io.set_compression_level(None)
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".xz", ".bz2"])
+def test_compression_level_zero_is_supported_by_all_codecs(tmp_path, compression_level, suffix):
+    compression_level(0)
+    path = str(tmp_path / ("results.pickle" + suffix))
+    pickle_io.dump_file(list(range(100)), path)
+    assert pickle_io.load_file(path) == list(range(100))
+
+
+def test_higher_compression_levels_compress_better(tmp_path, compression_level):
+    data = [i % 97 for i in range(20000)]
+    sizes = []
+    for level in (0, 9):
+        compression_level(level)
+        path = str(tmp_path / "results_{}.pickle.gz".format(level))
+        pickle_io.dump_file(data, path)
+        sizes.append(os.path.getsize(path))
+    assert sizes[1] < sizes[0]
@@ -0,0 +1,195 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+
+"""Tests of the result extractors, the retention of rounding samples and of merging reduced scenario ranges."""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from alib import solutions, util
+
+from evaluation_ieee_acm_ton_2019 import plot_data
+from evaluation_ieee_acm_ton_2019 import result_store
+
+
+@pytest.fixture
+def write_reduced_pickle(scenario_parameter_container, make_execution_parameter_container):
+
+    def write_reduced_pickle(path, solutions_by_key, algorithm_parameter_list=None):
+        if algorithm_parameter_list is None:
+            algorithm_parameter_list = [{"ALG_ID": "ClassicMCF"}]
+        scenario_solution_storage = solutions.ScenarioSolutionStorage(
+            scenario_parameter_container, make_execution_parameter_container(algorithm_parameter_list))
+        for (algorithm_id, scenario_id, execution_id), solution in solutions_by_key.items():
+            scenario_solution_storage.add_solution(algorithm_id, scenario_id, execution_id, solution)
+        result_store.write_pickle_atomically(scenario_solution_storage, str(path))
+        return str(path)
+
+    return write_reduced_pickle
+
+
+def test_solutions_outside_of_scenario_range_are_removed(scenario_parameter_container, execution_parameter_container):
+    scenario_solution_storage = solutions.ScenarioSolutionStorage(scenario_parameter_container,
+                                                                  execution_parameter_container)
+    for scenario_id in range(5):
+        scenario_solution_storage.add_solution("ClassicMCF", scenario_id, 0, scenario_id)
+    plot_data.remove_solutions_outside_of_scenario_range(scenario_solution_storage, min_scenario_index=1,
+                                                         max_scenario_index=3)
+    assert sorted(scenario_solution_storage.algorithm_scenario_solution_dictionary["ClassicMCF"]) == [1, 2, 3]
+    plot_data.remove_solutions_outside_of_scenario_range(scenario_solution_storage, max_scenario_index=1)
+    assert sorted(scenario_solution_storage.algorithm_scenario_solution_dictionary["ClassicMCF"]) == [1]
+
+
+def test_reduced_pickle_paths_name_the_scenario_range():
+    path = plot_data.get_reduced_pickle_path("results.pickle.xz", min_scenario_index=10)
+    assert path == os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, "results_reduced_10_max.pickle.xz")
+
+
+def test_merge_reduced_results_combines_disjoint_ranges(tmp_path, write_reduced_pickle):
+    first = write_reduced_pickle(tmp_path / "first.pickle", {("ClassicMCF", 0, 0): "a", ("ClassicMCF", 1, 0): "b"})
+    second = write_reduced_pickle(tmp_path / "second.pickle", {("ClassicMCF", 2, 0): "c"})
+    merged_storage = plot_data.merge_reduced_results([first, second])
+    assert merged_storage.algorithm_scenario_solution_dictionary == {"ClassicMCF": {0: {0: "a"}, 1: {0: "b"}, 2: {0: "c"}}}
+
+
+def test_merge_reduced_results_rejects_duplicate_solutions(tmp_path, write_reduced_pickle):
+    first = write_reduced_pickle(tmp_path / "first.pickle", {("ClassicMCF", 0, 0): "a"})
+    second = write_reduced_pickle(tmp_path / "second.pickle", {("ClassicMCF", 0, 0): "b"})
+    with pytest.raises(RuntimeError, match="contained in both"):
+        plot_data.merge_reduced_results([first, second])
+
+
+def test_merge_reduced_results_rejects_different_executions(tmp_path, write_reduced_pickle):
+    first = write_reduced_pickle(tmp_path / "first.pickle", {("ClassicMCF", 0, 0): "a"})
+    second = write_reduced_pickle(tmp_path / "second.pickle", {("ClassicMCF", 1, 0): "b"},
+                                  algorithm_parameter_list=[{"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {"threads": 2}}])
+    with pytest.raises(RuntimeError, match="execution parameters"):
+        plot_data.merge_reduced_results([first, second])
+
+
+def test_unregistered_algorithms_are_rejected():
+    assert isinstance(plot_data.get_result_extractor("ClassicMCF"), plot_data.BaselineResultReducer)
+    assert not plot_data.is_result_extractor_registered("UnknownAlgorithm")
+    with pytest.raises(RuntimeError, match="UnknownAlgorithm"):
+        plot_data.get_result_extractor("UnknownAlgorithm")
+    with pytest.raises(RuntimeError, match="UnknownAlgorithm"):
+        plot_data.reduce_solution_of_algorithm("UnknownAlgorithm", None, object())
+
+
+def test_registered_extractors_reduce_the_solutions_of_their_algorithm(scenario_parameter_container,
+                                                                       execution_parameter_container, monkeypatch):
+    class UppercaseExtractor(plot_data.ResultExtractor):
+
+        FIELDS = ("value",)
+
+        def extract(self, scenario, solution):
+            return solution.upper()
+
+    monkeypatch.setattr(plot_data, "_result_extractor_classes", dict(plot_data._result_extractor_classes))
+    plot_data.register_result_extractor("UppercaseAlgorithm", UppercaseExtractor)
+    scenario_solution_storage = solutions.ScenarioSolutionStorage(scenario_parameter_container,
+                                                                  execution_parameter_container)
+    scenario_solution_storage.add_solution("UppercaseAlgorithm", 0, 0, "a")
+    scenario_solution_storage.add_solution("UppercaseAlgorithm", 1, 0, None)
+    plot_data.reduce_results(scenario_solution_storage)
+    assert scenario_solution_storage.algorithm_scenario_solution_dictionary == {"UppercaseAlgorithm": {0: {0: "A"}, 1: {0: None}}}
+    assert scenario_solution_storage.scenario_parameter_container.scenario_triple is None
+
+
+def brute_force_pareto_front(profits, max_node_loads, max_edge_loads):
+    front = set()
+    for i in range(len(profits)):
+        dominated = False
+        for j in range(len(profits)):
+            at_least_as_good = (profits[j] >= profits[i] and max_node_loads[j] <= max_node_loads[i] and
+                                max_edge_loads[j] <= max_edge_loads[i])
+            better = (profits[j] > profits[i] or max_node_loads[j] < max_node_loads[i] or
+                      max_edge_loads[j] < max_edge_loads[i])
+            if at_least_as_good and better:
+                dominated = True
+                break
+        if not dominated:
+            front.add((profits[i], max_node_loads[i], max_edge_loads[i]))
+    return front
+
+
+def test_pareto_front_matches_brute_force():
+    random_state = np.random.RandomState(0)
+    profits = random_state.randint(0, 20, 200).astype(float)
+    max_node_loads = random_state.randint(0, 20, 200).astype(float)
+    max_edge_loads = random_state.randint(0, 20, 200).astype(float)
+    indices = plot_data.select_pareto_front(profits, max_node_loads, max_edge_loads)
+    selected = [(profits[i], max_node_loads[i], max_edge_loads[i]) for i in indices]
+    assert len(selected) == len(set(selected))
+    assert set(selected) == brute_force_pareto_front(profits, max_node_loads, max_edge_loads)
+    assert list(profits[indices]) == sorted(profits[indices], reverse=True)
+
+
+def test_pareto_front_is_limited_to_max_number_of_samples():
+    profits = np.arange(50, dtype=float)
+    loads = np.arange(50, dtype=float)
+    indices = plot_data.select_pareto_front(profits, loads, loads, max_number_of_samples=5)
+    assert len(indices) == 5
+    assert 49 in indices and 0 in indices
+
+
+def test_top_k_selects_best_samples_per_criterion():
+    profits = np.array([5.0, 1.0, 3.0, 4.0])
+    max_node_loads = np.array([9.0, 1.0, 5.0, 8.0])
+    max_edge_loads = np.array([9.0, 2.0, 1.0, 7.0])
+    indices = plot_data.select_top_k(profits, max_node_loads, max_edge_loads, k=1, criteria=["profit", "max_edge_load"])
+    assert list(indices) == [0, 2]
+    indices = plot_data.select_top_k(profits, max_node_loads, max_edge_loads, k=10)
+    assert sorted(indices) == [0, 1, 2, 3]
+
+
+Sample = namedtuple("Sample", ["profit", "max_node_load", "max_edge_load"])
+
+
+class RandRoundSolution(object):
+
+    def __init__(self, samples):
+        self.collection_of_samples_with_violations = samples
+
+
+@pytest.mark.parametrize("sample_retention, expected_samples", [
+    (plot_data.SAMPLE_RETENTION_BEST, []),
+    (plot_data.SAMPLE_RETENTION_PARETO, [Sample(3.0, 2.0, 2.0), Sample(1.0, 1.0, 1.0)]),
+])
+def test_reducer_retains_samples_according_to_retention(sample_retention, expected_samples):
+    reducer = plot_data.RandRoundResultReducer(sample_retention=sample_retention, number_of_retained_samples=5)
+    solution = RandRoundSolution([Sample(1.0, 1.0, 1.0), None, Sample(3.0, 2.0, 2.0), Sample(2.0, 2.0, 2.0)])
+    assert list(reducer.get_retained_samples(solution)) == expected_samples
+
+
+def test_unknown_sample_retention_is_rejected():
+    with pytest.raises(ValueError):
+        plot_data.set_sample_retention("all", 10)
@@ -0,0 +1,85 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of the mergeable quantile sketches."""
+
+import numpy as np
+import pytest
+
+from evaluation_ieee_acm_ton_2019 import quantile_sketch
+
+
+def rank_errors(sketch, values):
+    sorted_values = np.sort(values)
+    fractions = np.linspace(0.01, 0.99, 99)
+    ranks = np.searchsorted(sorted_values, sketch.quantiles(fractions), side="right") / float(len(values))
+    return np.abs(ranks - fractions)
+
+
+def test_small_series_are_represented_exactly():
+    values = [3.0, 1.0, 2.0, 2.0]
+    xs, ys = quantile_sketch.QuantileSketch.from_values(values, k=16).ecdf_points()
+    assert list(xs) == [1.0, 2.0, 2.0, 3.0]
+    assert list(ys) == [0.25, 0.5, 0.75, 1.0]
+
+
+def test_weights_of_compacted_levels_sum_to_count():
+    sketch = quantile_sketch.QuantileSketch.from_values(np.arange(10001, dtype=float), k=32)
+    _, weights = sketch._sorted_items_and_weights()
+    assert weights.sum() == sketch.count == 10001
+    assert sum(len(level) for level in sketch.levels) < 1000
+
+
+def test_quantiles_of_large_series_have_small_rank_error():
+    values = np.random.RandomState(0).lognormal(size=100000)
+    sketch = quantile_sketch.QuantileSketch.from_values(values, k=256)
+    assert rank_errors(sketch, values).max() < 0.02
+    assert sketch.quantiles([0.0, 1.0]).tolist() == [values.min(), values.max()]
+
+
+def test_merged_sketches_are_as_accurate_as_a_single_one():
+    values = np.random.RandomState(1).normal(size=60000)
+    sketch = quantile_sketch.QuantileSketch(k=256)
+    for chunk in np.array_split(values, 6):
+        sketch.merge(quantile_sketch.QuantileSketch.from_values(chunk, k=256))
+    assert sketch.count == len(values)
+    assert rank_errors(sketch, values).max() < 0.02
+
+
+def test_nan_values_are_counted_separately():
+    sketch = quantile_sketch.QuantileSketch.from_values([1.0, np.nan, 2.0, np.nan], k=16)
+    assert (sketch.count, sketch.nan_count) == (2, 2)
+    assert sketch.ecdf_points(count_nan=True)[1].tolist() == [0.25, 0.5]
+
+
+def test_empty_sketches_have_no_points():
+    sketch = quantile_sketch.QuantileSketch(k=16)
+    xs, ys = sketch.ecdf_points()
+    assert len(xs) == len(ys) == 0
+    assert np.isnan(sketch.quantiles([0.5])).all()
+
+
+def test_sketches_of_different_capacities_cannot_be_merged():
+    with pytest.raises(RuntimeError):
+        quantile_sketch.QuantileSketch(k=16).merge(quantile_sketch.QuantileSketch(k=32))
@@ -0,0 +1,143 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of resuming and merging result shard directories."""
+
+import os
+
+import pytest
+
+pytest.importorskip("alib")
+
+from evaluation_ieee_acm_ton_2019 import result_store
+
+
+@pytest.fixture
+def shard_store(tmp_path, scenario_parameter_container, execution_parameter_container):
+    store = result_store.ResultShardStore(str(tmp_path / "results_shards"))
+    store.initialize(scenario_parameter_container, execution_parameter_container)
+    return store
+
+
+def test_completed_pairs_are_read_from_manifest(shard_store):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    shard_store.write_shard(2, 1, "RandomizedRoundingTriumvirate", {"objective": 2.0})
+    assert shard_store.get_completed_pairs() == {(0, 0), (2, 1)}
+    assert shard_store.load_shard(2, 1) == ("RandomizedRoundingTriumvirate", {"objective": 2.0})
+
+
+def test_manifest_entries_without_shard_and_truncated_lines_are_ignored(shard_store):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    shard_store.write_shard(1, 0, "ClassicMCF", {"objective": 1.0})
+    os.remove(shard_store.get_shard_path(1, 0))
+    with open(shard_store.manifest_path, "a") as f:
+        f.write('{"scenario_id": 2, "execution_id"')
+    assert shard_store.get_completed_pairs() == {(0, 0)}
+
+
+def test_resume_keeps_shards(shard_store, scenario_parameter_container, execution_parameter_container):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    resumed_store = result_store.ResultShardStore(shard_store.shard_directory)
+    resumed_store.initialize(scenario_parameter_container, execution_parameter_container)
+    assert resumed_store.get_completed_pairs() == {(0, 0)}
+
+
+def test_resume_with_changed_execution_parameters_fails(shard_store, scenario_parameter_container,
+                                                        make_execution_parameter_container):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    changed_container = make_execution_parameter_container([{"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {"threads": 2}}])
+    with pytest.raises(RuntimeError):
+        result_store.ResultShardStore(shard_store.shard_directory).initialize(scenario_parameter_container,
+                                                                              changed_container)
+
+
+def test_overwrite_removes_shards(shard_store, scenario_parameter_container, make_execution_parameter_container):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    changed_container = make_execution_parameter_container([{"ALG_ID": "ClassicMCF"}])
+    overwritten_store = result_store.ResultShardStore(shard_store.shard_directory)
+    overwritten_store.initialize(scenario_parameter_container, changed_container, overwrite=True)
+    assert overwritten_store.get_completed_pairs() == set()
+    assert overwritten_store.load_parameters()[1].algorithm_parameter_list == [{"ALG_ID": "ClassicMCF"}]
+
+
+def test_merge_returns_all_completed_shards(shard_store):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    shard_store.write_shard(1, 0, "ClassicMCF", {"objective": 2.0})
+    shard_store.write_shard(1, 1, "RandomizedRoundingTriumvirate", {"objective": 3.0})
+    scenario_solution_storage = shard_store.merge()
+    assert scenario_solution_storage.algorithm_scenario_solution_dictionary == {
+        "ClassicMCF": {0: {0: {"objective": 1.0}}, 1: {0: {"objective": 2.0}}},
+        "RandomizedRoundingTriumvirate": {1: {1: {"objective": 3.0}}},
+    }
+    assert scenario_solution_storage.execution_parameter_container.algorithm_parameter_list == \
+        shard_store.load_parameters()[1].algorithm_parameter_list
+
+
+def test_completed_pair_tracker_reads_only_appended_entries(shard_store):
+    tracker = result_store.CompletedPairTracker(shard_store)
+    assert tracker.update() == set()
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    assert tracker.update() == {(0, 0)}
+    offset = tracker.manifest_offset
+    shard_store.write_shard(1, 1, "RandomizedRoundingTriumvirate", {"objective": 1.0})
+    assert tracker.update() == {(0, 0), (1, 1)}
+    assert tracker.manifest_offset > offset
+
+
+def test_merge_with_scenario_filter_loads_only_selected_shards(shard_store, monkeypatch):
+    shard_store.write_shard(0, 0, "ClassicMCF", {"objective": 1.0})
+    shard_store.write_shard(1, 0, "ClassicMCF", {"objective": 2.0})
+    loaded_scenario_ids = []
+    load_shard = result_store.ResultShardStore.load_shard
+
+    def recording_load_shard(self, scenario_id, execution_id):
+        loaded_scenario_ids.append(scenario_id)
+        return load_shard(self, scenario_id, execution_id)
+
+    monkeypatch.setattr(result_store.ResultShardStore, "load_shard", recording_load_shard)
+    scenario_solution_storage = shard_store.merge(scenario_filter=lambda scenario_id: scenario_id >= 1)
+    assert scenario_solution_storage.algorithm_scenario_solution_dictionary == {"ClassicMCF": {1: {0: {"objective": 2.0}}}}
+    assert loaded_scenario_ids == [1]
+
+
+def test_reduced_shard_directories_are_marked(tmp_path, shard_store, scenario_parameter_container,
+                                              execution_parameter_container):
+    assert not shard_store.is_reduced()
+    reduced_store = result_store.ResultShardStore(str(tmp_path / "results_shards_reduced"))
+    reduced_store.initialize(result_store.strip_scenarios(scenario_parameter_container), execution_parameter_container,
+                             reduced=True)
+    assert reduced_store.is_reduced()
+
+
+def test_reduced_shard_directories_without_marker_are_classified_once(tmp_path, scenario_parameter_container,
+                                                                      execution_parameter_container):
+    legacy_store = result_store.ResultShardStore(str(tmp_path / "results_shards_reduced"))
+    legacy_store.initialize(result_store.strip_scenarios(scenario_parameter_container), execution_parameter_container,
+                            reduced=True)
+    os.remove(legacy_store.reduced_marker_path)
+    os.remove(legacy_store.parameters_path)
+    assert legacy_store.is_reduced()
+    assert os.path.exists(legacy_store.parameters_path)
+    os.remove(legacy_store.metadata_path)
+    assert legacy_store.is_reduced()
@@ -0,0 +1,104 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+
+"""Tests of summarizing result pickles and result shard directories."""
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_ieee_acm_ton_2019 import pickle_io
+from evaluation_ieee_acm_ton_2019 import result_store
+from evaluation_ieee_acm_ton_2019 import result_summary
+
+
+class MetaData(object):
+
+    def __init__(self, runtime):
+        self.time_preprocessing = 0.0
+        self.time_optimization = runtime
+        self.time_postprocessing = 0.0
+
+
+class Solution(object):
+    ''' Mimics a reduced solution holding a status and the runtime in its meta data. '''
+
+    def __init__(self, status, runtime):
+        self.status = status
+        self.meta_data = MetaData(runtime)
+
+
+@pytest.fixture(autouse=True)
+def allow_solutions(monkeypatch):
+    monkeypatch.setattr(pickle_io, "ALLOWED_MODULE_PREFIXES", pickle_io.ALLOWED_MODULE_PREFIXES + (__name__,))
+
+
+@pytest.fixture
+def shard_store(tmp_path, scenario_parameter_container, execution_parameter_container):
+    store = result_store.ResultShardStore(str(tmp_path / "results_shards"))
+    store.initialize(scenario_parameter_container, execution_parameter_container)
+    store.write_shard(0, 0, "ClassicMCF", Solution("optimal", 1.0))
+    store.write_shard(1, 0, "ClassicMCF", Solution("optimal", 3.0))
+    store.write_shard(2, 0, "ClassicMCF", Solution("timeout", 2.0))
+    store.write_shard(0, 1, "RandomizedRoundingTriumvirate", None)
+    return store
+
+
+def check_summary(summary):
+    assert summary["number_of_solutions"] == 4
+    assert summary["algorithm_ids"] == ["ClassicMCF", "RandomizedRoundingTriumvirate"]
+    assert (summary["number_of_scenarios_present"], summary["number_of_scenarios_expected"]) == (3, 3)
+    assert summary["missing_scenario_ids"] == []
+    classic_mcf, randomized_rounding = summary["executions"]
+    assert classic_mcf["status"] == {"optimal": 2, "timeout": 1}
+    assert classic_mcf["runtime"]["mean"] == pytest.approx(2.0)
+    assert classic_mcf["runtime"]["p50"] == pytest.approx(2.0)
+    assert classic_mcf["runtime"]["p100"] == pytest.approx(3.0)
+    assert randomized_rounding["missing_scenario_ids"] == [1, 2]
+    assert randomized_rounding["status"] == {"no solution": 1}
+    assert randomized_rounding["runtime"] is None
+    assert "unknown_execution_ids" not in summary
+
+
+def test_summary_of_shard_directory(shard_store):
+    check_summary(result_summary.summarize_results(shard_store.shard_directory))
+
+
+def test_summary_of_merged_pickle(tmp_path, shard_store):
+    path = str(tmp_path / "results.pickle")
+    pickle_io.dump_file(shard_store.merge(), path)
+    summary = result_summary.summarize_results(path)
+    check_summary(summary)
+    lines = result_summary.format_summary(summary)
+    assert "execution 1 (RandomizedRoundingTriumvirate): 1 solutions" in lines
+    assert "  missing scenarios:    1, 2" in lines
+
+
+def test_solutions_of_unknown_executions_are_reported(scenario_parameter_container, make_execution_parameter_container):
+    summary = result_summary.ResultSummary(scenario_parameter_container,
+                                           make_execution_parameter_container([{"ALG_ID": "ClassicMCF"}]))
+    summary.add_solution("ClassicMCF", 0, 3, Solution("optimal", 1.0))
+    assert summary.summarize()["unknown_execution_ids"] == [3]
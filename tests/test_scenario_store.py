@@ -0,0 +1,88 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of indexed scenario files."""
+
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("alib")
+
+from evaluation_ieee_acm_ton_2019 import pickle_io
+from evaluation_ieee_acm_ton_2019 import result_store
+from evaluation_ieee_acm_ton_2019 import scenario_store
+
+
+@pytest.fixture
+def indexed_scenario_file(tmp_path, make_scenario_container):
+    path = str(tmp_path / "scenarios_indexed.pickle")
+    scenario_store.write_indexed_scenario_file(make_scenario_container(5), path)
+    return path
+
+
+def test_scenarios_are_loaded_on_access(indexed_scenario_file):
+    assert scenario_store.is_indexed_scenario_file(indexed_scenario_file)
+    scenario_container = scenario_store.read_indexed_scenario_file(indexed_scenario_file)
+    assert isinstance(scenario_container.scenario_triple, scenario_store.LazyScenarioTriple)
+    assert list(scenario_container.scenario_triple) == [0, 1, 2, 3, 4]
+    assert scenario_store.lookup_generation_parameters(scenario_container, 3) == {"number_of_requests": 3}
+    generation_parameters, scenario = scenario_container.scenario_triple[3]
+    assert (generation_parameters, scenario.name) == ({"number_of_requests": 3}, "scenario_3")
+
+
+def test_scenarios_share_equal_substrates(indexed_scenario_file):
+    scenario_container = scenario_store.read_indexed_scenario_file(indexed_scenario_file)
+    scenarios = [scenario_store.resolve_scenario(scenario_store.lookup_scenario_for_worker(scenario_container, scenario_id))
+                 for scenario_id in range(4)]
+    assert scenarios[0].substrate is scenarios[2].substrate
+    assert scenarios[0].substrate is not scenarios[1].substrate
+    assert scenarios[1].substrate.name == "substrate_1"
+
+
+def test_materialized_containers_do_not_refer_to_the_file(tmp_path, indexed_scenario_file):
+    scenario_container = scenario_store.read_indexed_scenario_file(indexed_scenario_file)
+    materialized_container = scenario_store.materialize_scenarios(scenario_container)
+    assert isinstance(materialized_container.scenario_triple, dict)
+    assert [scenario.name for scenario in materialized_container.scenario_list] == \
+        ["scenario_{}".format(scenario_id) for scenario_id in range(5)]
+    assert isinstance(scenario_container.scenario_triple, scenario_store.LazyScenarioTriple)
+    path = str(tmp_path / "materialized.pickle")
+    pickle_io.dump_file(materialized_container, path)
+    os.remove(indexed_scenario_file)
+    assert pickle_io.load_file(path).scenario_triple[4][1].name == "scenario_4"
+
+
+def test_merged_shards_contain_the_scenarios_of_the_indexed_file(tmp_path, indexed_scenario_file,
+                                                                 execution_parameter_container):
+    scenario_container = scenario_store.read_indexed_scenario_file(indexed_scenario_file)
+    shard_store = result_store.ResultShardStore(str(tmp_path / "results_shards"))
+    shard_store.initialize(scenario_container, execution_parameter_container)
+    shard_store.write_shard(1, 0, "ClassicMCF", {"objective": 1.0})
+    shutil.move(indexed_scenario_file, str(tmp_path / "moved.pickle"))
+    scenario_parameter_container = shard_store.merge().scenario_parameter_container
+    assert isinstance(scenario_parameter_container.scenario_triple, dict)
+    assert scenario_parameter_container.scenario_triple[1][1].name == "scenario_1"
+    assert len(scenario_parameter_container.scenario_list) == 5
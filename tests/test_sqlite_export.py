@@ -0,0 +1,113 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+
+"""Tests of exporting reduced results into an SQLite database."""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from alib import solutions
+
+from evaluation_ieee_acm_ton_2019 import sqlite_export
+
+
+class Status(object):
+
+    def __init__(self, objective_value):
+        self.status = 2
+        self.objValue = objective_value
+
+
+class BaselineSolution(object):
+    ''' Mimics a reduced baseline solution; the values of the missing attributes are exported as NULL. '''
+
+    def __init__(self, objective_value, embedding_ratio):
+        self.status = Status(objective_value)
+        self.embedding_ratio = embedding_ratio
+        self.load = {("universal", "u"): 0.5, ("universal", "v"): 1.0, ("u", "v"): 0.25}
+
+
+@pytest.fixture
+def make_storage(scenario_parameter_container, make_execution_parameter_container):
+    scenario_parameter_container.scenario_parameter_dict = {
+        "all": {0, 1},
+        "request_generation": {"number_of_requests": {40: {0}, 60: {1}}},
+    }
+
+    def make_storage(algorithm_parameter_list, solution_keys):
+        storage = solutions.ScenarioSolutionStorage(scenario_parameter_container,
+                                                    make_execution_parameter_container(algorithm_parameter_list))
+        for algorithm_id, scenario_id, execution_id in solution_keys:
+            storage.add_solution(algorithm_id, scenario_id, execution_id, BaselineSolution(10.0 * scenario_id, 0.5))
+        return storage
+
+    return make_storage
+
+
+def export(*storages):
+    connection = sqlite3.connect(":memory:")
+    exporter = sqlite_export.SQLiteExporter(connection)
+    for storage in storages:
+        exporter.add_scenario_solution_storage(storage)
+    exporter.finish()
+    return connection
+
+
+def test_solutions_are_joined_with_generation_parameters(make_storage):
+    algorithm_parameter_list = [{"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {"threads": 1}},
+                                {"ALG_ID": "ClassicMCF", "GUROBI_PARAMETERS": {"threads": 2}}]
+    connection = export(make_storage(algorithm_parameter_list, [("ClassicMCF", 0, 1), ("ClassicMCF", 1, 1)]))
+    rows = connection.execute("SELECT number_of_requests, execution_id, objective_value, max_node_load, avg_edge_load, "
+                              "runtime FROM baseline JOIN scenarios USING (scenario_id) ORDER BY scenario_id").fetchall()
+    assert rows == [(40, 1, 0.0, 1.0, 0.25, None), (60, 1, 10.0, 1.0, 0.25, None)]
+    assert connection.execute("SELECT algorithm_id, execution_id, gurobi_parameters FROM executions").fetchall() == \
+        [("ClassicMCF", 1, "{'threads': 2}")]
+
+
+def test_execution_ids_not_matching_the_parameters_are_rejected(make_storage):
+    algorithm_parameter_list = [{"ALG_ID": "ClassicMCF"}, {"ALG_ID": "RandomizedRoundingTriumvirate"}]
+    with pytest.raises(RuntimeError):
+        export(make_storage(algorithm_parameter_list, [("ClassicMCF", 0, 1)]))
+    with pytest.raises(RuntimeError):
+        export(make_storage(algorithm_parameter_list, [("ClassicMCF", 0, 2)]))
+
+
+@pytest.mark.parametrize("name", ["scenario_id", "Scenario_ID", "execution_id", "embedding_ratio"])
+def test_generation_parameters_named_like_fixed_columns_are_rejected(make_storage, scenario_parameter_container, name):
+    storage = make_storage([{"ALG_ID": "ClassicMCF"}], [("ClassicMCF", 0, 0)])
+    scenario_parameter_container.scenario_parameter_dict["request_generation"][name] = {1: {0, 1}}
+    with pytest.raises(RuntimeError) as excinfo:
+        export(storage)
+    assert name in str(excinfo.value)
+
+
+def test_solutions_of_unregistered_algorithms_are_skipped(make_storage):
+    connection = export(make_storage([{"ALG_ID": "ClassicMCF"}, {"ALG_ID": "UnknownAlgorithm"}],
+                                     [("ClassicMCF", 0, 0), ("UnknownAlgorithm", 0, 1)]))
+    assert connection.execute("SELECT algorithm_id, scenario_id FROM baseline").fetchall() == [("ClassicMCF", 0)]
@@ -0,0 +1,100 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of the stratified selection of scenarios for quick-look evaluations."""
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_ieee_acm_ton_2019 import evaluation
+
+SCENARIO_PARAMETER_SPACE_DICT = {"request_generation": [{"CactusRequestGenerator": {"number_of_requests": [20, 40]}}],
+                                 "node_resource_factor": [0.2, 0.5]}
+
+
+def make_scenario_parameter_dict(scenarios_per_cell):
+    cells = [(number_of_requests, node_resource_factor) for number_of_requests in (20, 40)
+             for node_resource_factor in (0.2, 0.5)]
+    number_of_requests_dict = {20: set(), 40: set()}
+    node_resource_factor_dict = {0.2: set(), 0.5: set()}
+    scenario_id = 0
+    for number_of_requests, node_resource_factor in cells:
+        for _ in range(scenarios_per_cell):
+            number_of_requests_dict[number_of_requests].add(scenario_id)
+            node_resource_factor_dict[node_resource_factor].add(scenario_id)
+            scenario_id += 1
+    return {"request_generation": {"CactusRequestGenerator": {"number_of_requests": number_of_requests_dict}},
+            "node_resource_factor": node_resource_factor_dict}
+
+
+def count_scenarios_per_cell(scenario_parameter_dict, scenario_ids):
+    counts = {}
+    for number_of_requests, number_of_requests_ids in \
+            scenario_parameter_dict["request_generation"]["CactusRequestGenerator"]["number_of_requests"].items():
+        for node_resource_factor, node_resource_factor_ids in scenario_parameter_dict["node_resource_factor"].items():
+            counts[(number_of_requests, node_resource_factor)] = len(number_of_requests_ids & node_resource_factor_ids &
+                                                                     set(scenario_ids))
+    return counts
+
+
+def test_fraction_is_selected_from_each_cell():
+    scenario_parameter_dict = make_scenario_parameter_dict(10)
+    selected = evaluation.select_stratified_scenario_subset(SCENARIO_PARAMETER_SPACE_DICT, scenario_parameter_dict,
+                                                            range(40), sample_fraction=0.2)
+    assert set(count_scenarios_per_cell(scenario_parameter_dict, selected).values()) == {2}
+
+
+def test_per_cell_limit_bounds_the_fraction():
+    scenario_parameter_dict = make_scenario_parameter_dict(10)
+    selected = evaluation.select_stratified_scenario_subset(SCENARIO_PARAMETER_SPACE_DICT, scenario_parameter_dict,
+                                                            range(40), sample_fraction=0.5, per_cell_limit=3)
+    assert set(count_scenarios_per_cell(scenario_parameter_dict, selected).values()) == {3}
+
+
+def test_selection_is_deterministic_per_seed():
+    scenario_parameter_dict = make_scenario_parameter_dict(10)
+    selections = [evaluation.select_stratified_scenario_subset(SCENARIO_PARAMETER_SPACE_DICT, scenario_parameter_dict,
+                                                               range(40), per_cell_limit=1, seed=seed)
+                  for seed in (0, 0, 1)]
+    assert selections[0] == selections[1]
+    assert selections[0] != selections[2]
+
+
+def test_only_given_scenarios_are_selected():
+    scenario_parameter_dict = make_scenario_parameter_dict(10)
+    selected = evaluation.select_stratified_scenario_subset(SCENARIO_PARAMETER_SPACE_DICT, scenario_parameter_dict,
+                                                            range(0, 40, 2), sample_fraction=1.0)
+    assert selected == set(range(0, 40, 2))
+    assert evaluation.select_stratified_scenario_subset(SCENARIO_PARAMETER_SPACE_DICT, scenario_parameter_dict,
+                                                        range(5)) == set(range(5))
+
+
+@pytest.mark.parametrize("sample_fraction, per_cell_limit", [(0.0, None), (1.5, None), (None, 0)])
+def test_invalid_sample_sizes_are_rejected(sample_fraction, per_cell_limit):
+    with pytest.raises(RuntimeError):
+        evaluation.select_stratified_scenario_subset(SCENARIO_PARAMETER_SPACE_DICT, make_scenario_parameter_dict(1),
+                                                     range(4), sample_fraction=sample_fraction,
+                                                     per_cell_limit=per_cell_limit)
@@ -0,0 +1,86 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of sharing identical substrates among scenarios."""
+
+import io
+import pickle
+
+import pytest
+
+pytest.importorskip("alib")
+
+from evaluation_ieee_acm_ton_2019 import pickle_io
+from evaluation_ieee_acm_ton_2019 import substrate_interning
+
+
+def test_fingerprints_do_not_depend_on_dict_order(make_scenario_container):
+    scenario_container = make_scenario_container(2, number_of_substrates=1)
+    first_substrate = scenario_container.scenario_triple[0][1].substrate
+    second_substrate = scenario_container.scenario_triple[1][1].substrate
+    first_substrate.attributes = {"a": 1, "b": 2}
+    second_substrate.attributes = {"b": 2, "a": 1}
+    assert (substrate_interning.compute_substrate_fingerprint(first_substrate) ==
+            substrate_interning.compute_substrate_fingerprint(second_substrate))
+    second_substrate.capacity = 2.0
+    assert (substrate_interning.compute_substrate_fingerprint(first_substrate) !=
+            substrate_interning.compute_substrate_fingerprint(second_substrate))
+
+
+def test_equal_substrates_are_shared(make_scenario_container):
+    scenario_container = make_scenario_container(6, number_of_substrates=2)
+    interner = substrate_interning.SubstrateInterner()
+    interner.intern_scenario_container(scenario_container)
+    substrates = [scenario.substrate for _, scenario in scenario_container.scenario_triple.values()]
+    assert len(set(map(id, substrates))) == 2
+    assert interner.number_of_interned_substrates == 4
+    assert all(scenario.substrate is substrates[index]
+               for index, scenario in enumerate(scenario_container.scenario_list))
+
+
+@pytest.mark.parametrize("suffix", ["", ".gz", ".xz", ".bz2"])
+def test_scenario_pickles_are_rewritten_according_to_their_suffix(tmp_path, make_scenario_container, suffix):
+    path = str(tmp_path / ("scenarios.pickle" + suffix))
+    # as written by the alib, i.e. uncompressed regardless of the suffix
+    with open(path, "wb") as f:
+        pickle.dump(make_scenario_container(4), f)
+    substrate_interning.intern_substrates_of_scenario_pickle(path)
+    assert pickle_io.detect_compression_suffix(path) == suffix
+    scenario_container = pickle_io.load_file(path)
+    assert scenario_container.scenario_triple[0][1].substrate is scenario_container.scenario_triple[2][1].substrate
+
+
+def test_substrates_are_stored_once_per_directory(tmp_path, make_scenario_container):
+    scenario_container = make_scenario_container(4, number_of_substrates=2)
+    substrate_directory = substrate_interning.SubstrateDirectory(str(tmp_path / "substrates"))
+    records = []
+    for _, scenario in scenario_container.scenario_triple.values():
+        f = io.BytesIO()
+        substrate_interning.SubstrateReferencingPickler(f, substrate_directory.store).dump(scenario)
+        records.append(f.getvalue())
+    assert len(list((tmp_path / "substrates").iterdir())) == 2
+    loaded_scenarios = [substrate_interning.SubstrateReferencingUnpickler(io.BytesIO(record), substrate_directory.load).load()
+                        for record in records]
+    assert loaded_scenarios[0].substrate is loaded_scenarios[2].substrate
+    assert loaded_scenarios[1].substrate.name == "substrate_1"
@@ -0,0 +1,94 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of the lazily filled topology index."""
+
+import os
+
+import pytest
+
+pytest.importorskip("alib")
+
+from evaluation_ieee_acm_ton_2019 import topology_index
+
+
+@pytest.fixture
+def parsed_topologies(monkeypatch):
+    parsed_topologies = []
+
+    def parse_topology(self, topology_name):
+        parsed_topologies.append(topology_name)
+        return topology_index.TopologyMetadata(name=topology_name, number_of_nodes=len(parsed_topologies),
+                                               number_of_edges=None,
+                                               short_name=topology_index.TOPOLOGY_SHORT_NAMES.get(topology_name))
+
+    monkeypatch.setattr(topology_index.TopologyIndex, "_parse_topology", parse_topology)
+    return parsed_topologies
+
+
+def write_topology(topology_directory, topology_name, content="nodes: []\n"):
+    path = topology_directory / "{}.yml".format(topology_name)
+    path.write_text(content)
+    return str(path)
+
+
+def make_index(tmp_path):
+    return topology_index.TopologyIndex(topology_directory=str(tmp_path / "topologies"),
+                                        index_path=str(tmp_path / "cache" / "topology_index.pickle"))
+
+
+def test_topologies_are_parsed_once_and_persisted(tmp_path, parsed_topologies):
+    (tmp_path / "topologies").mkdir()
+    write_topology(tmp_path / "topologies", "Geant2012")
+    assert make_index(tmp_path).lookup("Geant2012").short_name == "GE"
+    assert make_index(tmp_path).lookup("Geant2012").number_of_nodes == 1
+    assert parsed_topologies == ["Geant2012"]
+
+
+def test_changed_topology_files_are_parsed_again(tmp_path, parsed_topologies):
+    (tmp_path / "topologies").mkdir()
+    path = write_topology(tmp_path / "topologies", "Surfnet")
+    make_index(tmp_path).lookup("Surfnet")
+    write_topology(tmp_path / "topologies", "Surfnet", content="nodes: [1]\n")
+    os.utime(path, ns=(0, 0))
+    assert make_index(tmp_path).lookup("Surfnet").number_of_nodes == 2
+    assert parsed_topologies == ["Surfnet", "Surfnet"]
+
+
+def test_unknown_topologies_are_not_indexed(tmp_path, parsed_topologies):
+    (tmp_path / "topologies").mkdir()
+    assert make_index(tmp_path).lookup("Missing") is None
+    assert parsed_topologies == []
+
+
+def test_entries_of_concurrent_indexes_are_merged(tmp_path, parsed_topologies):
+    (tmp_path / "topologies").mkdir()
+    write_topology(tmp_path / "topologies", "Uunet")
+    write_topology(tmp_path / "topologies", "Ntt")
+    first_index = make_index(tmp_path)
+    second_index = make_index(tmp_path)
+    assert second_index.entries == {}
+    first_index.lookup("Uunet")
+    second_index.lookup("Ntt")
+    assert set(make_index(tmp_path).entries) == {"Uunet", "Ntt"}
@@ -0,0 +1,111 @@
+# MIT License
+#
+# Copyright (c) 2016-2019 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+"""Tests of the leases of the SQLite work queue."""
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_ieee_acm_ton_2019 import work_queue
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = work_queue.WorkQueue(str(tmp_path / "queue.sqlite"), lease_timeout=10.0, max_attempts=2)
+    queue.initialize({0: 1.0, 1: 3.0, 2: 2.0})
+    yield queue
+    queue.close()
+
+
+def test_scenarios_are_claimed_by_decreasing_priority(queue):
+    assert [queue.claim("worker") for _ in range(4)] == [1, 2, 0, None]
+
+
+def test_initialize_keeps_state_of_existing_scenarios(queue):
+    scenario_id = queue.claim("worker")
+    queue.complete(scenario_id, "worker")
+    queue.initialize({0: 1.0, 1: 3.0, 2: 2.0})
+    assert queue.get_state_counts() == {work_queue.TASK_DONE: 1, work_queue.TASK_PENDING: 2}
+
+
+def test_expired_lease_is_handed_to_another_worker(queue, clock):
+    assert queue.claim("first") == 1
+    clock.now += 5.0
+    assert queue.claim("second") == 2
+    clock.now += 6.0
+    assert queue.claim("second") == 1
+
+
+def test_heartbeat_renews_leases(queue, clock):
+    assert queue.claim("first") == 1
+    clock.now += 8.0
+    queue.heartbeat("first")
+    clock.now += 8.0
+    assert queue.claim("second") == 2
+    assert queue.claim("second") == 0
+    assert queue.claim("second") is None
+
+
+def test_scenario_fails_after_max_attempts(queue, clock):
+    assert queue.claim("first") == 1
+    clock.now += 11.0
+    assert queue.claim("second") == 1
+    clock.now += 11.0
+    queue.release_expired_leases()
+    assert queue.get_failed_scenario_ids() == [1]
+
+
+def test_failed_scenario_is_retried_until_max_attempts(queue):
+    assert queue.claim("worker") == 1
+    queue.fail(1, "worker")
+    assert queue.claim("worker") == 1
+    queue.fail(1, "worker")
+    assert queue.get_failed_scenario_ids() == [1]
+
+
+def test_completion_by_worker_without_lease_is_ignored(queue):
+    assert queue.claim("first") == 1
+    queue.complete(1, "second")
+    assert queue.get_state_counts()[work_queue.TASK_LEASED] == 1
+    queue.complete(1, "first")
+    assert queue.has_unfinished_scenarios()
+    assert queue.get_state_counts()[work_queue.TASK_DONE] == 1